@@ -0,0 +1,60 @@
+"""
+Compares the available JSON codecs on the payloads of the mock library API.
+
+Usage::
+
+    $ python benchmarks/json_codecs.py [number of iterations]
+
+"""
+import sys
+import timeit
+
+from restorm.clients.jsonclient import get_codec, get_codec_names
+from restorm.examples.mock.api import LibraryApiClient
+
+
+def get_payloads():
+    """
+    Returns the raw content of all GET-responses of the mock library API.
+    """
+    client = LibraryApiClient()
+    payloads = []
+    for uri, methods in sorted(client.responses.items()):
+        if 'GET' in methods:
+            payloads.append(methods['GET'][1])
+    return payloads
+
+
+def main(number=10000):
+    payloads = get_payloads()
+    size = sum([len(p) for p in payloads])
+    print 'Payloads: %d (%d bytes in total), iterations: %d' % (len(payloads), size, number)
+    print
+    print '%-12s %12s %12s %12s %12s' % ('codec', 'decode (s)', 'MB/s', 'encode (s)', 'MB/s')
+
+    for name in get_codec_names():
+        codec = get_codec(name)
+        data = [codec.loads(p) for p in payloads]
+
+        def decode():
+            for payload in payloads:
+                codec.loads(payload)
+
+        def encode():
+            for item in data:
+                codec.dumps(item)
+
+        decode_time = min(timeit.repeat(decode, number=number, repeat=3))
+        encode_time = min(timeit.repeat(encode, number=number, repeat=3))
+        print '%-12s %12.3f %12.1f %12.3f %12.1f' % (
+            name,
+            decode_time, size * number / decode_time / 1e6,
+            encode_time, size * number / encode_time / 1e6,
+        )
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
@@ -0,0 +1,91 @@
+"""
+Measures the memory needed to hold many cached responses and resources, with
+the regular and the compact classes.
+
+Usage::
+
+    $ python benchmarks/memory.py [number of objects]
+
+Each variant runs in its own process, so their memory usage doesn't affect
+each other.
+"""
+import gc
+import resource
+import subprocess
+import sys
+import time
+
+from restorm.clients.base import CompactRequest, CompactResponse, Request, Response
+from restorm.clients.cache import ResponseCache
+from restorm.resource import Resource
+
+
+VARIANTS = {
+    'regular': (Request, Response, False),
+    'compact': (CompactRequest, CompactResponse, True),
+}
+
+
+def max_rss():
+    """
+    Returns the maximum resident set size of this process in kB.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(variant, number):
+    request_class, response_class, compact = VARIANTS[variant]
+
+    class Book(Resource):
+        class Meta:
+            item = r'^book/(?P<id>\d+)$'
+
+    Book._meta.compact = compact
+
+    cache = ResponseCache(max_entries=None)
+    resources = []
+
+    gc.collect()
+    rss_before = max_rss()
+    start = time.time()
+
+    for i in range(number):
+        uri = 'http://www.example.com/api/book/%d' % i
+        request = request_class(uri, 'GET', None, {'Accept': 'application/json', 'Content-Type': 'application/json'})
+        # Header names as returned by ``httplib2``.
+        response = response_class(None, {
+            'status': '200',
+            'content-type': 'application/json',
+            'cache-control': 'max-age=3600',
+            'etag': '"%d"' % i,
+        }, None, request)
+        response.content = {
+            'id': i,
+            'title': 'Book %d' % i,
+            'author': 'http://www.example.com/api/author/%d' % (i % 100),
+        }
+        cache.store(request, response)
+        resources.append(Book(response.content, absolute_url=uri))
+
+    duration = time.time() - start
+    gc.collect()
+    used = max_rss() - rss_before
+
+    print '%-10s %10d %12.1f %12d %10.2f' % (variant, number, used / 1024.0, used * 1024 / number, duration)
+
+
+def main(number=1000000):
+    print '%-10s %10s %12s %12s %10s' % ('variant', 'objects', 'memory (MB)', 'bytes/object', 'time (s)')
+    sys.stdout.flush()
+
+    for variant in sorted(VARIANTS.keys(), reverse=True):
+        subprocess.check_call([sys.executable, __file__, '--run', variant, str(number)])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--run':
+        run(sys.argv[2], int(sys.argv[3]))
+    elif len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
@@ -0,0 +1,69 @@
+"""
+Measures the construction time and memory usage of large ``ResourceList``s.
+Resources are created when they are accessed, so all items are accessed once
+after the list is constructed.
+
+Usage::
+
+    $ python benchmarks/resource_lists.py [number of items]
+
+"""
+import gc
+import resource
+import sys
+import time
+
+from restorm.rest import _dynamic_classes
+from restorm.resource import ResourceList
+
+
+def get_data(size):
+    """
+    Returns a list of book-like dicts, each with a nested author that links to
+    related resources.
+    """
+    return [{
+        'id': i,
+        'title': 'Book %d' % i,
+        'resource_url': 'http://www.example.com/api/book/%d' % i,
+        'author': {
+            'name': 'Author %d' % i,
+            'resource_url': 'http://www.example.com/api/author/%d' % i,
+            'publisher': 'http://www.example.com/api/publisher/%d' % (i % 10),
+        },
+    } for i in range(size)]
+
+
+def count_types():
+    return len([o for o in gc.get_objects() if isinstance(o, type)])
+
+
+def main(size=10000):
+    data = get_data(size)
+    gc.collect()
+    types_before = count_types()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.time()
+    resource_list = ResourceList(data, client=None)
+    construction_time = time.time() - start
+
+    start = time.time()
+    for obj in resource_list:
+        obj.data['author']
+    access_time = time.time() - start
+
+    gc.collect()
+    print 'Items:             %d' % len(resource_list)
+    print 'Construction (s):  %.3f' % construction_time
+    print 'Access (s):        %.3f' % access_time
+    print 'New classes:       %d' % (count_types() - types_before)
+    print 'Interned classes:  %d' % len(_dynamic_classes)
+    print 'Max RSS growth:    %d kB' % (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
@@ -0,0 +1,98 @@
+"""
+Measures lookups in a response cache by concurrent reader processes, with a
+shared ``SQLiteBackend`` and, for comparison, the ``MemoryBackend`` of each
+process.
+
+Usage::
+
+    $ python benchmarks/shared_cache.py [number of entries] [number of lookups per reader]
+
+The SQLite cache is warmed once by the parent process. Each reader opens it
+and looks up random responses, which includes deserializing their content.
+"""
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from restorm.clients.cache import MemoryBackend, ResponseCache, SQLiteBackend
+from restorm.clients.jsonclient import JSONClient
+
+
+def uri(i):
+    return 'http://www.example.com/api/book/%d' % i
+
+
+def warm(cache, client, number):
+    """
+    Stores ``number`` responses in the cache.
+    """
+    for i in range(number):
+        request = client.create_request(uri(i), 'GET')
+        content = '{"id": %d, "title": "Book %d", "author": "http://www.example.com/api/author/%d"}' % (i, i, i % 100)
+        response = client.create_response({
+            'status': '200',
+            'content-type': 'application/json',
+            'cache-control': 'max-age=3600',
+            'etag': '"%d"' % i,
+        }, content, request)
+        cache.store(request, response)
+
+
+def read(cache, client, entries, lookups):
+    """
+    Looks up random responses and returns the number of hits.
+    """
+    hits = 0
+    for i in range(lookups):
+        entry = cache.lookup(client.create_request(uri(random.randrange(entries)), 'GET'), client)
+        if entry is not None and entry.response.content is not None:
+            hits += 1
+    return hits
+
+
+def reader(args):
+    backend, path, entries, lookups = args
+    client = JSONClient()
+    if backend == 'sqlite':
+        cache = ResponseCache(backend=SQLiteBackend(path))
+    else:
+        cache = ResponseCache(backend=MemoryBackend(max_entries=None))
+        warm(cache, client, entries)
+    start = time.time()
+    hits = read(cache, client, entries, lookups)
+    return hits, time.time() - start
+
+
+def main(entries=10000, lookups=20000):
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'cache.db')
+        start = time.time()
+        warm(ResponseCache(backend=SQLiteBackend(path)), JSONClient(), entries)
+        print 'Entries: %d (warmed in %.2f s), lookups per reader: %d' % (entries, time.time() - start, lookups)
+        print
+        print '%-8s %8s %12s %14s %14s' % ('backend', 'readers', 'hit rate', 'lookups/s', 'per reader')
+
+        for backend in ('memory', 'sqlite'):
+            for readers in (1, 2, 4, 8):
+                pool = multiprocessing.Pool(readers)
+                try:
+                    results = pool.map(reader, [(backend, path, entries, lookups)] * readers)
+                finally:
+                    pool.close()
+                    pool.join()
+
+                hits = sum([r[0] for r in results])
+                duration = max([r[1] for r in results])
+                total = readers * lookups
+                print '%-8s %8d %11.1f%% %14.0f %14.0f' % (backend, readers, 100.0 * hits / total, total / duration, total / duration / readers)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,163 @@
+"""
+Batching of lookups of single resources into requests for the list.
+
+Many APIs can return several items at once, for example
+``book/?isbn__in=1,2,3``. If the ``Meta`` class of a resource declares how,
+lookups are collected and retrieved with as few requests as possible:
+
+.. sourcecode:: python
+
+    class Book(Resource):
+        class Meta:
+            list = r'^book/$'
+            item = r'^book/(?P<isbn>[\d-]+)$'
+            batch_param = 'isbn__in'
+            batch_key = 'isbn'
+            batch_size = 50
+
+    >>> with Book.objects.batch() as loader:
+    ...     futures = [Book.objects.get_async(isbn=isbn) for isbn in isbns]
+    >>> books = [f.result() for f in futures]
+
+"""
+import sys
+import threading
+
+from restorm.futures import Future
+from restorm.session import absolute_uri
+
+
+_local = threading.local()
+
+
+def get_active_loader(manager):
+    """
+    Returns the ``BatchLoader`` of the manager that is active in the current
+    thread, or ``None``.
+    """
+    loaders = getattr(_local, 'loaders', None)
+    if loaders:
+        return loaders.get(manager)
+    return None
+
+
+class BatchLoader(object):
+    """
+    Collects lookups of resources and retrieves them in batches of at most
+    ``batch_size`` with ``ResourceManager.all``. The items in the list are
+    matched to the lookups by their ``batch_key`` field.
+
+    Lookups are retrieved when ``dispatch`` is called, when ``batch_size``
+    lookups are pending or, if ``window`` is set, at most ``window`` seconds
+    after the first pending lookup.
+
+    A loader can be used as context manager. While it's active, it collects
+    the lookups of the manager in the current thread and all pending lookups
+    are retrieved when it's deactivated.
+    """
+    def __init__(self, manager, client, window=None):
+        self.manager = manager
+        self.client = client
+        self.window = window
+
+        self._lock = threading.Lock()
+        # Per key, a list of futures waiting for it.
+        self._pending = {}
+        self._timer = None
+        self._previous = None
+
+    def get_key(self, uri=None, **kwargs):
+        """
+        Returns the key of the lookup, or ``None`` if the lookup cannot be
+        batched.
+        """
+        options = self.manager.options
+        if uri:
+            kwargs = options.router.item.params_from_uri(uri)
+        if kwargs.keys() != [options.batch_key]:
+            return None
+        return unicode(kwargs[options.batch_key])
+
+    def load(self, uri=None, **kwargs):
+        """
+        Returns a ``Future`` for the resource with the given lookup, like the
+        arguments of ``ResourceManager.get``. The result is ``None`` if the
+        resource is not in the list.
+        """
+        key = self.get_key(uri, **kwargs)
+        if key is None:
+            raise ValueError('The lookup cannot be batched, it needs exactly one argument "%s".' % self.manager.options.batch_key)
+
+        future = Future()
+        self._lock.acquire()
+        try:
+            self._pending.setdefault(key, []).append(future)
+            full = len(self._pending) >= self.manager.options.batch_size
+            if not full and self.window and self._timer is None:
+                self._timer = threading.Timer(self.window, self.dispatch)
+                self._timer.setDaemon(True)
+                self._timer.start()
+        finally:
+            self._lock.release()
+
+        if full:
+            self.dispatch()
+        return future
+
+    def dispatch(self):
+        """
+        Retrieves all pending lookups.
+        """
+        self._lock.acquire()
+        try:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        finally:
+            self._lock.release()
+
+        keys = pending.keys()
+        size = self.manager.options.batch_size
+        for start in range(0, len(keys), size):
+            self._retrieve(keys[start:start + size], pending)
+
+    def _retrieve(self, keys, pending):
+        from restorm.resource import _set_retrieved
+
+        options = self.manager.options
+        try:
+            items = self.manager.all(self.client, query={options.batch_param: options.batch_separator.join(keys)})
+        except Exception:
+            exc_info = sys.exc_info()
+            for key in keys:
+                for future in pending[key]:
+                    future.set_exception(exc_info)
+            return
+
+        objects = {}
+        for item in items:
+            key = unicode(item.get(options.batch_key))
+            if key in pending:
+                absolute_url = absolute_uri(self.client, options.router.item.get_absolute_url(root=options.root, **{options.batch_key: key}))
+                objects[key] = self.manager.object_class(item, client=self.client, absolute_url=absolute_url)
+                _set_retrieved(objects[key], item)
+
+        for key in keys:
+            for future in pending[key]:
+                future.set_result(objects.get(key))
+
+    def __enter__(self):
+        if not hasattr(_local, 'loaders'):
+            _local.loaders = {}
+        self._previous = _local.loaders.get(self.manager)
+        _local.loaders[self.manager] = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._previous is None:
+            del _local.loaders[self.manager]
+        else:
+            _local.loaders[self.manager] = self._previous
+        self._previous = None
+        self.dispatch()
@@ -0,0 +1,112 @@
+from restorm.clients.base import BaseClient, ClientMixin
+from restorm.clients.jsonclient import JSONClientMixin, JSON_LIBRARY_FOUND
+from restorm.clients.xmlclient import XMLClientMixin, XML_LIBRARY_FOUND
+from restorm.futures import WorkerPool
+
+
+class BaseAsyncClient(BaseClient):
+    """
+    RESTful client based on ``BaseClient`` that can perform requests in the
+    background on a pool of worker threads.
+
+    All regular (blocking) methods keep working as usual. Each of them has an
+    asynchronous counterpart, with an ``_async`` suffix, that immediately
+    returns a ``Future``. Call ``result()`` on the ``Future`` to wait for the
+    ``Response``.
+
+    >>> from restorm.clients.asyncclient import AsyncJSONClient
+    >>> client = AsyncJSONClient(root_uri='http://www.example.com/api/', max_workers=20)
+    >>> futures = [client.get_async('book/%d' % i) for i in range(200)]
+    >>> responses = [f.result() for f in futures]
+
+    """
+    def __init__(self, *args, **kwargs):
+        """
+        Takes one additional argument ``max_workers`` (10 by default), which is
+        the maximum number of requests that are performed at the same time.
+        All other arguments are passed to the ``BaseClient`` constructor.
+        """
+        self.workers = WorkerPool(kwargs.pop('max_workers', 10))
+
+        super(BaseAsyncClient, self).__init__(*args, **kwargs)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Performs ``func(*args, **kwargs)`` on one of the worker threads and
+        returns a ``Future``.
+        """
+        return self.workers.submit(func, *args, **kwargs)
+
+    def request_async(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        """
+        Asynchronous version of ``request``.
+        """
+        return self.submit(self.request, uri, method, body, headers, redirections, connection_type)
+
+    def get_async(self, uri, headers=None):
+        """
+        Asynchronous version of ``get``.
+        """
+        return self.submit(self.get, uri, headers)
+
+    def head_async(self, uri):
+        """
+        Asynchronous version of ``head``.
+        """
+        return self.submit(self.head, uri)
+
+    def post_async(self, uri, data):
+        """
+        Asynchronous version of ``post``.
+        """
+        return self.submit(self.post, uri, data)
+
+    def put_async(self, uri, data):
+        """
+        Asynchronous version of ``put``.
+        """
+        return self.submit(self.put, uri, data)
+
+    def patch_async(self, uri, data, headers=None):
+        """
+        Asynchronous version of ``patch``.
+        """
+        return self.submit(self.patch, uri, data, headers)
+
+    def delete_async(self, uri):
+        """
+        Asynchronous version of ``delete``.
+        """
+        return self.submit(self.delete, uri)
+
+    def close(self):
+        """
+        Stops the worker threads after all pending requests are performed.
+        """
+        self.workers.shutdown()
+        super(BaseAsyncClient, self).close()
+
+
+class AsyncClient(BaseAsyncClient, ClientMixin):
+    pass
+
+
+class AsyncJSONClient(BaseAsyncClient, JSONClientMixin):
+    """
+    Asynchronous client that handles JSON requests and responses.
+    """
+    def __init__(self, *args, **kwargs):
+        if not JSON_LIBRARY_FOUND:
+            raise ImportError('Could not load any known JSON library.')
+        self._pop_json_codec(kwargs)
+        super(AsyncJSONClient, self).__init__(*args, **kwargs)
+
+
+class AsyncXMLClient(BaseAsyncClient, XMLClientMixin):
+    """
+    Asynchronous client that handles XML requests and responses.
+    """
+    def __init__(self, *args, **kwargs):
+        if not XML_LIBRARY_FOUND:
+            raise ImportError('Could not load any known XML library.')
+        super(AsyncXMLClient, self).__init__(*args, **kwargs)
@@ -1,10 +1,18 @@
+import copy
 import logging
+import threading
 import urlparse
 import httplib2
 
+from restorm import instrumentation
+from restorm.clients.pool import connection_key
+
 
 logger = logging.getLogger(__name__)
 
+# Statuses of redirects, which are followed by ``httplib2`` or ``stream``.
+REDIRECT_STATUSES = (300, 301, 302, 303, 307, 308)
+
 
 class Request(dict):
     def __init__(self, uri, method, body=None, headers=None):
@@ -58,6 +66,145 @@ class Response(dict):
         self.status_code = int(self.pop('Status'))
 
 
+# Normalized header names, shared by all ``HeaderView`` instances.
+_header_names = {}
+
+
+def normalize_header_name(name):
+    """
+    Returns the name of a header in lower case, with dashes instead of
+    underscores.
+
+    >>> normalize_header_name('Content_Type')
+    'content-type'
+
+    """
+    try:
+        return _header_names[name]
+    except KeyError:
+        normalized = _header_names[name] = name.lower().replace('_', '-')
+        return normalized
+
+
+def normalize_headers(headers):
+    """
+    Returns the headers with normalized names. If all names are normalized
+    already, like those of ``httplib2``, the headers are returned as is.
+    """
+    for name in headers:
+        if normalize_header_name(name) != name:
+            return dict([(normalize_header_name(k), v) for k, v in headers.iteritems()])
+    return headers
+
+
+class HeaderView(object):
+    """
+    A ``dict``-like view on headers that ignores the case of header names. The
+    headers are stored only once, with normalized names.
+    """
+    __slots__ = ('_headers',)
+
+    def __init__(self, headers):
+        self._headers = normalize_headers(headers)
+
+    @property
+    def headers(self):
+        """
+        Return the actual headers.
+        """
+        return self._headers
+
+    def __getitem__(self, name):
+        return self._headers[normalize_header_name(name)]
+
+    def __setitem__(self, name, value):
+        self._headers[normalize_header_name(name)] = value
+
+    def __delitem__(self, name):
+        del self._headers[normalize_header_name(name)]
+
+    def __contains__(self, name):
+        return normalize_header_name(name) in self._headers
+
+    def __len__(self):
+        return len(self._headers)
+
+    def __iter__(self):
+        return iter(self._headers)
+
+    def get(self, name, default=None):
+        return self._headers.get(normalize_header_name(name), default)
+
+    def pop(self, name, *args):
+        return self._headers.pop(normalize_header_name(name), *args)
+
+    def keys(self):
+        return self._headers.keys()
+
+    def values(self):
+        return self._headers.values()
+
+    def items(self):
+        return self._headers.items()
+
+    def iteritems(self):
+        return self._headers.iteritems()
+
+
+class CompactRequest(HeaderView):
+    """
+    A ``Request`` that uses less memory. It has no instance ``__dict__`` and
+    stores the headers once, in a ``HeaderView``.
+    """
+    __slots__ = ('uri', 'method', 'body')
+
+    def __init__(self, uri, method, body=None, headers=None):
+        if headers is None:
+            headers = {}
+        super(CompactRequest, self).__init__(headers)
+
+        self.uri = uri
+        self.method = method
+        self.body = body
+
+
+class CompactResponse(HeaderView):
+    """
+    A ``Response`` that uses less memory. It has no instance ``__dict__`` and
+    stores the headers once, in a ``HeaderView``.
+
+    The headers are stored as a plain ``dict`` without the ``status`` header.
+    """
+    __slots__ = ('client', 'raw_content', 'content', 'request', 'status_code')
+
+    def __init__(self, client, response_headers, response_content, request):
+        headers = normalize_headers(response_headers)
+        if headers is response_headers:
+            # The status is removed below, don't change the caller's headers.
+            headers = dict(headers)
+        super(CompactResponse, self).__init__(headers)
+
+        self.client = client
+        self.raw_content = response_content
+        self.content = response_content
+        self.request = request
+
+        # Set status code on its own property.
+        self.status_code = int(self.pop('Status'))
+
+
+class LazyHeaders(object):
+    """
+    Formats the headers of a ``Request`` or ``Response`` only when it's
+    converted to a string, for use as logging argument.
+    """
+    def __init__(self, headers):
+        self.headers = headers
+
+    def __str__(self):
+        return '\n'.join(['%s: %s' % (k, v) for k, v in self.headers.items()])
+
+
 class ClientMixin(object):
     """
     This mixin contains the attribute ``MIME_TYPE`` which is ``None`` by
@@ -66,10 +213,25 @@ class ClientMixin(object):
     
     If the ``MIME_TYPE`` is also found in the ``Content-Type`` response headers,
     the response contents will be deserialized.
+
+    The classes of requests and responses are ``request_class`` and
+    ``response_class``. Set these to ``CompactRequest`` and ``CompactResponse``
+    to reduce memory usage, for example if many responses are cached.
+
+    If ``response_cache`` is set to a ``ResponseCache``, responses to
+    GET-requests are cached. If ``single_flight`` is set to a
+    ``SingleFlight``, identical GET-requests that are performed at the same
+    time by multiple threads result in a single request.
     """
     root_uri = ''
 
     MIME_TYPE = None
+
+    request_class = Request
+    response_class = Response
+
+    response_cache = None
+    single_flight = None
     
     def serialize(self, data):
         """
@@ -115,50 +277,167 @@ class ClientMixin(object):
         if headers is None:
             headers = {}
 
+        # Headers of the caller, like a specific ``Content-Type``, are kept.
         if self.MIME_TYPE:
-            headers.update({
-                'Accept': self.MIME_TYPE,
-                'Content-Type': self.MIME_TYPE,
-            })
+            names = set([k.lower() for k in headers])
+            for name in ('Accept', 'Content-Type'):
+                if name.lower() not in names:
+                    headers[name] = self.MIME_TYPE
 
         data = self.serialize(body)
 
-        return Request(uri, method, data, headers)
+        return self.request_class(uri, method, data, headers)
     
     def create_response(self, response_headers, response_content, request):
         """
         Returns a ``Response`` object.
         """
-        response = Response(self, response_headers, response_content, request)
+        response = self.response_class(self, response_headers, response_content, request)
 
         if not self.MIME_TYPE or ('Content-Type' in response and response['Content-Type'].startswith(self.MIME_TYPE)):
             response.content = self.deserialize(response_content)
 
         return response 
 
-    def get(self, uri):
+    def get(self, uri, headers=None):
         """
         Convenience method that performs a GET-request.
+
+        Requests with ``headers``, like conditional requests, are always
+        performed. They are not cached or coalesced.
         """
+        if headers:
+            return self.request(uri, 'GET', headers=headers)
+        if self.single_flight is not None:
+            return self._coalesced_get(uri)
+        if self.response_cache is not None:
+            return self._cached_get(uri)
         return self.request(uri, 'GET')
 
+    def head(self, uri):
+        """
+        Convenience method that performs a HEAD-request.
+        """
+        return self.request(uri, 'HEAD')
+
     def post(self, uri, data):
         """
         Convenience method that performs a POST-request.
         """
-        return self.request(uri, 'POST', data)
+        return self._invalidate(self.request(uri, 'POST', data))
 
     def put(self, uri, data):
         """
         Convenience method that performs a PUT-request.
         """
-        return self.request(uri, 'PUT', data)
+        return self._invalidate(self.request(uri, 'PUT', data))
+
+    def patch(self, uri, data, headers=None):
+        """
+        Convenience method that performs a PATCH-request. Pass ``headers`` to
+        set the ``Content-Type`` of the patch format.
+        """
+        return self._invalidate(self.request(uri, 'PATCH', data, headers=headers))
 
     def delete(self, uri):
         """
         Convenience method that performs a DELETE-request.
         """
-        return self.request(uri, 'DELETE')
+        return self._invalidate(self.request(uri, 'DELETE'))
+
+    def stream(self, uri, chunk_size=64 * 1024):
+        """
+        Performs a GET-request and returns a ``tuple`` of the ``Response`` and
+        an iterator over chunks of its raw content. The content is not
+        deserialized.
+
+        This implementation does not support streaming. It returns the
+        complete response, and ``None`` instead of an iterator.
+        """
+        return self.get(uri), None
+
+    def _coalesced_get(self, uri):
+        """
+        Performs the GET-request, unless an identical request is in progress.
+        In that case, waits for and returns a copy of its response.
+        """
+        request = self.create_request(uri, 'GET')
+        key = (request.uri, tuple(sorted(request.items())))
+
+        if self.response_cache is not None:
+            response, shared = self.single_flight.do(key, self._cached_get, uri)
+        else:
+            response, shared = self.single_flight.do(key, self.request, uri, 'GET')
+
+        if shared:
+            # Each caller gets its own response and content, but the content
+            # is only deserialized once.
+            response = copy.copy(response)
+            response.content = copy.deepcopy(response.content)
+        return response
+
+    def _cached_get(self, uri):
+        """
+        Returns the cached response if it's still fresh. Otherwise, performs a
+        GET-request, conditional if the cached response can be revalidated.
+        """
+        entry = self.response_cache.lookup(self.create_request(uri, 'GET'), self)
+        if entry is not None and entry.is_fresh():
+            return entry.response
+
+        headers = None
+        if entry is not None and entry.can_revalidate():
+            headers = entry.conditional_headers()
+
+        response = self.request(uri, 'GET', headers=headers)
+        if response.status_code == 304 and headers is not None:
+            self.response_cache.revalidated(entry, response)
+            return entry.response
+
+        self.response_cache.store(response.request, response)
+        return response
+
+    def _invalidate(self, response):
+        """
+        Removes cached responses for the URI of a request that changed it.
+        """
+        if self.response_cache is not None:
+            self.response_cache.invalidate(response.request.uri)
+        return response
+
+
+class ContentStream(object):
+    """
+    An iterator over chunks of the raw content of a response, read from its
+    connection. The connection is released when the content is read
+    completely, or discarded when the stream is closed before.
+    """
+    def __init__(self, raw_response, chunk_size, release):
+        self.raw_response = raw_response
+        self.chunk_size = chunk_size
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        if self._release is None:
+            raise StopIteration
+        try:
+            data = self.raw_response.read(self.chunk_size)
+        except:
+            self.close()
+            raise
+        if not data:
+            release, self._release = self._release, None
+            release(True)
+            raise StopIteration
+        return data
+
+    def close(self):
+        if self._release is not None:
+            release, self._release = self._release, None
+            release(False)
 
 
 class BaseClient(httplib2.Http):
@@ -167,13 +446,40 @@ class BaseClient(httplib2.Http):
     """
     def __init__(self, *args, **kwargs):
         """
-        Takes one additional argument ``root_uri``. All other arguments are 
-        passed to the ``httplib2.Http`` constructor.
+        Takes four additional arguments: ``root_uri``, ``pool``,
+        ``response_cache`` and ``single_flight``. If a ``ConnectionPool`` is
+        passed as ``pool``, connections are taken from and returned to this
+        pool. A ``ResponseCache`` passed as ``response_cache`` caches responses
+        to GET-requests and a ``SingleFlight`` passed as ``single_flight``
+        coalesces identical GET-requests. All other arguments are passed to the
+        ``httplib2.Http`` constructor.
         """
         if 'root_uri' in kwargs:
             self.root_uri = kwargs.pop('root_uri')
+        if 'response_cache' in kwargs:
+            self.response_cache = kwargs.pop('response_cache')
+        if 'single_flight' in kwargs:
+            self.single_flight = kwargs.pop('single_flight')
+
+        self.pool = kwargs.pop('pool', None)
+
+        # Connections of ``httplib2.Http`` cannot be shared between threads,
+        # so each thread that uses this client keeps its own.
+        self._local = threading.local()
 
         super(BaseClient, self).__init__(*args, **kwargs)
+
+    def _get_connections(self):
+        try:
+            return self._local.connections
+        except AttributeError:
+            self._local.connections = {}
+            return self._local.connections
+
+    def _set_connections(self, connections):
+        self._local.connections = connections
+
+    connections = property(_get_connections, _set_connections)
     
     def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
         """
@@ -184,47 +490,202 @@ class BaseClient(httplib2.Http):
         ``self.create_response(response_headers, response_content, request)``
         and is returned.
         """
+        trace = instrumentation.attach()
+
         # Create request.
         request = self.create_request(uri, method, body, headers)
 
+        if trace is not None:
+            trace.lap('serialize')
+            trace.request_start(request)
+
         # Perform an HTTP-request with ``httplib2``.
         try:
-            response_headers, response_content = super(BaseClient, self).request(request.uri, request.method, request.body, request, redirections, connection_type)
+            response_headers, response_content = self._pooled_request(request, redirections, connection_type)
         except Exception, e:
+            if trace is not None:
+                trace.request_error(e)
+
             # Logging.
-            logger.critical('%(method)s %(uri)s\n%(headers)s\n\n%(body)s\n\n\nException: %(exception)s', {
-                'method': request.method,
-                'uri': request.uri,
-                'headers': '\n'.join(['%s: %s' % (k, v) for k, v in request.items()]),
-                'body': request.body if request.body else '',
-                'exception': unicode(e),
-            })
+            logger.critical('%s %s\n%s\n\n%s\n\n\nException: %s', request.method, request.uri,
+                LazyHeaders(request), request.body or '', e)
             raise
         else:
+            if trace is not None:
+                trace.lap('network')
+
             # Create response.
             response = self.create_response(response_headers, response_content, request)
-            
-            # Logging.
-            if logger.level > logging.DEBUG:
-                logger.info('%(method)s %(uri)s (HTTP %(response_status)s)' % {
-                    'method': request.method,
-                    'uri': request.uri,
-                    'response_status': response.status_code
-                })
-            else:
-                logger.debug('%(method)s %(uri)s\n%(headers)s\n\n%(body)s\n\n\nHTTP %(response_status)s\n%(response_headers)s\n\n%(response_content)s', {
-                    'method': request.method,
-                    'uri': request.uri,
-                    'headers': '\n'.join(['%s: %s' % (k, v) for k, v in request.items()]),
-                    'body': request.body if request.body else '',
-                    'response_status': response.status_code,
-                    'response_headers': '\n'.join(['%s: %s' % (k, v) for k, v in response.items()]),
+
+            if trace is not None:
+                trace.lap('deserialize')
+                trace.response_received(response)
+
+            # Logging. Messages are only formatted if they are actually logged.
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('%s %s\n%s\n\n%s\n\n\nHTTP %s\n%s\n\n%s', request.method, request.uri,
+                    LazyHeaders(request), request.body or '', response.status_code, LazyHeaders(response),
                     # Show the actual content, not response.content
-                    'response_content': response_content
-                })
-                
+                    response_content)
+            else:
+                logger.info('%s %s (HTTP %s)', request.method, request.uri, response.status_code)
+
             return response
 
+    def _get_follow_redirects(self):
+        return getattr(self._local, 'follow_redirects', self._follow_redirects)
+
+    def _set_follow_redirects(self, value):
+        self._follow_redirects = value
+
+    # Can be disabled for the current thread only, while streaming.
+    follow_redirects = property(_get_follow_redirects, _set_follow_redirects)
+
+    def stream(self, uri, chunk_size=64 * 1024, redirections=5):
+        """
+        Performs a GET-request and returns a ``tuple`` of the ``Response`` and
+        an iterator over chunks of at most ``chunk_size`` bytes of its raw
+        content. The content is read from the connection while iterating, so
+        it's never entirely in memory. The content of the ``Response`` is
+        ``None``.
+
+        The request is performed by ``httplib2``, with the credentials,
+        certificates and proxy settings of this client. Only the content of
+        responses that ``httplib2`` doesn't handle itself is streamed: not that
+        of redirects, authentication challenges and compressed responses.
+
+        The connection is released when the iterator is exhausted.
+        """
+        headers = {'Accept-Encoding': 'identity'}
+        if self.cache is not None:
+            # Don't let ``httplib2`` cache the content it didn't read.
+            headers['Cache-Control'] = 'no-store'
+        request = self.create_request(uri, 'GET', headers=headers)
+
+        key = connection_key(request.uri)
+        if self.pool is not None:
+            self.connections = {}
+            connection = self.pool.checkout(key)
+            if connection is not None:
+                self.connections[key] = connection
+
+        self._local.streaming = True
+        self._local.follow_redirects = False
+        self._local.stream = None
+        try:
+            response_headers, response_content = super(BaseClient, self).request(request.uri, 'GET', None, request, redirections)
+        except:
+            self._local.stream = None
+            connection = self.connections.pop(key, None)
+            if connection is not None:
+                connection.close()
+            if self.pool is not None:
+                self.pool.discard(key)
+            raise
+        finally:
+            self._local.streaming = False
+            del self._local.follow_redirects
+
+        stream, self._local.stream = self._local.stream, None
+
+        # The connection cannot be used by other requests until its content is
+        # read.
+        connection = self.connections.pop(key, None)
+
+        def release(reusable):
+            if connection is not None and reusable:
+                if self.pool is not None:
+                    self.pool.checkin(key, connection)
+                elif key not in self.connections:
+                    self.connections[key] = connection
+                else:
+                    connection.close()
+            else:
+                if connection is not None:
+                    connection.close()
+                if self.pool is not None:
+                    self.pool.discard(key)
+
+        if stream is None:
+            release(True)
+            response = self.response_class(self, response_headers, None, request)
+            if response.status_code in REDIRECT_STATUSES and 'Location' in response and redirections > 0:
+                return self.stream(urlparse.urljoin(request.uri, response['Location']), chunk_size, redirections - 1)
+            return response, iter([response_content])
+
+        raw_response = stream[1]
+        del raw_response.read
+
+        return self.response_class(self, response_headers, None, request), ContentStream(raw_response, chunk_size, release)
+
+    def _conn_request(self, conn, request_uri, method, body, headers):
+        """
+        Performs the HTTP-request on the connection, like ``httplib2`` does.
+        While streaming, the content of the response is left on the connection
+        if ``httplib2`` doesn't need it, and the response is stored for
+        ``stream``.
+        """
+        if not getattr(self._local, 'streaming', False) or method != 'GET':
+            return super(BaseClient, self)._conn_request(conn, request_uri, method, body, headers)
+
+        local = self._local
+        getresponse = conn.getresponse
+
+        def getresponse_unread():
+            raw_response = getresponse()
+            local.stream = None
+            if raw_response.status not in REDIRECT_STATUSES and raw_response.status != 401 and \
+                    not raw_response.getheader('content-encoding'):
+                raw_response.read = lambda *args: ''
+                local.stream = (conn, raw_response)
+            return raw_response
+
+        conn.getresponse = getresponse_unread
+        try:
+            return super(BaseClient, self)._conn_request(conn, request_uri, method, body, headers)
+        finally:
+            del conn.getresponse
+
+    def _pooled_request(self, request, redirections, connection_type):
+        """
+        Performs the low level HTTP-request. If this client has a connection
+        pool, the connection is checked out of the pool before and all
+        connections are returned to the pool after the request.
+        """
+        if self.pool is None:
+            return super(BaseClient, self).request(request.uri, request.method, request.body, request, redirections, connection_type)
+
+        key = connection_key(request.uri)
+        connection = self.pool.checkout(key)
+
+        self.connections = {}
+        if connection is not None:
+            self.connections[key] = connection
+
+        try:
+            result = super(BaseClient, self).request(request.uri, request.method, request.body, request, redirections, connection_type)
+        except:
+            # Don't return connections in an unknown state to the pool.
+            connections, self.connections = self.connections, {}
+            for connection in connections.values():
+                connection.close()
+            self.pool.discard(key)
+            raise
+
+        connections, self.connections = self.connections, {}
+
+        connection = connections.pop(key, None)
+        if connection is None:
+            self.pool.discard(key)
+        else:
+            self.pool.checkin(key, connection)
+
+        # Connections to other hosts, created while following redirects.
+        for other_key, other_connection in connections.items():
+            self.pool.add(other_key, other_connection)
+
+        return result
+
 
 class Client(BaseClient, ClientMixin):
     pass
\ No newline at end of file
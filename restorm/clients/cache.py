@@ -0,0 +1,672 @@
+import marshal
+import os
+import random
+import threading
+import time
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+
+class LRUCache(object):
+    """
+    A thread-safe mapping that holds at most ``max_entries`` items with a
+    combined size of at most ``max_size``. If either is exceeded, the least
+    recently used items are removed.
+
+    >>> from restorm.clients.cache import LRUCache
+    >>> cache = LRUCache(max_entries=2)
+    >>> cache.set('a', 1)
+    >>> cache.set('b', 2)
+    >>> cache.get('a')
+    1
+    >>> cache.set('c', 3)
+    >>> cache.get('b') is None
+    True
+
+    If ``on_evict`` is given, it's called with the key and value of each item
+    that is removed because a limit is exceeded.
+    """
+    # Indexes in the list that represents a link.
+    PREV, NEXT, KEY, VALUE, SIZE = 0, 1, 2, 3, 4
+
+    def __init__(self, max_entries=None, max_size=None, on_evict=None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.on_evict = on_evict
+
+        self._lock = threading.Lock()
+        self._links = {}
+        self._size = 0
+
+        # Circular doubly linked list, the least recently used link follows
+        # the root.
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None, 0]
+
+    def __len__(self):
+        return len(self._links)
+
+    def __contains__(self, key):
+        return key in self._links
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key, default=None):
+        self._lock.acquire()
+        try:
+            link = self._links.get(key)
+            if link is None:
+                return default
+            self._unlink(link)
+            self._append(link)
+            return link[self.VALUE]
+        finally:
+            self._lock.release()
+
+    def peek(self, key, default=None):
+        """
+        Returns the value for the key without marking it as recently used.
+        """
+        link = self._links.get(key)
+        if link is None:
+            return default
+        return link[self.VALUE]
+
+    def set(self, key, value, size=0):
+        evicted = []
+        self._lock.acquire()
+        try:
+            link = self._links.pop(key, None)
+            if link is not None:
+                self._unlink(link)
+                self._size -= link[self.SIZE]
+
+            if self.max_size is not None and size > self.max_size:
+                evicted.append((key, value))
+                return
+
+            link = [None, None, key, value, size]
+            self._links[key] = link
+            self._append(link)
+            self._size += size
+
+            while (self.max_entries is not None and len(self._links) > self.max_entries) or \
+                    (self.max_size is not None and self._size > self.max_size):
+                oldest = self._root[self.NEXT]
+                self._unlink(oldest)
+                del self._links[oldest[self.KEY]]
+                self._size -= oldest[self.SIZE]
+                evicted.append((oldest[self.KEY], oldest[self.VALUE]))
+        finally:
+            self._lock.release()
+            # Called without the lock, so the callback can use the cache.
+            if self.on_evict is not None:
+                for item in evicted:
+                    self.on_evict(*item)
+
+    def delete(self, key):
+        self._lock.acquire()
+        try:
+            link = self._links.pop(key, None)
+            if link is not None:
+                self._unlink(link)
+                self._size -= link[self.SIZE]
+        finally:
+            self._lock.release()
+
+    def keys(self):
+        self._lock.acquire()
+        try:
+            return self._links.keys()
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        self._lock.acquire()
+        try:
+            self._links.clear()
+            self._root[:] = [self._root, self._root, None, None, 0]
+            self._size = 0
+        finally:
+            self._lock.release()
+
+    def _unlink(self, link):
+        link[self.PREV][self.NEXT] = link[self.NEXT]
+        link[self.NEXT][self.PREV] = link[self.PREV]
+
+    def _append(self, link):
+        last = self._root[self.PREV]
+        link[self.PREV] = last
+        link[self.NEXT] = self._root
+        last[self.NEXT] = link
+        self._root[self.PREV] = link
+
+
+def parse_cache_control(value):
+    """
+    Returns the directives of a ``Cache-Control`` header as ``dict``.
+
+    >>> parse_cache_control('public, max-age=60')
+    {'public': None, 'max-age': '60'}
+
+    """
+    directives = {}
+    if not value:
+        return directives
+
+    for directive in value.split(','):
+        directive = directive.strip()
+        if not directive:
+            continue
+        if '=' in directive:
+            name, argument = directive.split('=', 1)
+            directives[name.strip().lower()] = argument.strip().strip('"')
+        else:
+            directives[directive.lower()] = None
+    return directives
+
+
+class CacheEntry(object):
+    """
+    A cached ``Response`` and the information needed to determine whether it
+    is still fresh and, if not, how to revalidate it.
+
+    Entries that are loaded from a shared backend have no ``response`` until
+    it's created from their ``headers`` and ``raw_content`` by
+    ``ResponseCache.lookup``.
+    """
+    def __init__(self, response, ttl):
+        self.response = response
+        self.uri = response.request.uri
+        self.etag = response.get('Etag')
+        self.last_modified = response.get('Last-Modified')
+        self.refresh(ttl)
+
+        # Set when the entry is stored.
+        self.key = None
+        self.size = 0
+
+    def refresh(self, ttl):
+        self.expires = time.time() + ttl
+
+    def is_fresh(self):
+        return time.time() < self.expires
+
+    def can_revalidate(self):
+        return self.etag is not None or self.last_modified is not None
+
+    def conditional_headers(self):
+        """
+        Returns the request headers to ask the server whether the cached
+        response is still valid.
+        """
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def dump(self):
+        """
+        Returns the entry as a ``tuple`` of built-in types, to store it outside
+        of this process. The raw content of the response is stored, not the
+        deserialized content.
+        """
+        if self.response is not None:
+            headers = dict([(k, v) for k, v in self.response.headers.items() if k.lower() != 'status'])
+            headers['status'] = str(self.response.status_code)
+            raw_content = self.response.raw_content
+        else:
+            headers, raw_content = self.headers, self.raw_content
+        return (self.uri, headers, raw_content, self.expires, self.etag, self.last_modified)
+
+    @classmethod
+    def load(cls, data):
+        """
+        Returns an entry, without ``response``, from the result of ``dump``.
+        """
+        entry = cls.__new__(cls)
+        entry.uri, entry.headers, entry.raw_content, entry.expires, entry.etag, entry.last_modified = data
+        entry.response = None
+        entry.key = None
+        entry.size = 0
+        return entry
+
+
+class CacheBackend(object):
+    """
+    Stores the entries of a ``ResponseCache``. Subclasses implement all
+    methods.
+
+    Entries are stored by key, a string. Per URI, the backend also stores the
+    request headers that the responses vary on, as ``tuple``. Backends may
+    remove entries at any time, for example if they exceed a size limit.
+    """
+    def get(self, key):
+        """
+        Returns the ``CacheEntry`` for the key, or ``None``.
+        """
+        raise NotImplementedError
+
+    def set(self, key, entry, size=0):
+        """
+        Stores the ``CacheEntry`` for the key. ``size`` is the size of its raw
+        content.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def get_vary(self, uri):
+        raise NotImplementedError
+
+    def set_vary(self, uri, value):
+        raise NotImplementedError
+
+    def delete_vary(self, uri):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Keeps the entries in memory, in an ``LRUCache``. Entries are not copied, so
+    a cached response is returned without deserializing anything. The entries
+    are only available to the process that stored them.
+
+    The keys of the entries are indexed by URI, so invalidating a URI removes
+    its entries right away. The ``Vary`` headers of a URI are removed as soon
+    as it has no entries left.
+    """
+    def __init__(self, max_entries=1000, max_size=None):
+        self._lock = threading.Lock()
+        self._entries = LRUCache(max_entries=max_entries, max_size=max_size, on_evict=self._evicted)
+        self._vary = {}
+        # Per URI, the set of keys of its entries.
+        self._keys = {}
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, entry, size=0):
+        self._lock.acquire()
+        try:
+            self._keys.setdefault(entry.uri, set()).add(key)
+        finally:
+            self._lock.release()
+        self._entries.set(key, entry, size)
+
+    def delete(self, key):
+        entry = self._entries.peek(key)
+        self._entries.delete(key)
+        if entry is not None:
+            self._evicted(key, entry)
+
+    def _evicted(self, key, entry):
+        self._lock.acquire()
+        try:
+            keys = self._keys.get(entry.uri)
+            if keys is None:
+                return
+            keys.discard(key)
+            if not keys:
+                del self._keys[entry.uri]
+                self._vary.pop(entry.uri, None)
+        finally:
+            self._lock.release()
+
+    def get_vary(self, uri):
+        return self._vary.get(uri)
+
+    def set_vary(self, uri, value):
+        self._lock.acquire()
+        try:
+            self._vary[uri] = value
+        finally:
+            self._lock.release()
+
+    def delete_vary(self, uri):
+        self._lock.acquire()
+        try:
+            self._vary.pop(uri, None)
+            keys = self._keys.pop(uri, ())
+        finally:
+            self._lock.release()
+        for key in keys:
+            self._entries.delete(key)
+
+    def clear(self):
+        self._lock.acquire()
+        try:
+            self._entries.clear()
+            self._vary.clear()
+            self._keys.clear()
+        finally:
+            self._lock.release()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Stores the entries in an SQLite database, so all processes on a host can
+    share a single cache. The database is used in write-ahead logging (WAL)
+    mode, so readers don't block each other or a writer.
+
+    Entries are stored with the raw content of their response, which is
+    deserialized again when it's used. If the cache has more than
+    ``max_entries`` entries or their total size exceeds ``max_size`` bytes,
+    the least recently used entries are removed. Pass ``None`` to remove a
+    limit. Invalidating a URI removes its entries right away. To keep reads
+    cheap, the time an entry was used is only updated once per
+    ``touch_interval`` seconds.
+
+    >>> from restorm.clients.cache import ResponseCache, SQLiteBackend
+    >>> cache = ResponseCache(backend=SQLiteBackend('/tmp/restorm-cache.db', max_size=200 * 1024 * 1024))
+
+    """
+    def __init__(self, path, max_entries=10000, max_size=100 * 1024 * 1024, timeout=5.0, touch_interval=60):
+        """
+        :param path: The path of the database file, shared by all processes.
+        :param max_entries: The maximum number of entries, 10000 by default.
+        :param max_size: The maximum total size in bytes of all entries, 100 MB
+            by default.
+        :param timeout: The number of seconds to wait for a lock on the
+            database.
+        :param touch_interval: The minimum number of seconds between updates of
+            the time an entry was used.
+        """
+        if sqlite3 is None:
+            raise ImportError('Could not load the sqlite3 module.')
+
+        self.path = path
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.timeout = timeout
+        self.touch_interval = touch_interval
+
+        # Connections cannot be shared between threads or forked processes.
+        self._local = threading.local()
+
+        self._write(self._create_tables)
+
+    def _connect(self):
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.text_factory = str
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = pid
+        return self._local.connection
+
+    def _write(self, func, *args):
+        """
+        Calls ``func`` with the connection and the arguments in a transaction
+        that holds the write lock.
+        """
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            result = func(connection, *args)
+        except:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return result
+
+    def _create_tables(self, connection):
+        connection.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, uri TEXT NOT NULL, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)')
+        connection.execute('CREATE INDEX IF NOT EXISTS entries_used ON entries (used)')
+        connection.execute('CREATE INDEX IF NOT EXISTS entries_uri ON entries (uri)')
+        connection.execute('CREATE TABLE IF NOT EXISTS vary (uri TEXT PRIMARY KEY, value BLOB NOT NULL)')
+        # The number and total size of the entries, to avoid counting them.
+        connection.execute('CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY, entries INTEGER NOT NULL, size INTEGER NOT NULL)')
+        connection.execute('INSERT OR IGNORE INTO totals VALUES (0, 0, 0)')
+
+    def get(self, key):
+        connection = self._connect()
+        row = connection.execute('SELECT value, used FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        if now - row[1] > self.touch_interval:
+            connection.execute('UPDATE entries SET used = ? WHERE key = ?', (now, key))
+
+        entry = CacheEntry.load(marshal.loads(str(row[0])))
+        entry.key = key
+        entry.size = len(row[0])
+        return entry
+
+    def set(self, key, entry, size=0):
+        try:
+            value = marshal.dumps(entry.dump())
+        except ValueError:
+            # The raw content is not a string.
+            return
+        if self.max_size is not None and len(value) > self.max_size:
+            return
+        self._write(self._set, key, entry.uri, value)
+
+    def _set(self, connection, key, uri, value):
+        row = connection.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+        connection.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)', (key, uri, sqlite3.Binary(value), len(value), time.time()))
+        if row is None:
+            connection.execute('UPDATE totals SET entries = entries + 1, size = size + ? WHERE id = 0', (len(value),))
+        else:
+            connection.execute('UPDATE totals SET size = size + ? WHERE id = 0', (len(value) - row[0],))
+        self._evict(connection)
+
+    def _evict(self, connection):
+        """
+        Removes the least recently used entries while the limits are exceeded.
+        """
+        entries, size = connection.execute('SELECT entries, size FROM totals WHERE id = 0').fetchone()
+        while (self.max_entries is not None and entries > self.max_entries) or \
+                (self.max_size is not None and size > self.max_size):
+            rows = connection.execute('SELECT key, uri, size FROM entries ORDER BY used LIMIT 100').fetchall()
+            if not rows:
+                break
+            for key, uri, entry_size in rows:
+                connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+                connection.execute('DELETE FROM vary WHERE uri = ? AND NOT EXISTS (SELECT 1 FROM entries WHERE uri = ?)', (uri, uri))
+                entries -= 1
+                size -= entry_size
+                if (self.max_entries is None or entries <= self.max_entries) and \
+                        (self.max_size is None or size <= self.max_size):
+                    break
+        connection.execute('UPDATE totals SET entries = ?, size = ? WHERE id = 0', (entries, size))
+
+    def delete(self, key):
+        self._write(self._delete, key)
+
+    def _delete(self, connection, key):
+        row = connection.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+            connection.execute('UPDATE totals SET entries = entries - 1, size = size - ? WHERE id = 0', (row[0],))
+
+    def _delete_uri(self, connection, uri):
+        """
+        Removes the entries of the URI, which are unreachable once its ``Vary``
+        headers are replaced or removed.
+        """
+        entries, size = connection.execute('SELECT COUNT(*), TOTAL(size) FROM entries WHERE uri = ?', (uri,)).fetchone()
+        if entries:
+            connection.execute('DELETE FROM entries WHERE uri = ?', (uri,))
+            connection.execute('UPDATE totals SET entries = entries - ?, size = size - ? WHERE id = 0', (entries, int(size)))
+
+    def get_vary(self, uri):
+        row = self._connect().execute('SELECT value FROM vary WHERE uri = ?', (uri,)).fetchone()
+        if row is None:
+            return None
+        return marshal.loads(str(row[0]))
+
+    def set_vary(self, uri, value):
+        self._write(self._set_vary, uri, value)
+
+    def _set_vary(self, connection, uri, value):
+        self._delete_uri(connection, uri)
+        connection.execute('INSERT OR REPLACE INTO vary VALUES (?, ?)', (uri, sqlite3.Binary(marshal.dumps(value))))
+
+    def delete_vary(self, uri):
+        self._write(self._delete_vary, uri)
+
+    def _delete_vary(self, connection, uri):
+        self._delete_uri(connection, uri)
+        connection.execute('DELETE FROM vary WHERE uri = ?', (uri,))
+
+    def clear(self):
+        self._write(self._clear)
+
+    def _clear(self, connection):
+        connection.execute('DELETE FROM entries')
+        connection.execute('DELETE FROM vary')
+        connection.execute('UPDATE totals SET entries = 0, size = 0 WHERE id = 0')
+
+    def __len__(self):
+        return self._connect().execute('SELECT entries FROM totals WHERE id = 0').fetchone()[0]
+
+
+class ResponseCache(object):
+    """
+    A cache of deserialized responses to GET-requests.
+
+    Responses are cached as long as their ``Cache-Control: max-age`` allows,
+    or ``default_ttl`` seconds if absent. Expired responses that have an
+    ``ETag`` or ``Last-Modified`` header are kept and revalidated with a
+    conditional request. If the server answers with ``304 Not Modified``, the
+    cached response is used again without deserializing anything.
+
+    The responses are stored in a ``CacheBackend``, in memory by default. Use a
+    ``SQLiteBackend`` to share the cache between processes.
+
+    Cached responses are shared by all callers and should be treated as
+    read-only.
+
+    >>> from restorm.clients.cache import ResponseCache
+    >>> from restorm.clients.jsonclient import JSONClient
+    >>> client = JSONClient(response_cache=ResponseCache(max_entries=1000, max_size=50 * 1024 * 1024))
+
+    """
+    def __init__(self, max_entries=1000, max_size=None, default_ttl=0, backend=None):
+        """
+        :param max_entries: The maximum number of cached responses.
+        :param max_size: The maximum total size in bytes of the raw content of
+            all cached responses.
+        :param default_ttl: The number of seconds a response is considered
+            fresh if it has no ``max-age``.
+        :param backend: The ``CacheBackend`` to store the responses in. By
+            default, a ``MemoryBackend`` with ``max_entries`` and ``max_size``.
+            A backend has its own limits, so ``max_entries`` and ``max_size``
+            cannot be passed with a backend.
+        """
+        self.default_ttl = default_ttl
+
+        if backend is None:
+            backend = MemoryBackend(max_entries=max_entries, max_size=max_size)
+        elif max_entries != 1000 or max_size is not None:
+            raise ValueError('Pass max_entries and max_size to the backend instead of the ResponseCache.')
+        self.backend = backend
+
+    def __len__(self):
+        return len(self.backend)
+
+    def _key(self, request, vary, token):
+        return repr((request.uri, token) + tuple([request.get(name) for name in vary]))
+
+    def lookup(self, request, client=None):
+        """
+        Returns the ``CacheEntry`` for the request, or ``None``. If the entry
+        was loaded from a shared backend, its response is created with
+        ``client``.
+        """
+        vary = self.backend.get_vary(request.uri)
+        if vary is None:
+            return None
+        entry = self.backend.get(self._key(request, *vary))
+        if entry is not None and entry.response is None and client is not None:
+            entry.response = client.create_response(dict(entry.headers), entry.raw_content, request)
+        return entry
+
+    def store(self, request, response):
+        """
+        Caches the response to the request, if allowed by its headers.
+        """
+        if response.status_code != 200:
+            return
+
+        cache_control = parse_cache_control(response.get('Cache-Control'))
+        if 'no-store' in cache_control:
+            return
+
+        vary = tuple(sorted([v.strip().title() for v in response.get('Vary', '').split(',') if v.strip()]))
+        if '*' in vary:
+            return
+
+        ttl = self._ttl(response, cache_control)
+        if ttl <= 0 and response.get('Etag') is None and response.get('Last-Modified') is None:
+            return
+
+        size = 0
+        if isinstance(response.raw_content, basestring):
+            size = len(response.raw_content)
+
+        # The token is part of the keys of the entries for the URI. A new
+        # token makes all previous entries unreachable.
+        current = self.backend.get_vary(request.uri)
+        if current is None or current[0] != vary:
+            current = (vary, '%016x' % random.getrandbits(64))
+            self.backend.set_vary(request.uri, current)
+
+        entry = CacheEntry(response, ttl)
+        entry.key = self._key(request, *current)
+        entry.size = size
+        self.backend.set(entry.key, entry, size)
+
+    def revalidated(self, entry, response):
+        """
+        Marks the entry as fresh again, after a ``304 Not Modified`` response.
+        """
+        entry.refresh(self._ttl(response, parse_cache_control(response.get('Cache-Control'))))
+        if entry.key is not None:
+            self.backend.set(entry.key, entry, entry.size)
+
+    def invalidate(self, uri):
+        """
+        Removes all cached responses for the URI.
+        """
+        self.backend.delete_vary(uri)
+
+    def clear(self):
+        self.backend.clear()
+
+    def _ttl(self, response, cache_control):
+        if 'no-cache' in cache_control:
+            return 0
+
+        try:
+            ttl = int(cache_control['max-age'])
+        except (KeyError, TypeError, ValueError):
+            return self.default_ttl
+
+        try:
+            ttl -= int(response.get('Age', 0))
+        except ValueError:
+            pass
+        return ttl
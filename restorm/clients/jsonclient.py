@@ -19,25 +19,192 @@ class CustomEncoder(json.JSONEncoder):
         if isinstance(o, Decimal):
             return float(o)
 
-        from restorm.rest import RestObject
-        if isinstance(o, RestObject):
+        from restorm.rest import BaseRestObject
+        if isinstance(o, BaseRestObject):
             return o._obj
 
         super(CustomEncoder, self).default(o)
 
 
+class JSONCodec(object):
+    """
+    Base class for a JSON encoder and decoder. Subclasses should set a unique
+    ``name`` and implement ``dumps`` and ``loads``.
+
+    Unless a codec says otherwise, ``loads`` should return numbers with a
+    fraction as ``Decimal`` and ``dumps`` should accept ``Decimal`` and
+    ``RestObject`` values.
+    """
+    name = None
+
+    def dumps(self, data):
+        raise NotImplementedError()
+
+    def loads(self, data):
+        raise NotImplementedError()
+
+
+class StandardCodec(JSONCodec):
+    """
+    Uses the ``json`` module in the most straightforward way. This is the
+    default codec.
+    """
+    name = 'standard'
+
+    def dumps(self, data):
+        return json.dumps(data, cls=CustomEncoder)
+
+    def loads(self, data):
+        return json.loads(data, parse_float=Decimal)
+
+
+class AcceleratedCodec(JSONCodec):
+    """
+    Reuses a single encoder and decoder of the ``json`` module, rather than
+    creating them for each call, so all work is done by its C extension.
+    """
+    name = 'accelerated'
+
+    def __init__(self):
+        self.encoder = CustomEncoder()
+        self.decoder = json.JSONDecoder(parse_float=Decimal)
+
+    def dumps(self, data):
+        return self.encoder.encode(data)
+
+    def loads(self, data):
+        return self.decoder.decode(data)
+
+
+class FloatCodec(AcceleratedCodec):
+    """
+    Returns numbers with a fraction as ``float`` rather than ``Decimal``, which
+    is considerably faster. Data without ``Decimal`` or ``RestObject`` values
+    is encoded without any Python callbacks.
+    """
+    name = 'float'
+
+    def dumps(self, data):
+        try:
+            return json.dumps(data)
+        except TypeError:
+            return super(FloatCodec, self).dumps(data)
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+def _default(o):
+    from restorm.rest import BaseRestObject
+    if isinstance(o, BaseRestObject):
+        return o._obj
+    raise TypeError('%r is not JSON serializable' % o)
+
+
+class SimpleJSONCodec(JSONCodec):
+    """
+    Uses the C extension of the third party ``simplejson`` library, which
+    supports ``Decimal`` natively.
+    """
+    name = 'simplejson'
+
+    def __init__(self):
+        import simplejson
+        self.encoder = simplejson.JSONEncoder(use_decimal=True, default=_default)
+        self.decoder = simplejson.JSONDecoder(parse_float=Decimal)
+
+    def dumps(self, data):
+        return self.encoder.encode(data)
+
+    def loads(self, data):
+        return self.decoder.decode(data)
+
+
+class UltraJSONCodec(FloatCodec):
+    """
+    Uses the third party ``ujson`` library. Like the ``float`` codec, numbers
+    with a fraction are returned as ``float``.
+    """
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self.ujson = ujson
+        super(UltraJSONCodec, self).__init__()
+
+    def dumps(self, data):
+        try:
+            return self.ujson.dumps(data)
+        except (TypeError, OverflowError):
+            return super(FloatCodec, self).dumps(data)
+
+    def loads(self, data):
+        return self.ujson.loads(data)
+
+
+# Registered codecs, by name.
+_codecs = {}
+
+
+def register_codec(codec_class):
+    """
+    Makes a ``JSONCodec`` available by its name. Codecs that depend on a
+    library that is not installed are silently skipped.
+    """
+    try:
+        _codecs[codec_class.name] = codec_class()
+    except ImportError:
+        pass
+
+
+def get_codec(name):
+    """
+    Returns the registered ``JSONCodec`` with the given name.
+    """
+    try:
+        return _codecs[name]
+    except KeyError:
+        raise ValueError('Unknown JSON codec "%s", choose from: %s' % (name, ', '.join(get_codec_names())))
+
+
+def get_codec_names():
+    """
+    Returns the sorted names of all registered codecs.
+    """
+    return sorted(_codecs.keys())
+
+
+for codec_class in (StandardCodec, AcceleratedCodec, FloatCodec, SimpleJSONCodec, UltraJSONCodec):
+    register_codec(codec_class)
+
+
 class JSONClientMixin(ClientMixin):
+    """
+    Serializes requests and deserializes responses as JSON. The JSON codec to
+    use can be changed with ``json_codec`` to the name of any registered
+    ``JSONCodec``.
+    """
     MIME_TYPE = 'application/json'
 
+    json_codec = StandardCodec.name
+
     def serialize(self, data):
         if data is None:
             return ''
-        return json.dumps(data, cls=CustomEncoder)
+        return _codecs[self.json_codec].dumps(data)
     
     def deserialize(self, data):
         if data == '':
             return None
-        return json.loads(data, parse_float=Decimal)
+        return _codecs[self.json_codec].loads(data)
+
+    def _pop_json_codec(self, kwargs):
+        """
+        Uses the codec named by the constructor argument ``json_codec``, if
+        it's in ``kwargs``, and removes the argument.
+        """
+        if 'json_codec' in kwargs:
+            self.json_codec = get_codec(kwargs.pop('json_codec')).name
 
 
 class JSONClient(BaseClient, JSONClientMixin):
@@ -45,6 +212,12 @@ class JSONClient(BaseClient, JSONClientMixin):
     Client that handles JSON requests and responses.
     """
     def __init__(self, *args, **kwargs):
+        """
+        Takes one additional argument ``json_codec``, the name of the JSON
+        codec to use. All other arguments are passed to the ``BaseClient``
+        constructor.
+        """
         if not JSON_LIBRARY_FOUND:
             raise ImportError('Could not load any known JSON library.')
+        self._pop_json_codec(kwargs)
         super(JSONClient, self).__init__(*args, **kwargs)
@@ -0,0 +1,151 @@
+"""
+Incremental extraction of the items of a JSON array.
+
+The standard ``json`` module can only parse complete documents. To process a
+large collection without holding the entire response in memory, the array is
+scanned chunk by chunk and each item is parsed as soon as it is complete.
+"""
+import re
+
+
+# Characters that are significant outside and inside strings.
+_STRUCTURE = re.compile(r'["\[\]{},:]')
+_STRING = re.compile(r'["\\]')
+
+
+def iter_items(chunks, path=None, loads=None):
+    """
+    Yields the items of a JSON array, read from an iterable of string
+    ``chunks``. At most one item and one chunk are held in memory.
+
+    :param chunks: An iterable of strings that together form a JSON document.
+    :param path: If the document is an object, the key of the array in this
+        object. If ``None``, the document itself should be an array.
+    :param loads: A function to parse the JSON text of a single item. If
+        ``None``, the raw JSON text of each item is yielded.
+
+    >>> list(iter_items(['{"count": 2, "objects": [{"id"', ': 1}, {"id": 2}]}'], 'objects'))
+    ['{"id": 1}', ' {"id": 2}']
+
+    """
+    if loads is None:
+        loads = lambda text: text
+
+    chunks = iter(chunks)
+    buf = ''
+    pos = 0
+    depth = 0
+    in_string = False
+
+    # Only used while looking for the array.
+    found = False
+    key_start = None
+    key = None
+    value_key = None
+
+    # Only used inside the array.
+    array_depth = None
+    item_start = None
+
+    while True:
+        if pos >= len(buf):
+            try:
+                chunk = chunks.next()
+            except StopIteration:
+                break
+
+            # Discard everything that was processed and is no longer needed.
+            keep = pos
+            if item_start is not None:
+                keep = item_start
+            elif key_start is not None:
+                keep = key_start
+            keep = min(keep, len(buf))
+
+            buf = buf[keep:] + chunk
+            pos -= keep
+            if item_start is not None:
+                item_start -= keep
+            if key_start is not None:
+                key_start -= keep
+            continue
+
+        if in_string:
+            match = _STRING.search(buf, pos)
+            if match is None:
+                pos = len(buf)
+                continue
+
+            index = match.start()
+            if buf[index] == '\\':
+                # Skip the escaped character, which may be in the next chunk.
+                pos = index + 2
+                continue
+
+            in_string = False
+            pos = index + 1
+            if key_start is not None:
+                key = buf[key_start:pos]
+                key_start = None
+            continue
+
+        match = _STRUCTURE.search(buf, pos)
+        if match is None:
+            pos = len(buf)
+            continue
+
+        index = match.start()
+        char = buf[index]
+        pos = index + 1
+
+        if char == '"':
+            in_string = True
+            if not found and depth == 1:
+                key_start = index
+        elif char in '[{':
+            if not found:
+                if path is None and depth == 0:
+                    if char != '[':
+                        raise ValueError('The JSON document is not an array.')
+                    found = True
+                elif path is not None and depth == 0 and char != '{':
+                    raise ValueError('The JSON document is not an object.')
+                elif path is not None and depth == 1 and value_key == path:
+                    if char != '[':
+                        raise ValueError('The JSON value of "%s" is not an array.' % path)
+                    found = True
+
+                if found:
+                    array_depth = depth + 1
+                    item_start = pos
+            depth += 1
+        elif char in ']}':
+            depth -= 1
+            if found and depth == array_depth - 1:
+                item = buf[item_start:index]
+                if item.strip():
+                    yield loads(item)
+                return
+        elif char == ',':
+            if found and depth == array_depth:
+                yield loads(buf[item_start:index])
+                item_start = pos
+            elif not found and depth == 1:
+                value_key = None
+        elif char == ':':
+            if not found and depth == 1:
+                value_key = _decode_key(key)
+
+    if found:
+        raise ValueError('The JSON document ended unexpectedly.')
+    if path is None:
+        raise ValueError('The JSON document is not an array.')
+    raise ValueError('Cannot find the array "%s" in the JSON document.' % path)
+
+
+def _decode_key(text):
+    # Keys rarely contain escapes, avoid a full JSON parse.
+    if '\\' not in text:
+        return text[1:-1]
+    from restorm.clients.jsonclient import json
+    return json.loads(text)
@@ -205,6 +205,9 @@ class MockHandler(BaseHTTPRequestHandler):
         
     def do_PUT(self):
         self.process_request('PUT')
+
+    def do_PATCH(self):
+        self.process_request('PATCH')
         
     def do_DELETE(self):
         self.process_request('DELETE')
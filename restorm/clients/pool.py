@@ -0,0 +1,221 @@
+import threading
+import time
+
+from httplib2 import iri2uri, urlnorm
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def connection_key(uri):
+    """
+    Returns the key ``httplib2`` uses to store the connection for ``uri``.
+
+    >>> connection_key('http://www.example.com/api/book/1')
+    'http:www.example.com'
+
+    """
+    scheme, authority, request_uri, defrag_uri = urlnorm(iri2uri(uri))
+    return '%s:%s' % (scheme, authority)
+
+
+class ConnectionPool(object):
+    """
+    A thread-safe pool of persistent connections, grouped per host. A single
+    pool can be shared by any number of clients and threads, so they reuse
+    each other's connections instead of each opening their own.
+
+    >>> from restorm.clients.jsonclient import JSONClient
+    >>> from restorm.clients.pool import ConnectionPool
+    >>> pool = ConnectionPool(max_per_host=10, idle_timeout=30)
+    >>> client = JSONClient(root_uri='http://www.example.com/api/', pool=pool)
+
+    """
+    def __init__(self, max_per_host=10, idle_timeout=60, checkout_timeout=None):
+        """
+        :param max_per_host: The maximum number of connections to a single
+            host. Threads wait for a connection if all are in use.
+        :param idle_timeout: Connections that were not used for this number of
+            seconds are closed.
+        :param checkout_timeout: The maximum number of seconds to wait for a
+            connection. By default, threads wait indefinitely.
+        """
+        if max_per_host < 1:
+            raise ValueError('A connection pool needs at least one connection per host.')
+
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._condition = threading.Condition()
+        # Per host, a list of ``(last_used, connection)`` tuples.
+        self._idle = {}
+        # Per host, the number of connections that are checked out.
+        self._in_use = {}
+
+        self._stats = {
+            'checkouts': 0,
+            'reused': 0,
+            'created': 0,
+            'evicted': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'max_wait_time': 0.0,
+        }
+
+    def checkout(self, key):
+        """
+        Takes an idle connection for host ``key`` from the pool. If there is
+        none but the host has less than ``max_per_host`` connections, ``None``
+        is returned and the caller should create a new connection. Otherwise,
+        the caller waits until a connection is returned to the pool.
+
+        Every checkout must be followed by a ``checkin`` or ``discard`` with
+        the same ``key``.
+        """
+        self._condition.acquire()
+        try:
+            self._evict(key, time.time())
+
+            start = None
+            while not self._idle.get(key) and self._in_use.get(key, 0) >= self.max_per_host:
+                now = time.time()
+                if start is None:
+                    start = now
+                    self._stats['waits'] += 1
+                elif self.checkout_timeout is not None and now - start >= self.checkout_timeout:
+                    self._record_wait(now - start)
+                    raise PoolTimeout('No connection to "%s" became available within %s seconds.' % (key, self.checkout_timeout))
+
+                if self.checkout_timeout is None:
+                    self._condition.wait()
+                else:
+                    self._condition.wait(self.checkout_timeout - (now - start))
+
+            if start is not None:
+                self._record_wait(time.time() - start)
+
+            self._stats['checkouts'] += 1
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+
+            idle = self._idle.get(key)
+            if idle:
+                self._stats['reused'] += 1
+                # Most recently used connections are the most likely to still
+                # be alive.
+                return idle.pop()[1]
+
+            self._stats['created'] += 1
+            return None
+        finally:
+            self._condition.release()
+
+    def checkin(self, key, connection):
+        """
+        Returns a connection, previously checked out for host ``key``, to the
+        pool.
+        """
+        self._condition.acquire()
+        try:
+            self._release(key)
+            self._idle.setdefault(key, []).append((time.time(), connection))
+            self._condition.notify()
+        finally:
+            self._condition.release()
+
+    def discard(self, key):
+        """
+        Releases a connection checkout for host ``key`` without returning a
+        connection, for example because the connection was closed.
+        """
+        self._condition.acquire()
+        try:
+            self._release(key)
+            self._condition.notify()
+        finally:
+            self._condition.release()
+
+    def add(self, key, connection):
+        """
+        Adds a connection that was not checked out to the pool, for example
+        one created while following a redirect. The connection is closed if the
+        host already has ``max_per_host`` connections.
+        """
+        self._condition.acquire()
+        try:
+            if len(self._idle.get(key, [])) + self._in_use.get(key, 0) < self.max_per_host:
+                self._idle.setdefault(key, []).append((time.time(), connection))
+                self._condition.notify()
+                return
+        finally:
+            self._condition.release()
+        connection.close()
+
+    def evict_idle(self):
+        """
+        Closes all connections that were idle for longer than
+        ``idle_timeout`` seconds.
+        """
+        self._condition.acquire()
+        try:
+            now = time.time()
+            for key in self._idle.keys():
+                self._evict(key, now)
+        finally:
+            self._condition.release()
+
+    def close(self):
+        """
+        Closes all idle connections.
+        """
+        self._condition.acquire()
+        try:
+            idle, self._idle = self._idle, {}
+        finally:
+            self._condition.release()
+
+        for connections in idle.values():
+            for last_used, connection in connections:
+                connection.close()
+
+    def stats(self):
+        """
+        Returns a ``dict`` with the number of ``checkouts`` and whether a
+        connection was ``reused`` or had to be ``created``. The number of
+        ``evicted`` idle connections is included and the number of times a
+        thread had to wait for a connection (``waits``), with the total and
+        maximum time spent waiting in seconds (``wait_time`` and
+        ``max_wait_time``).
+        """
+        self._condition.acquire()
+        try:
+            stats = dict(self._stats)
+            stats['idle'] = sum([len(v) for v in self._idle.values()])
+            stats['in_use'] = sum(self._in_use.values())
+            return stats
+        finally:
+            self._condition.release()
+
+    def _release(self, key):
+        if self._in_use.get(key, 0) > 0:
+            self._in_use[key] -= 1
+
+    def _record_wait(self, wait_time):
+        self._stats['wait_time'] += wait_time
+        self._stats['max_wait_time'] = max(self._stats['max_wait_time'], wait_time)
+
+    def _evict(self, key, now):
+        idle = self._idle.get(key)
+        if not idle or self.idle_timeout is None:
+            return
+
+        # Connections are appended when returned, so the oldest are first.
+        expired = 0
+        while expired < len(idle) and now - idle[expired][0] > self.idle_timeout:
+            idle[expired][1].close()
+            expired += 1
+
+        if expired:
+            del idle[:expired]
+            self._stats['evicted'] += expired
@@ -0,0 +1,62 @@
+import sys
+import threading
+
+from restorm.futures import Future
+
+
+class SingleFlight(object):
+    """
+    Coalesces identical calls that are made at the same time. The first caller
+    performs the call, all others that arrive while it's in progress wait for
+    and share its result.
+
+    >>> from restorm.clients.singleflight import SingleFlight
+    >>> from restorm.clients.jsonclient import JSONClient
+    >>> client = JSONClient(single_flight=SingleFlight())
+
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Returns a ``tuple`` with the result of ``func(*args, **kwargs)`` and
+        whether this result was produced for another caller. If a call with
+        the same ``key`` is in progress, its result is returned instead of
+        calling ``func``. Exceptions are raised to all callers.
+        """
+        self._lock.acquire()
+        try:
+            future = self._calls.get(key)
+            shared = future is not None
+            if not shared:
+                future = self._calls[key] = Future()
+        finally:
+            self._lock.release()
+
+        if shared:
+            return future.result(), True
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            exc_info = sys.exc_info()
+            self._forget(key)
+            future.set_exception(exc_info)
+            raise exc_info[0], exc_info[1], exc_info[2]
+
+        self._forget(key)
+        future.set_result(result)
+        return result, False
+
+    def _forget(self, key):
+        # Calls that arrive from now on are not coalesced with this one.
+        self._lock.acquire()
+        try:
+            del self._calls[key]
+        finally:
+            self._lock.release()
@@ -0,0 +1,74 @@
+import threading
+
+import mock
+from unittest2 import TestCase
+
+from restorm.clients.asyncclient import AsyncJSONClient
+from restorm.futures import Future
+
+
+class AsyncJSONClientTests(TestCase):
+    def setUp(self):
+        self.client = AsyncJSONClient(max_workers=4)
+
+    def tearDown(self):
+        self.client.close()
+
+    @mock.patch('httplib2.Http.request')
+    def test_get(self, request):
+        request.return_value = ({'Status': 200, 'Content-Type': 'application/json'}, '{"foo": "bar"}')
+        response = self.client.get(uri='http://localhost/api')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content['foo'], 'bar')
+
+    @mock.patch('httplib2.Http.request')
+    def test_get_async(self, request):
+        request.return_value = ({'Status': 200, 'Content-Type': 'application/json'}, '{"foo": "bar"}')
+        future = self.client.get_async(uri='http://localhost/api')
+
+        self.assertIsInstance(future, Future)
+        response = future.result(timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content['foo'], 'bar')
+
+    @mock.patch('httplib2.Http.request')
+    def test_many_requests_in_flight(self, request):
+        started = threading.Semaphore(0)
+        release = threading.Event()
+
+        def slow_request(*args, **kwargs):
+            started.release()
+            release.wait(5)
+            return ({'Status': 200, 'Content-Type': 'application/json'}, '{}')
+        request.side_effect = slow_request
+
+        futures = [self.client.get_async('http://localhost/api/%d' % i) for i in range(8)]
+
+        # All workers are performing a request at the same time.
+        for i in range(4):
+            started.acquire()
+        self.assertFalse(any([f.done() for f in futures]))
+
+        release.set()
+        self.assertEqual([f.result(timeout=5).status_code for f in futures], [200] * 8)
+
+    @mock.patch('httplib2.Http.request')
+    def test_exception(self, request):
+        request.side_effect = IOError('Connection refused')
+        future = self.client.post_async('http://localhost/api', {'foo': 'bar'})
+
+        self.assertRaises(IOError, future.result, 5)
+        self.assertIsInstance(future.exception(), IOError)
+
+    def test_connections_per_thread(self):
+        connection = mock.Mock()
+        self.client.connections['http:localhost'] = connection
+
+        result = []
+        thread = threading.Thread(target=lambda: result.append(dict(self.client.connections)))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(result, [{}])
+        self.assertEqual(self.client.connections, {'http:localhost': connection})
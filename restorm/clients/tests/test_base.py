@@ -0,0 +1,119 @@
+import copy
+
+import httplib2
+import mock
+from unittest2 import TestCase
+
+from restorm.clients.base import CompactRequest, CompactResponse, HeaderView, normalize_headers
+from restorm.clients.cache import ResponseCache
+from restorm.clients.jsonclient import JSONClient
+
+
+class HeaderViewTests(TestCase):
+
+    def test_case_insensitive(self):
+        headers = HeaderView({'Content-Type': 'application/json', 'cache_control': 'no-cache'})
+
+        self.assertEqual(headers['content-type'], 'application/json')
+        self.assertEqual(headers['CONTENT-TYPE'], 'application/json')
+        self.assertEqual(headers.get('Cache-Control'), 'no-cache')
+        self.assertTrue('Content-Type' in headers)
+        self.assertFalse('Etag' in headers)
+        self.assertEqual(headers.get('Etag', 'foo'), 'foo')
+        self.assertEqual(sorted(headers.keys()), ['cache-control', 'content-type'])
+
+        headers['ETag'] = '"1"'
+        self.assertEqual(headers['etag'], '"1"')
+        del headers['Etag']
+        self.assertEqual(len(headers), 2)
+
+    def test_normalized_headers_are_shared(self):
+        headers = {'content-type': 'application/json', 'status': '200'}
+        self.assertTrue(normalize_headers(headers) is headers)
+        self.assertTrue(HeaderView(headers).headers is headers)
+
+        headers = {'Content-Type': 'application/json'}
+        self.assertFalse(normalize_headers(headers) is headers)
+
+
+class CompactRequestResponseTests(TestCase):
+
+    def test_no_instance_dict(self):
+        request = CompactRequest('http://localhost/api/book/1', 'GET', headers={'Accept': 'application/json'})
+        response = CompactResponse(None, {'status': '200', 'content-type': 'application/json'}, '{}', request)
+
+        self.assertFalse(hasattr(request, '__dict__'))
+        self.assertFalse(hasattr(response, '__dict__'))
+
+    def test_attributes(self):
+        request = CompactRequest('http://localhost/api/book/1', 'GET', headers={'Accept': 'application/json'})
+        self.assertEqual(request.uri, 'http://localhost/api/book/1')
+        self.assertEqual(request.method, 'GET')
+        self.assertEqual(request.body, None)
+        self.assertEqual(request['Accept'], 'application/json')
+
+        response = CompactResponse(None, {'Status': '200', 'Content-Type': 'application/json'}, '{}', request)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse('Status' in response)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.raw_content, '{}')
+        self.assertTrue(response.request is request)
+
+    def test_headers_of_caller_unchanged(self):
+        headers = httplib2.Response({'status': '200', 'content-type': 'application/json'})
+        response = CompactResponse(None, headers, '{}', None)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(headers['status'], '200')
+        self.assertFalse(response.headers is headers)
+
+    def test_copy(self):
+        response = CompactResponse(None, {'status': '200'}, '{}', None)
+        response_copy = copy.copy(response)
+
+        self.assertEqual(response_copy.status_code, 200)
+        self.assertEqual(response_copy.content, '{}')
+
+
+class CompactJSONClient(JSONClient):
+    request_class = CompactRequest
+    response_class = CompactResponse
+
+
+class CompactClientTests(TestCase):
+
+    @mock.patch('httplib2.Http.request')
+    def test_get(self, request):
+        request.return_value = ({'status': '200', 'content-type': 'application/json', 'cache-control': 'max-age=60'}, '{"foo": "bar"}')
+        client = CompactJSONClient(response_cache=ResponseCache())
+
+        response = client.get('http://localhost/api')
+        self.assertIsInstance(response, CompactResponse)
+        self.assertIsInstance(response.request, CompactRequest)
+        self.assertEqual(response.content, {'foo': 'bar'})
+
+        # The request headers are passed to ``httplib2``.
+        self.assertEqual(dict(request.call_args[0][3].items())['accept'], 'application/json')
+
+        # Compact responses can be cached.
+        self.assertTrue(client.get('http://localhost/api') is response)
+        self.assertEqual(request.call_count, 1)
+
+
+class ClientTests(TestCase):
+
+    @mock.patch('httplib2.Http.request')
+    def test_patch(self, request):
+        request.return_value = ({'status': '204'}, '')
+        client = JSONClient()
+
+        response = client.patch('http://localhost/api/1', {'foo': 'bar'}, headers={'Content-Type': 'application/merge-patch+json'})
+        self.assertEqual(response.status_code, 204)
+
+        method, body, headers = request.call_args[0][1:4]
+        headers = dict([(k.lower(), v) for k, v in headers.items()])
+        self.assertEqual(method, 'PATCH')
+        self.assertEqual(body, '{"foo": "bar"}')
+        # The caller's ``Content-Type`` is kept.
+        self.assertEqual(headers['content-type'], 'application/merge-patch+json')
+        self.assertEqual(headers['accept'], 'application/json')
@@ -0,0 +1,289 @@
+import os
+import shutil
+import tempfile
+import time
+
+from unittest2 import TestCase
+
+from restorm.clients.cache import LRUCache, MemoryBackend, ResponseCache, SQLiteBackend, parse_cache_control
+from restorm.clients.jsonclient import JSONClientMixin
+from restorm.clients.mockclient import BaseMockApiClient
+
+
+class LRUCacheTests(TestCase):
+
+    def test_max_entries(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+
+        # The least recently used item is removed.
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_max_size(self):
+        cache = LRUCache(max_size=10)
+        cache.set('a', 1, size=4)
+        cache.set('b', 2, size=4)
+        cache.set('c', 3, size=4)
+        self.assertEqual(cache.size, 8)
+        self.assertFalse('a' in cache)
+
+        # Items larger than the cache are not stored.
+        cache.set('d', 4, size=11)
+        self.assertFalse('d' in cache)
+        self.assertEqual(cache.size, 8)
+
+    def test_peek(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.peek('a'), 1)
+        self.assertEqual(cache.peek('c'), None)
+
+        # Peeking doesn't mark the item as recently used.
+        cache.set('c', 3)
+        self.assertFalse('a' in cache)
+
+    def test_replace_and_delete(self):
+        cache = LRUCache()
+        cache.set('a', 1, size=4)
+        cache.set('a', 2, size=2)
+        self.assertEqual(cache.get('a'), 2)
+        self.assertEqual(cache.size, 2)
+
+        cache.delete('a')
+        self.assertEqual(len(cache), 0)
+
+    def test_on_evict(self):
+        evicted = []
+        cache = LRUCache(max_entries=1, max_size=10, on_evict=lambda key, value: evicted.append((key, value)))
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3, size=11)
+        cache.delete('b')
+        self.assertEqual(evicted, [('a', 1), ('c', 3)])
+        self.assertEqual(cache.size, 0)
+
+
+class CountingApiClient(BaseMockApiClient, JSONClientMixin):
+    """
+    Mock API that supports conditional requests and counts the requests it
+    receives.
+    """
+    def __init__(self, *args, **kwargs):
+        super(CountingApiClient, self).__init__(*args, **kwargs)
+        self.requests = []
+
+    def get_response_from_request(self, request):
+        self.requests.append(request)
+        response_headers, response_content = super(CountingApiClient, self).get_response_from_request(request)
+        if 'Etag' in response_headers and request.get('If-None-Match') == response_headers['Etag']:
+            return {'Status': 304, 'Etag': response_headers['Etag']}, ''
+        return response_headers, response_content
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        self.client = CountingApiClient(responses={
+            'fresh': {'GET': ({'Status': 200, 'Content-Type': 'application/json', 'Cache-Control': 'max-age=60'}, '{"foo": "bar"}')},
+            'stale': {'GET': ({'Status': 200, 'Content-Type': 'application/json', 'Cache-Control': 'max-age=0', 'Etag': '"v1"'}, '{"foo": "bar"}')},
+            'private': {'GET': ({'Status': 200, 'Content-Type': 'application/json', 'Cache-Control': 'no-store'}, '{}'),
+                        'PUT': ({'Status': 204}, '')},
+            'default': {'GET': ({'Status': 200, 'Content-Type': 'application/json'}, '{}')},
+            'vary': {'GET': ({'Status': 200, 'Content-Type': 'application/json', 'Cache-Control': 'max-age=60', 'Vary': 'Accept'}, '{}')},
+        }, root_uri='http://localhost/api/')
+        self.client.response_cache = ResponseCache()
+
+    def test_parse_cache_control(self):
+        self.assertEqual(parse_cache_control('public, max-age=60'), {'public': None, 'max-age': '60'})
+        self.assertEqual(parse_cache_control(None), {})
+
+    def test_fresh_response(self):
+        response1 = self.client.get('fresh')
+        response2 = self.client.get('fresh')
+
+        self.assertEqual(len(self.client.requests), 1)
+        self.assertTrue(response1 is response2)
+        self.assertEqual(response2.content, {'foo': 'bar'})
+
+    def test_revalidation(self):
+        response1 = self.client.get('stale')
+        response2 = self.client.get('stale')
+
+        self.assertEqual(len(self.client.requests), 2)
+        self.assertEqual(self.client.requests[1]['If-None-Match'], '"v1"')
+        # The cached response is used, nothing is deserialized again.
+        self.assertTrue(response1 is response2)
+        self.assertEqual(response2.status_code, 200)
+
+    def test_no_store(self):
+        self.client.get('private')
+        self.client.get('private')
+        self.assertEqual(len(self.client.requests), 2)
+        self.assertEqual(len(self.client.response_cache), 0)
+
+    def test_vary(self):
+        self.client.get('vary')
+        self.client.get('vary')
+        self.assertEqual(len(self.client.requests), 1)
+        self.assertEqual(self.client.response_cache.lookup(self.client.create_request('vary', 'GET')).response.status_code, 200)
+
+        request = self.client.create_request('vary', 'GET')
+        request['Accept'] = 'text/html'
+        self.assertEqual(self.client.response_cache.lookup(request), None)
+
+    def test_default_ttl(self):
+        # Without max-age and validators, nothing is cached by default.
+        self.client.get('default')
+        self.assertEqual(len(self.client.response_cache), 0)
+
+        self.client.response_cache.default_ttl = 0.05
+        self.client.get('default')
+        self.client.get('default')
+        self.assertEqual(len(self.client.requests), 2)
+
+        time.sleep(0.06)
+        self.client.get('default')
+        self.assertEqual(len(self.client.requests), 3)
+
+    def test_invalidate_on_put(self):
+        self.client.get('fresh')
+        self.client.put('fresh', {'foo': 'baz'})
+        self.client.get('fresh')
+        self.assertEqual(len(self.client.requests), 3)
+
+    def test_invalidate_all_variants(self):
+        self.client.get('vary')
+        request = self.client.create_request('vary', 'GET')
+        request['Accept'] = 'text/html'
+        self.client.response_cache.store(request, self.client.get('vary'))
+
+        self.client.response_cache.invalidate(request.uri)
+        self.assertEqual(self.client.response_cache.lookup(self.client.create_request('vary', 'GET')), None)
+        self.assertEqual(self.client.response_cache.lookup(request), None)
+        self.assertEqual(len(self.client.response_cache), 0)
+
+    def test_evicted_uris_are_forgotten(self):
+        backend = MemoryBackend(max_entries=2)
+        self.client.response_cache = ResponseCache(backend=backend)
+        self.client.get('fresh')
+        self.client.get('vary')
+        self.client.get('stale')
+
+        self.assertEqual(len(backend), 2)
+        self.assertEqual(sorted(backend._vary.keys()), ['http://localhost/api/stale', 'http://localhost/api/vary'])
+        self.assertEqual(sorted(backend._keys.keys()), ['http://localhost/api/stale', 'http://localhost/api/vary'])
+
+
+class SQLiteBackendTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.db')
+        self.client = CountingApiClient(responses={
+            'fresh': {'GET': ({'Status': 200, 'Content-Type': 'application/json', 'Cache-Control': 'max-age=60'}, '{"foo": "bar"}'),
+                      'PUT': ({'Status': 204}, '')},
+            'stale': {'GET': ({'Status': 200, 'Content-Type': 'application/json', 'Cache-Control': 'max-age=0', 'Etag': '"v1"'}, '{"foo": "bar"}')},
+            'other': {'GET': ({'Status': 200, 'Content-Type': 'application/json', 'Cache-Control': 'max-age=60'}, '{"foo": "baz"}')},
+            'vary': {'GET': ({'Status': 200, 'Content-Type': 'application/json', 'Cache-Control': 'max-age=60', 'Vary': 'Accept'}, '{}')},
+        }, root_uri='http://localhost/api/')
+        self.client.response_cache = ResponseCache(backend=SQLiteBackend(self.path))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fresh_response(self):
+        self.client.get('fresh')
+        response = self.client.get('fresh')
+
+        self.assertEqual(len(self.client.requests), 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, {'foo': 'bar'})
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_revalidation(self):
+        self.client.get('stale')
+        response = self.client.get('stale')
+
+        self.assertEqual(len(self.client.requests), 2)
+        self.assertEqual(self.client.requests[1]['If-None-Match'], '"v1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, {'foo': 'bar'})
+
+    def test_shared_between_backends(self):
+        self.client.get('fresh')
+
+        other = CountingApiClient(responses={}, root_uri='http://localhost/api/')
+        other.response_cache = ResponseCache(backend=SQLiteBackend(self.path))
+        response = other.get('fresh')
+
+        self.assertEqual(len(other.requests), 0)
+        self.assertEqual(response.content, {'foo': 'bar'})
+
+        # Invalidation is shared as well.
+        self.client.put('fresh', {'foo': 'baz'})
+        self.assertEqual(other.response_cache.lookup(other.create_request('fresh', 'GET')), None)
+
+    def test_vary(self):
+        self.client.get('vary')
+        self.assertNotEqual(self.client.response_cache.lookup(self.client.create_request('vary', 'GET')), None)
+
+        request = self.client.create_request('vary', 'GET')
+        request['Accept'] = 'text/html'
+        self.assertEqual(self.client.response_cache.lookup(request), None)
+
+    def test_max_entries(self):
+        self.client.response_cache = ResponseCache(backend=SQLiteBackend(self.path, max_entries=1))
+        self.client.get('fresh')
+        self.client.get('other')
+
+        self.assertEqual(len(self.client.response_cache), 1)
+        self.assertEqual(self.client.response_cache.lookup(self.client.create_request('fresh', 'GET')), None)
+        self.assertEqual(self.client.response_cache.lookup(self.client.create_request('other', 'GET')).raw_content, '{"foo": "baz"}')
+
+    def test_max_size(self):
+        self.client.response_cache = ResponseCache(backend=SQLiteBackend(self.path, max_size=1))
+        self.client.get('fresh')
+        self.assertEqual(len(self.client.response_cache), 0)
+
+    def test_default_limits(self):
+        backend = SQLiteBackend(self.path)
+        self.assertEqual(backend.max_entries, 10000)
+        self.assertEqual(backend.max_size, 100 * 1024 * 1024)
+
+    def test_limits_with_backend(self):
+        self.assertRaises(ValueError, ResponseCache, max_entries=10, backend=SQLiteBackend(self.path))
+        self.assertRaises(ValueError, ResponseCache, max_size=1024, backend=SQLiteBackend(self.path))
+
+    def test_invalidate_removes_entries(self):
+        self.client.get('fresh')
+        self.client.get('other')
+        self.client.put('fresh', {'foo': 'baz'})
+
+        self.assertEqual(len(self.client.response_cache), 1)
+        connection = self.client.response_cache.backend._connect()
+        self.assertEqual(connection.execute('SELECT uri FROM entries').fetchall(), [('http://localhost/api/other',)])
+        self.assertEqual(connection.execute('SELECT size FROM totals').fetchone(), connection.execute('SELECT SUM(size) FROM entries').fetchone())
+
+    def test_changed_vary_removes_entries(self):
+        backend = self.client.response_cache.backend
+        self.client.get('fresh')
+        backend.set_vary('http://localhost/api/fresh', (('Accept',), 'token'))
+
+        self.assertEqual(len(backend), 0)
+        self.assertEqual(backend.get_vary('http://localhost/api/fresh'), (('Accept',), 'token'))
+
+    def test_clear(self):
+        self.client.get('fresh')
+        self.client.get('other')
+        self.client.response_cache.clear()
+
+        self.assertEqual(len(self.client.response_cache), 0)
+        self.client.get('fresh')
+        self.assertEqual(len(self.client.requests), 3)
@@ -3,7 +3,8 @@ from decimal import Decimal
 import mock
 from unittest2 import TestCase
 
-from restorm.clients.jsonclient import JSONClient, JSONClientMixin
+from restorm.clients.jsonclient import JSONClient, JSONClientMixin, get_codec, get_codec_names
+from restorm.rest import RestObject
 
 
 class JSONClientTests(TestCase):
@@ -60,3 +61,42 @@ class JSONClientMixinTests(TestCase):
         
         deserialized_data = self.mixin.deserialize(serialized_data)
         self.assertEqual(original_data, deserialized_data)
+
+
+class JSONCodecTests(TestCase):
+    def test_default_codec(self):
+        self.assertEqual(JSONClientMixin.json_codec, 'standard')
+
+    def test_builtin_codecs(self):
+        for name in ('standard', 'accelerated', 'float'):
+            self.assertEqual(get_codec(name).name, name)
+
+    def test_codec_names(self):
+        names = get_codec_names()
+        self.assertEqual(names, sorted(names))
+        for name in ('standard', 'accelerated', 'float'):
+            self.assertTrue(name in names)
+
+    def test_unknown_codec(self):
+        self.assertRaises(ValueError, get_codec, 'foobar')
+        self.assertRaises(ValueError, JSONClient, json_codec='foobar')
+
+    def test_client_codec(self):
+        client = JSONClient(json_codec='float')
+        self.assertEqual(client.json_codec, 'float')
+        self.assertEqual(client.deserialize('{"a": 2.5}'), {'a': 2.5})
+        self.assertEqual(JSONClient().deserialize('{"a": 2.5}'), {'a': Decimal('2.5')})
+
+    def test_round_trip(self):
+        original_data = {'a': ['b', 'c', 1, Decimal('2.5')], 'd': RestObject({'e': None})}
+        for codec in map(get_codec, get_codec_names()):
+            serialized_data = codec.dumps(original_data)
+            deserialized_data = codec.loads(serialized_data)
+
+            self.assertEqual(deserialized_data['a'][:3], ['b', 'c', 1], codec.name)
+            self.assertEqual(deserialized_data['d'], {'e': None}, codec.name)
+            if codec.name in ('float', 'ujson'):
+                self.assertIsInstance(deserialized_data['a'][3], float)
+            else:
+                self.assertIsInstance(deserialized_data['a'][3], Decimal)
+            self.assertEqual(deserialized_data['a'][3], 2.5, codec.name)
@@ -0,0 +1,176 @@
+import base64
+import json
+import threading
+
+from unittest2 import TestCase
+
+from restorm.clients.jsonclient import JSONClient
+from restorm.clients.jsonstream import iter_items
+from restorm.clients.mockclient import MockHandler
+from restorm.clients.pool import ConnectionPool
+from restorm.examples.mock.api import LibraryApiClient
+from restorm.exceptions import RestServerException
+from restorm.resource import Resource
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class IterItemsTests(TestCase):
+
+    def test_array(self):
+        data = [1, {'a': [2, 3]}, 'x', None, []]
+        text = json.dumps(data)
+        for size in range(1, len(text) + 1):
+            self.assertEqual(list(iter_items(chunked(text, size), loads=json.loads)), data)
+
+    def test_path(self):
+        data = {
+            'meta': {'next': 'http://localhost/api/book/?page=2', 'items': [1]},
+            'objects': [{'title': 'A "quoted" ] title, with {braces}'}, {'title': u'\u2603'}],
+            'count': 2,
+        }
+        text = json.dumps(data)
+        for size in range(1, len(text) + 1):
+            self.assertEqual(list(iter_items(chunked(text, size), 'objects', json.loads)), data['objects'])
+
+    def test_raw_text(self):
+        self.assertEqual(list(iter_items(['[{"id": 1},', '{"id": 2}]'])), ['{"id": 1}', '{"id": 2}'])
+
+    def test_empty(self):
+        self.assertEqual(list(iter_items(['[ ]'])), [])
+        self.assertEqual(list(iter_items(['{"objects": []}'], 'objects')), [])
+
+    def test_errors(self):
+        self.assertRaises(ValueError, list, iter_items(['{}']))
+        self.assertRaises(ValueError, list, iter_items(['[]'], 'objects'))
+        self.assertRaises(ValueError, list, iter_items(['{"objects": {}}'], 'objects'))
+        self.assertRaises(ValueError, list, iter_items(['{"other": []}'], 'objects'))
+        self.assertRaises(ValueError, list, iter_items(['[1, 2']))
+
+    def test_bounded_buffer(self):
+        # Only the current item is kept, not the items before it.
+        consumed = []
+
+        def chunks():
+            yield '['
+            for i in range(1000):
+                consumed.append(i)
+                yield '{"id": %d},' % i
+            yield '{"id": 1000}]'
+
+        for item in iter_items(chunks(), loads=json.loads):
+            # The scanner reads ahead at most one chunk.
+            self.assertTrue(len(consumed) - item['id'] <= 2)
+
+
+class QuietHandler(MockHandler):
+    mock_api = LibraryApiClient()
+
+    def log_message(self, *args):
+        pass
+
+
+class StreamingHandler(QuietHandler):
+    """
+    Adds URIs that need authentication, redirect or fail to the mock API.
+    """
+    def do_GET(self):
+        if self.path.startswith('/api/private/'):
+            if self.headers.get('Authorization') != 'Basic %s' % base64.b64encode('user:secret'):
+                self.send_response(401)
+                self.send_header('WWW-Authenticate', 'Basic realm="api"')
+                self.end_headers()
+                return
+            self.path = self.path.replace('/private/', '/', 1)
+        elif self.path == '/api/moved/':
+            self.send_response(302)
+            self.send_header('Location', '/api/author/')
+            self.end_headers()
+            return
+        elif self.path == '/api/error/':
+            self.send_response(500)
+            self.send_header('Content-Type', 'text/plain')
+            self.end_headers()
+            self.wfile.write('x' * 100000)
+            return
+        QuietHandler.do_GET(self)
+
+
+class StreamingClientTests(TestCase):
+
+    def setUp(self):
+        self.server = QuietHandler.mock_api.create_server('127.0.0.1', 0, StreamingHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+        self.root_uri = 'http://127.0.0.1:%d/api/' % self.server.server_address[1]
+
+        class Author(Resource):
+            class Meta:
+                list = (r'^author/$', 'author_set')
+        self.Author = Author
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_stream(self):
+        client = JSONClient(root_uri=self.root_uri)
+        response, chunks = client.stream('author/', chunk_size=16)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, None)
+
+        chunks = list(chunks)
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(json.loads(''.join(chunks))['author_set'][0]['name'], 'Mark Pilgrim')
+
+    def test_iterate(self):
+        pool = ConnectionPool()
+        client = JSONClient(root_uri=self.root_uri, pool=pool)
+
+        authors = list(self.Author.objects.iterate(client=client))
+        self.assertEqual([a['name'] for a in authors], ['Mark Pilgrim', 'Jacob Kaplan-Moss'])
+        self.assertEqual(authors, self.Author.objects.all(client=client))
+
+        # The connection was returned to the pool.
+        self.assertEqual(pool.stats()['in_use'], 0)
+
+    def test_stream_with_credentials(self):
+        client = JSONClient(root_uri=self.root_uri)
+        response, chunks = client.stream('private/author/')
+        self.assertEqual(response.status_code, 401)
+
+        client.add_credentials('user', 'secret')
+        response, chunks = client.stream('private/author/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(''.join(chunks))['author_set'][0]['name'], 'Mark Pilgrim')
+
+    def test_stream_redirect(self):
+        pool = ConnectionPool()
+        client = JSONClient(root_uri=self.root_uri, pool=pool)
+        response, chunks = client.stream('moved/', chunk_size=16)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.request.uri, self.root_uri + 'author/')
+        self.assertEqual(json.loads(''.join(chunks))['author_set'][0]['name'], 'Mark Pilgrim')
+        self.assertEqual(pool.stats()['in_use'], 0)
+
+    def test_iterate_error(self):
+        class Error(Resource):
+            class Meta:
+                list = r'^error/$'
+
+        pool = ConnectionPool()
+        client = JSONClient(root_uri=self.root_uri, pool=pool)
+        try:
+            list(Error.objects.iterate(client=client))
+        except RestServerException, e:
+            # Only the start of the content is read.
+            self.assertTrue(len(str(e)) < 2000)
+        else:
+            self.fail('RestServerException not raised.')
+        self.assertEqual(pool.stats()['in_use'], 0)
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import httplib2
+import mock
+from unittest2 import TestCase
+
+from restorm.clients.jsonclient import JSONClient
+from restorm.clients.pool import ConnectionPool, PoolTimeout, connection_key
+
+
+class ConnectionPoolTests(TestCase):
+    def setUp(self):
+        self.pool = ConnectionPool(max_per_host=2, idle_timeout=60)
+
+    def test_connection_key(self):
+        self.assertEqual(connection_key('http://www.example.com/api/book/1'), 'http:www.example.com')
+        self.assertEqual(connection_key('https://www.example.com:8443/'), 'https:www.example.com:8443')
+
+    def test_reuse(self):
+        self.assertEqual(self.pool.checkout('http:localhost'), None)
+        connection = mock.Mock()
+        self.pool.checkin('http:localhost', connection)
+
+        self.assertEqual(self.pool.checkout('http:localhost'), connection)
+
+        stats = self.pool.stats()
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(stats['reused'], 1)
+        self.assertEqual(stats['in_use'], 1)
+        self.assertEqual(stats['idle'], 0)
+
+    def test_max_per_host(self):
+        self.pool.checkout('http:localhost')
+        self.pool.checkout('http:localhost')
+
+        # Other hosts are not affected.
+        self.assertEqual(self.pool.checkout('http:example.com'), None)
+
+        connection = mock.Mock()
+        result = []
+        thread = threading.Thread(target=lambda: result.append(self.pool.checkout('http:localhost')))
+        thread.start()
+
+        time.sleep(0.05)
+        self.assertEqual(result, [])
+
+        self.pool.checkin('http:localhost', connection)
+        thread.join(5)
+        self.assertEqual(result, [connection])
+
+        stats = self.pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertTrue(stats['wait_time'] > 0)
+        self.assertEqual(stats['wait_time'], stats['max_wait_time'])
+
+    def test_checkout_timeout(self):
+        pool = ConnectionPool(max_per_host=1, checkout_timeout=0.01)
+        pool.checkout('http:localhost')
+        self.assertRaises(PoolTimeout, pool.checkout, 'http:localhost')
+
+        # A discarded checkout frees its slot.
+        pool.discard('http:localhost')
+        self.assertEqual(pool.checkout('http:localhost'), None)
+
+    def test_idle_eviction(self):
+        pool = ConnectionPool(max_per_host=2, idle_timeout=0)
+        connection = mock.Mock()
+        pool.checkout('http:localhost')
+        pool.checkin('http:localhost', connection)
+
+        time.sleep(0.01)
+        pool.evict_idle()
+
+        self.assertTrue(connection.close.called)
+        self.assertEqual(pool.stats()['evicted'], 1)
+        self.assertEqual(pool.checkout('http:localhost'), None)
+
+    def test_add(self):
+        connections = [mock.Mock() for i in range(3)]
+        for connection in connections:
+            self.pool.add('http:localhost', connection)
+
+        self.assertEqual(self.pool.stats()['idle'], 2)
+        self.assertTrue(connections[2].close.called)
+
+
+class PooledClientTests(TestCase):
+    def setUp(self):
+        self.pool = ConnectionPool(max_per_host=2)
+
+    @mock.patch.object(httplib2.Http, 'request', autospec=True)
+    def test_clients_share_connections(self, request):
+        seen = []
+
+        def fake_request(http, uri, *args, **kwargs):
+            # Simulate ``httplib2`` creating a connection if there is none.
+            seen.append(http.connections.get('http:localhost'))
+            http.connections.setdefault('http:localhost', mock.Mock())
+            return ({'Status': 200, 'Content-Type': 'application/json'}, '{}')
+        request.side_effect = fake_request
+
+        client1 = JSONClient(pool=self.pool)
+        client2 = JSONClient(pool=self.pool)
+
+        client1.get('http://localhost/api/book/1')
+        client2.get('http://localhost/api/book/2')
+
+        self.assertEqual(seen[0], None)
+        self.assertTrue(seen[1] is not None)
+        self.assertEqual(client1.connections, {})
+        self.assertEqual(self.pool.stats()['reused'], 1)
+        self.assertEqual(self.pool.stats()['idle'], 1)
+
+    @mock.patch.object(httplib2.Http, 'request', autospec=True)
+    def test_failed_request(self, request):
+        connection = mock.Mock()
+        self.pool.checkin('http:localhost', connection)
+
+        request.side_effect = IOError('Connection reset by peer')
+        client = JSONClient(pool=self.pool)
+        self.assertRaises(IOError, client.get, 'http://localhost/api/book/1')
+
+        # The connection is closed and not returned to the pool.
+        self.assertTrue(connection.close.called)
+        stats = self.pool.stats()
+        self.assertEqual(stats['idle'], 0)
+        self.assertEqual(stats['in_use'], 0)
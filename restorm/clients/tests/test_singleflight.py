@@ -0,0 +1,79 @@
+import threading
+import time
+
+from unittest2 import TestCase
+
+from restorm.clients.jsonclient import JSONClientMixin
+from restorm.clients.mockclient import BaseMockApiClient
+from restorm.clients.singleflight import SingleFlight
+
+
+class SingleFlightTests(TestCase):
+
+    def test_single_caller(self):
+        group = SingleFlight()
+        self.assertEqual(group.do('key', sum, [1, 2]), (3, False))
+        self.assertEqual(len(group), 0)
+
+    def test_exception(self):
+        group = SingleFlight()
+        self.assertRaises(ValueError, group.do, 'key', int, 'x')
+        self.assertEqual(len(group), 0)
+
+
+class SlowApiClient(BaseMockApiClient, JSONClientMixin):
+    """
+    Mock API that blocks all requests until it is released.
+    """
+    def __init__(self, *args, **kwargs):
+        super(SlowApiClient, self).__init__(*args, **kwargs)
+        self.requests = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def get_response_from_request(self, request):
+        self.requests.append(request)
+        self.started.set()
+        self.release.wait(5)
+        return super(SlowApiClient, self).get_response_from_request(request)
+
+
+class CoalescedClientTests(TestCase):
+
+    def setUp(self):
+        self.client = SlowApiClient(responses={
+            'author/1': {'GET': ({'Status': 200, 'Content-Type': 'application/json'}, '{"name": "Mark Pilgrim"}')},
+        }, root_uri='http://localhost/api/')
+        self.client.single_flight = SingleFlight()
+
+    def test_concurrent_gets(self):
+        responses = []
+
+        def get():
+            responses.append(self.client.get('author/1'))
+
+        threads = [threading.Thread(target=get) for i in range(5)]
+        threads[0].start()
+        self.client.started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+
+        # Give the other threads time to join the request in progress.
+        time.sleep(0.1)
+        self.client.release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(self.client.requests), 1)
+        self.assertEqual(len(responses), 5)
+        self.assertEqual(len(set([id(r) for r in responses])), 5)
+        self.assertEqual(len(set([id(r.content) for r in responses])), 5)
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, {'name': 'Mark Pilgrim'})
+
+    def test_sequential_gets(self):
+        self.client.release.set()
+        self.client.get('author/1')
+        self.client.get('author/1')
+        self.assertEqual(len(self.client.requests), 2)
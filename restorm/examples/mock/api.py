@@ -210,7 +210,8 @@ class TicketApiClient(BaseMockApiClient, JSONClientMixin):
                         'description': 'This needs more work.',
                     })
                 ),
-                'PUT': ({'Status': 204, 'Content-Type': 'application/json'}, json.dumps(''))
+                'PUT': ({'Status': 204, 'Content-Type': 'application/json'}, json.dumps('')),
+                'PATCH': ({'Status': 204, 'Content-Type': 'application/json'}, json.dumps(''))
             },
         }
         super(TicketApiClient, self).__init__(responses=responses, root_uri=root_uri)
@@ -0,0 +1,218 @@
+"""
+A minimal implementation of futures and a bounded pool of worker threads.
+
+RestORM runs on Python versions that ship neither ``concurrent.futures`` nor
+``asyncio``. This module contains the small subset RestORM needs to perform
+requests concurrently.
+"""
+import sys
+import threading
+import Queue
+
+
+class TimeoutError(Exception):
+    pass
+
+
+class Future(object):
+    """
+    Holds the result of a call that is performed in another thread.
+
+    >>> from restorm.futures import WorkerPool
+    >>> pool = WorkerPool(max_workers=2)
+    >>> future = pool.submit(sum, [1, 2, 3])
+    >>> future.result()
+    6
+
+    """
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._done = False
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+
+    def done(self):
+        """
+        Returns ``True`` if the call has finished.
+        """
+        return self._done
+
+    def _wait(self, timeout=None):
+        self._condition.acquire()
+        try:
+            if not self._done:
+                self._condition.wait(timeout)
+            if not self._done:
+                raise TimeoutError('The result was not available within %s seconds.' % timeout)
+        finally:
+            self._condition.release()
+
+    def result(self, timeout=None):
+        """
+        Returns the result of the call, waiting at most ``timeout`` seconds for
+        it. If the call raised an exception, that exception is raised here
+        with its original traceback.
+        """
+        self._wait(timeout)
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+    def exception(self, timeout=None):
+        """
+        Returns the exception raised by the call, or ``None`` if the call
+        completed without raising.
+        """
+        self._wait(timeout)
+        if self._exc_info is not None:
+            return self._exc_info[1]
+        return None
+
+    def add_done_callback(self, func):
+        """
+        Calls ``func`` with this future as only argument once the call has
+        finished. If it already has, ``func`` is called immediately.
+        """
+        self._condition.acquire()
+        try:
+            if not self._done:
+                self._callbacks.append(func)
+                return
+        finally:
+            self._condition.release()
+        func(self)
+
+    def set_result(self, result):
+        self._finish(result, None)
+
+    def set_exception(self, exc_info):
+        """
+        Marks the call as failed. Expects the ``tuple`` as returned by
+        ``sys.exc_info()`` to preserve the traceback.
+        """
+        self._finish(None, exc_info)
+
+    def _finish(self, result, exc_info):
+        self._condition.acquire()
+        try:
+            self._result = result
+            self._exc_info = exc_info
+            self._done = True
+            callbacks, self._callbacks = self._callbacks, []
+            self._condition.notifyAll()
+        finally:
+            self._condition.release()
+
+        for func in callbacks:
+            func(self)
+
+    @classmethod
+    def from_call(cls, func, *args, **kwargs):
+        """
+        Performs the call in the current thread and returns a finished future.
+        """
+        future = cls()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception:
+            future.set_exception(sys.exc_info())
+        return future
+
+
+class WorkerPool(object):
+    """
+    A pool of at most ``max_workers`` daemon threads that perform submitted
+    calls in the order they were submitted. Threads are only started when
+    there is work for them.
+    """
+    def __init__(self, max_workers=10):
+        if max_workers < 1:
+            raise ValueError('A worker pool needs at least one worker.')
+
+        self.max_workers = max_workers
+
+        self._queue = Queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._idle = 0
+        self._shutdown = False
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedules ``func(*args, **kwargs)`` and returns a ``Future``.
+        """
+        future = Future()
+
+        self._lock.acquire()
+        try:
+            if self._shutdown:
+                raise RuntimeError('Cannot submit calls after the pool was shut down.')
+            self._queue.put((future, func, args, kwargs))
+            # Only start another thread if the idle ones cannot keep up.
+            if self._queue.qsize() > self._idle and len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work)
+                thread.setDaemon(True)
+                self._threads.append(thread)
+                thread.start()
+        finally:
+            self._lock.release()
+
+        return future
+
+    def map(self, func, iterable):
+        """
+        Submits ``func`` for each item in ``iterable`` and returns a ``list``
+        of futures, in the same order.
+        """
+        return [self.submit(func, item) for item in iterable]
+
+    def shutdown(self, wait=True):
+        """
+        Stops all threads after they finished the calls already submitted.
+        """
+        self._lock.acquire()
+        try:
+            self._shutdown = True
+            threads = list(self._threads)
+            for thread in threads:
+                self._queue.put(None)
+        finally:
+            self._lock.release()
+
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _set_idle(self, delta):
+        self._lock.acquire()
+        try:
+            self._idle += delta
+        finally:
+            self._lock.release()
+
+    def _work(self):
+        while True:
+            self._set_idle(1)
+            item = self._queue.get()
+            self._set_idle(-1)
+            if item is None:
+                return
+
+            future, func, args, kwargs = item
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                future.set_exception(sys.exc_info())
+            else:
+                future.set_result(result)
+            # Drop references before blocking on the next item.
+            del item, future, func, args, kwargs
+
+
+def wait(futures, timeout=None):
+    """
+    Waits until all ``futures`` are finished and returns their results in the
+    same order. The first exception encountered is raised.
+    """
+    return [future.result(timeout) for future in futures]
@@ -0,0 +1,155 @@
+"""
+Hooks to instrument requests, for example to export latency histograms.
+
+Register an object with any of the methods ``on_request_start``,
+``on_response`` and ``on_error``. Nothing is measured while no hooks are
+registered.
+
+>>> from restorm import instrumentation
+>>> class LatencyHook(instrumentation.Hook):
+...     def on_response(self, request, response, timings):
+...         print request.uri, timings
+...
+>>> instrumentation.register(LatencyHook())
+>>> book = Book.objects.get(isbn=1)
+http://www.example.com/api/book/1 {'url': 2.1e-05, 'serialize': 6.9e-06, 'network': 0.0213, 'deserialize': 4.6e-05, 'restify': 3.1e-05}
+
+The timings are in seconds and can contain the following phases:
+
+* ``url``: Building the URL from the resource URL pattern.
+* ``serialize``: Creating the request, including serializing its body.
+* ``network``: Performing the HTTP-request.
+* ``deserialize``: Creating the response, including deserializing its content.
+* ``restify``: Creating the resource from the response content.
+
+The ``url`` and ``restify`` phases are only measured for requests made by a
+resource manager.
+
+Exceptions raised by hooks are logged and don't affect the request.
+"""
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+hooks = []
+
+_local = threading.local()
+
+
+class Hook(object):
+    """
+    Base class for hooks. Subclasses can override any of its methods.
+    """
+    def on_request_start(self, request):
+        """
+        Called right before the HTTP-request is performed.
+        """
+        pass
+
+    def on_response(self, request, response, timings):
+        """
+        Called when the response is processed.
+        """
+        pass
+
+    def on_error(self, request, exception, timings):
+        """
+        Called when the HTTP-request raised an exception.
+        """
+        pass
+
+
+def register(hook):
+    hooks.append(hook)
+
+
+def unregister(hook):
+    hooks.remove(hook)
+
+
+def _call(name, *args):
+    for hook in hooks:
+        method = getattr(hook, name, None)
+        if method is not None:
+            try:
+                method(*args)
+            except Exception:
+                logger.exception('Instrumentation hook %r failed in %s.', hook, name)
+
+
+class Trace(object):
+    """
+    Collects the timings of a single request.
+    """
+    def __init__(self, owned_by_client=False):
+        self.owned_by_client = owned_by_client
+        self.timings = {}
+        self.request = None
+        self.response = None
+        self._last = time.time()
+
+    def mark(self):
+        self._last = time.time()
+
+    def lap(self, phase):
+        """
+        Records the time since the last mark as ``phase``, and marks again.
+        """
+        now = time.time()
+        self.timings[phase] = now - self._last
+        self._last = now
+
+    def request_start(self, request):
+        self.request = request
+        _call('on_request_start', request)
+        self.mark()
+
+    def request_error(self, exception):
+        self.lap('network')
+        _call('on_error', self.request, exception, self.timings)
+
+    def response_received(self, response):
+        self.response = response
+        if self.owned_by_client:
+            _call('on_response', self.request, response, self.timings)
+
+
+def begin():
+    """
+    Starts a trace for a request made by a resource manager, if any hooks are
+    registered and no trace is in progress. Returns the ``Trace`` or ``None``.
+    """
+    if not hooks or getattr(_local, 'trace', None) is not None:
+        return None
+    trace = _local.trace = Trace()
+    return trace
+
+
+def end(trace):
+    """
+    Ends a trace started with ``begin`` and calls the ``on_response`` hooks if
+    a response was received.
+    """
+    if trace is None:
+        return
+    _local.trace = None
+    if trace.response is not None:
+        _call('on_response', trace.request, trace.response, trace.timings)
+
+
+def attach():
+    """
+    Returns the ``Trace`` a client should record its timings in: the trace
+    started by a resource manager if it isn't used yet, or a new trace. Returns
+    ``None`` if no hooks are registered.
+    """
+    if not hooks:
+        return None
+    trace = getattr(_local, 'trace', None)
+    if trace is not None and trace.request is None:
+        trace.mark()
+        return trace
+    return Trace(owned_by_client=True)
@@ -0,0 +1,305 @@
+"""
+Lazy, chainable queries on the list of a resource.
+
+>>> books = Book.objects.filter(author=1)
+>>> books.count()
+42
+>>> for book in books[20:40]:
+...     print book.data['title']
+
+No request is performed until the objects are needed. Large lists are
+retrieved page by page, and the next page is retrieved in the background
+while the current page is processed.
+"""
+import re
+import urlparse
+
+from restorm.exceptions import RestServerException
+from restorm.futures import WorkerPool
+
+
+# Retrieves the next pages of all querysets in the background.
+_prefetch_workers = WorkerPool(max_workers=10)
+
+_LINK = re.compile(r'<([^>]*)>\s*((?:;\s*[^;,]*)*)')
+_LINK_REL = re.compile(r';\s*rel\s*=\s*"?([^";,]*)"?')
+
+
+def parse_link_header(value):
+    """
+    Returns the links of an RFC 5988 ``Link`` header as ``dict``, by relation
+    type.
+
+    >>> parse_link_header('<http://www.example.com/api/book/?page=2>; rel="next"')
+    {'next': 'http://www.example.com/api/book/?page=2'}
+
+    """
+    links = {}
+    if not value:
+        return links
+
+    for url, params in _LINK.findall(value):
+        match = _LINK_REL.search(params)
+        if match is not None:
+            for rel in match.group(1).split():
+                links[rel.lower()] = url
+    return links
+
+
+class QuerySet(object):
+    """
+    The objects in the list of a resource, retrieved when they are needed.
+
+    Querysets are created with ``ResourceManager.query`` or
+    ``ResourceManager.filter``. Each method that refines the query returns a
+    new ``QuerySet``.
+
+    If the ``Meta`` class of the resource has a ``page_size``, the list is
+    retrieved page by page, with the query string arguments ``page_param``
+    and ``limit_param``. If a response has a ``Link`` header with a ``next``
+    relation, the next page is retrieved from that URL instead. Without it,
+    the next page is retrieved as long as pages are full, and a ``404 Not
+    Found`` response for it ends the list.
+    """
+    def __init__(self, manager, client, query=None, **kwargs):
+        """
+        :param manager: The ``ResourceManager`` of the resource.
+        :param client: The client to retrieve the objects with.
+        :param query: A ``dict`` with additional query string arguments.
+        :param kwargs: The arguments of the resource URL pattern ``list``.
+        """
+        self.manager = manager
+        self.client = client
+        self.query = dict(query or {})
+        self.kwargs = kwargs
+
+        self.start = 0
+        self.stop = None
+        self.prefetch = True
+        self.related_lookups = ()
+
+        self._result_cache = None
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.get_absolute_url())
+
+    def _clone(self):
+        clone = self.__class__(self.manager, self.client, self.query, **self.kwargs)
+        clone.start = self.start
+        clone.stop = self.stop
+        clone.prefetch = self.prefetch
+        clone.related_lookups = self.related_lookups
+        return clone
+
+    def filter(self, **params):
+        """
+        Returns a new ``QuerySet`` with the given query string arguments.
+
+        .. sourcecode:: python
+
+            >>> Book.objects.query().filter(author=1, published__gte=2010)
+
+        """
+        clone = self._clone()
+        clone.query.update(params)
+        return clone
+
+    def prefetch_related(self, *lookups):
+        """
+        Returns a new ``QuerySet`` that retrieves the related resources in the
+        given fields of the objects on each page concurrently.
+
+        .. sourcecode:: python
+
+            >>> Book.objects.query().prefetch_related('author', 'publisher__address')
+
+        """
+        clone = self._clone()
+        clone.related_lookups = self.related_lookups + lookups
+        return clone
+
+    def get_absolute_url(self, **params):
+        """
+        Returns the URL of the list, including the query string arguments of
+        this queryset and ``params``.
+        """
+        query = dict(self.query)
+        query.update(params)
+        return self.manager.options.router.list.get_absolute_url(root=self.manager.options.root, query=query, **self.kwargs)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step is not None:
+                raise ValueError('Slicing a queryset with a step is not supported.')
+            if (key.start is not None and key.start < 0) or (key.stop is not None and key.stop < 0):
+                raise ValueError('Negative indexing of a queryset is not supported.')
+
+            if self._result_cache is not None:
+                return self._result_cache[key]
+
+            clone = self._clone()
+            if key.start is not None:
+                clone.start = self.start + key.start
+            if key.stop is not None:
+                clone.stop = self.start + key.stop
+                if self.stop is not None:
+                    clone.stop = min(clone.stop, self.stop)
+                clone.start = min(clone.start, clone.stop)
+            return clone
+
+        if key < 0:
+            raise ValueError('Negative indexing of a queryset is not supported.')
+        if self._result_cache is not None:
+            return self._result_cache[key]
+
+        result = list(self[key:key + 1].iterator())
+        if not result:
+            raise IndexError('Queryset index out of range.')
+        return result[0]
+
+    def __iter__(self):
+        self._fetch_all()
+        return iter(self._result_cache)
+
+    def __len__(self):
+        self._fetch_all()
+        return len(self._result_cache)
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            self._result_cache = list(self.iterator())
+
+    def count(self):
+        """
+        Returns the number of objects, without retrieving them if possible.
+
+        If the ``Meta`` class of the resource has a ``count`` URL pattern, the
+        number is retrieved from this URL. Otherwise, a HEAD-request for the
+        list is performed and the number is read from the ``count_header``
+        (``X-Total-Count`` by default). If neither provides the number, all
+        objects are retrieved and counted.
+        """
+        if self._result_cache is not None:
+            return len(self._result_cache)
+
+        total = self._get_total()
+        if total is None:
+            return len(list(self.iterator()))
+
+        total = max(total - self.start, 0)
+        if self.stop is not None:
+            total = min(total, self.stop - self.start)
+        return total
+
+    def _get_total(self):
+        options = self.manager.options
+
+        if options.router.count.pattern:
+            rp = options.router.count
+            response = self.client.get(rp.get_absolute_url(root=options.root, query=self.query, **self.kwargs))
+            if response.status_code != 200:
+                raise RestServerException('Cannot get "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
+            return int(rp.clean(response))
+
+        response = self.client.head(self.get_absolute_url())
+        if response.status_code != 200:
+            return None
+        try:
+            return int(response[options.count_header.title()])
+        except (KeyError, ValueError):
+            return None
+
+    def iterator(self):
+        """
+        Yields the objects one page at a time, without caching them. While the
+        objects of a page are processed, the next page is retrieved in the
+        background, unless ``prefetch`` is ``False``.
+        """
+        options = self.manager.options
+
+        # Map the slice to pages.
+        limit = options.page_size
+        if limit is None and self.stop is not None:
+            limit = self.stop - self.start
+        if limit == 0:
+            return
+
+        if limit is None:
+            page = None
+            skip = self.start
+        else:
+            page = self.start // limit + 1
+            skip = self.start % limit
+
+        remaining = None
+        if self.stop is not None:
+            remaining = self.stop - self.start
+
+        url = self._get_page_url(page, limit)
+        expected = False
+        future = None
+        while url is not None:
+            if future is not None:
+                items, next_url = future.result()
+            else:
+                items, next_url = self._get_page(url, expected)
+
+            # Without a ``Link`` header, the next page is expected as long as
+            # pages are full.
+            next_expected = False
+            if next_url is None and page is not None and len(items) == limit:
+                page += 1
+                next_url = self._get_page_url(page, limit)
+                next_expected = True
+            if remaining is not None and remaining <= len(items) - skip:
+                next_url = None
+
+            future = None
+            if next_url is not None and self.prefetch:
+                future = _prefetch_workers.submit(self._get_page, next_url, next_expected)
+
+            items = items[skip:]
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+
+            objects = [self.manager.object_class(item, client=self.client) for item in items]
+            if self.related_lookups:
+                from restorm.resource import prefetch_related
+                prefetch_related(objects, self.related_lookups)
+
+            for obj in objects:
+                yield obj
+
+            skip = 0
+            url = next_url
+            expected = next_expected
+
+    def _get_page_url(self, page, limit):
+        if page is None:
+            return self.get_absolute_url()
+        options = self.manager.options
+        return self.get_absolute_url(**{options.page_param: page, options.limit_param: limit})
+
+    def _get_page(self, url, expected=False):
+        """
+        Returns the items on the page and the URL of the next page, if the
+        response has a ``Link`` header for it.
+
+        If the page is only ``expected`` to exist, because the previous page
+        was full, a ``404 Not Found`` response means the list has ended.
+        """
+        from restorm.resource import VALID_GET_STATUS_RESPONSES
+
+        response = self.client.get(url)
+        if response.status_code == 404 and expected:
+            return [], None
+        if response.status_code not in VALID_GET_STATUS_RESPONSES:
+            raise RestServerException('Cannot get "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
+
+        items = self.manager.options.router.list.clean(response)
+
+        next_url = parse_link_header(response.get('Link')).get('next')
+        if next_url is not None:
+            next_url = urlparse.urljoin(response.request.uri, next_url)
+        return items, next_url
@@ -0,0 +1,124 @@
+"""
+A registry of resource classes, to find the resource class of a URL.
+
+A ``Resource`` subclass with an ``item`` URL pattern is registered when it's
+created, if ``register`` is set in its ``Meta`` class. The patterns are indexed
+by ``root`` and by the first segment of their path, so only a few patterns are
+matched for each URL, even if many resources are registered.
+
+>>> from restorm.registry import registry
+>>> registry.lookup('http://www.example.com/api/book/1', root_uri='http://www.example.com/api/')
+<class 'Book'>
+
+"""
+import re
+import threading
+
+
+# Characters that start the non-literal part of a regular expression.
+_SPECIAL = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+def path_prefix(pattern):
+    """
+    Returns the first path segment that all URLs matching the pattern start
+    with, or an empty string if there is none.
+
+    >>> path_prefix(r'^book/(?P<isbn>\w+)$')
+    'book'
+    >>> path_prefix(r'^(?P<type>\w+)/(?P<id>\d+)$')
+    ''
+
+    """
+    literal = pattern.lstrip('^')
+    match = _SPECIAL.search(literal)
+    if match is None:
+        return literal.split('/', 1)[0]
+    literal = literal[:match.start()]
+    if '/' not in literal:
+        # The first segment is not entirely literal.
+        return ''
+    return literal.split('/', 1)[0]
+
+
+class ResourceRegistry(object):
+    """
+    Finds the resource class whose ``item`` URL pattern matches a URL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Per root, per path prefix, a list of ``(regex, resource class)``
+        # tuples. The most recently registered classes are first.
+        self._index = {}
+
+    def register(self, resource_class):
+        """
+        Adds the resource class to the registry. A previously registered class
+        with the same ``root`` and ``item`` URL pattern is replaced.
+        """
+        options = resource_class._meta
+        pattern = options.router.item.pattern
+        if not pattern:
+            return
+
+        try:
+            regex = re.compile(pattern)
+        except re.error:
+            # Some patterns are only used to build URLs.
+            return
+
+        self._lock.acquire()
+        try:
+            prefixes = self._index.setdefault(options.root, {})
+            entries = [e for e in prefixes.get(path_prefix(pattern), []) if e[0].pattern != pattern]
+            entries.insert(0, (regex, resource_class))
+            prefixes[path_prefix(pattern)] = entries
+        finally:
+            self._lock.release()
+
+    def unregister(self, resource_class):
+        """
+        Removes the resource class from the registry.
+        """
+        self._lock.acquire()
+        try:
+            for prefixes in self._index.values():
+                for prefix, entries in prefixes.items():
+                    prefixes[prefix] = [e for e in entries if e[1] is not resource_class]
+        finally:
+            self._lock.release()
+
+    def lookup(self, uri, root_uri=''):
+        """
+        Returns the resource class for the absolute URL, or ``None``.
+
+        :param uri: The absolute URL.
+        :param root_uri: The root of resources without a ``root``, typically
+            the ``root_uri`` of the client.
+        """
+        uri = uri.split('?', 1)[0].split('#', 1)[0]
+
+        self._lock.acquire()
+        try:
+            roots = []
+            for root, prefixes in self._index.items():
+                if not root:
+                    root = root_uri
+                if root and uri.startswith(root):
+                    roots.append((root, prefixes))
+            # The most specific root first.
+            roots.sort(key=lambda r: len(r[0]), reverse=True)
+
+            for root, prefixes in roots:
+                path = uri[len(root):]
+                candidates = prefixes.get(path.split('/', 1)[0], []) + prefixes.get('', [])
+                for regex, resource_class in candidates:
+                    if regex.match(path):
+                        return resource_class
+            return None
+        finally:
+            self._lock.release()
+
+
+registry = ResourceRegistry()
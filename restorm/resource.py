@@ -1,11 +1,26 @@
+import copy
 import logging
+import threading
 import urllib
 import re
+try:
+    from collections import Sequence
+except ImportError:
+    # Python 2.5
+    Sequence = object
 
+from restorm import instrumentation
+from restorm.batch import BatchLoader, get_active_loader
+from restorm.clients.jsonstream import iter_items
 from restorm.conf import settings
-from restorm.rest import restify
+from restorm.rest import clear_changes, data_hash, get_json_patch, get_merge_patch, has_changes, restify, unrestify
 from restorm.exceptions import RestServerException
-from restorm.utils import reverse
+from restorm.futures import Future, WorkerPool
+from restorm.query import QuerySet
+from restorm.registry import registry
+from restorm.resultcache import ResultCache
+from restorm.session import absolute_uri, get_session
+from restorm.utils import format_url, url_template
 
 
 VALID_GET_STATUS_RESPONSES = (
@@ -30,21 +45,32 @@ class ResourceManagerDescriptor(object):
 
 class ResourcePattern(object):
     """
-    # TODO: This class needs cleaning up and refactoring.
+    A URL pattern of a resource, compiled once to build URLs that match the
+    pattern and to extract the arguments from URLs.
     """
 
     def __init__(self, pattern, obj_path=None):
         self.pattern = pattern
         self.obj_path = obj_path
 
+        self.template = url_template(pattern)
+        self._regex = None
+
     @classmethod
     def parse(cls, obj):
         if isinstance(obj, tuple):
             return cls(*obj)
         return cls(obj)
     
+    @property
+    def regex(self):
+        # Compiled on first use, some patterns are only used to build URLs.
+        if self._regex is None:
+            self._regex = re.compile(self.pattern.strip('^$'))
+        return self._regex
+
     def params_from_uri(self, uri):
-        return re.search(self.pattern.strip('^$'), uri).groupdict()
+        return self.regex.search(uri).groupdict()
     
     def clean(self, response):
         if self.obj_path:
@@ -56,19 +82,37 @@ class ResourcePattern(object):
             query = '?%s' % urllib.urlencode(query)
         else:
             query = ''
-        return '%s%s' % (reverse(self.pattern, **kwargs), query)
+        return '%s%s' % (format_url(self.template, **kwargs), query)
 
     def get_absolute_url(self, root=None, query=None, **kwargs):
         if root is None:
             root = ''
         return '%s%s' % (root, self.get_url(query, **kwargs))
 
+
+class ResourceRouter(object):
+    """
+    The compiled ``list``, ``item``, ``count`` and ``bulk`` URL patterns of a
+    resource, as ``ResourcePattern`` instances.
+    """
+
+    def __init__(self, list_pattern, item_pattern, count_pattern='', bulk_pattern=''):
+        self.list = ResourcePattern.parse(list_pattern)
+        self.item = ResourcePattern.parse(item_pattern)
+        self.count = ResourcePattern.parse(count_pattern)
+        self.bulk = ResourcePattern.parse(bulk_pattern)
+
     
 class ResourceManager(object):
     
     def __init__(self):
         self.object_class = None
 
+        # Per client, the ``BatchLoader`` shared by all threads if
+        # ``batch_window`` is set.
+        self._loaders = {}
+        self._loaders_lock = threading.Lock()
+
     @property
     def options(self):
         try:
@@ -77,6 +121,12 @@ class ResourceManager(object):
             self._options = self.object_class._meta
             return self._options
 
+    def _get_client(self, client=None):
+        client = client or settings.DEFAULT_CLIENT
+        if client is None:
+            raise ValueError('A client instance must be provided or DEFAULT_CLIENT must be set in settings.')
+        return client
+
     def all(self, client=None, query=None, uri=None, **kwargs):
         """
         Returns the raw response for the list of objects. You should pass all
@@ -97,23 +147,137 @@ class ResourceManager(object):
             >>> Book.objects.all() # Returns a raw response.
 
         """
-        client = client or settings.DEFAULT_CLIENT
-        if client is None:
-            raise ValueError('A client instance must be provided or DEFAULT_CLIENT must be set in settings.')
+        client = self._get_client(client)
+
+        cache, key = self._get_cache_key(client, 'all', query, uri, kwargs)
+        if key is not None:
+            data = cache.get(key)
+            if data is not None:
+                # Each caller gets its own copy to change.
+                return copy.deepcopy(data)
+
+        trace = instrumentation.begin()
+        try:
+            rp = self.options.router.list
+            if uri:
+                kwargs = rp.params_from_uri(uri)
+            absolute_url = rp.get_absolute_url(root=self.options.root, query=query, **kwargs)
+
+            if trace is not None:
+                trace.lap('url')
+
+            response = client.get(absolute_url)
+
+            if response.status_code not in VALID_GET_STATUS_RESPONSES:
+                raise RestServerException('Cannot get "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
+
+            data = _own_data(client, rp.clean(response))
+            if key is not None:
+                cache.set(key, response.request.uri, copy.deepcopy(data))
+            return data
+        finally:
+            instrumentation.end(trace)
+
+    def list(self, client=None, query=None, uri=None, **kwargs):
+        """
+        Returns a ``ResourceList`` of instances of this resource for the list of
+        objects. The arguments are the same as for ``all``.
+
+        .. sourcecode:: python
+
+            >>> Book.objects.list()
+            <ResourceList: http://www.example.com/api/book/ (2 items)>
+
+        """
+        client = self._get_client(client)
+        data = self.all(client=client, query=query, uri=uri, **kwargs)
+
+        rp = self.options.router.list
+        if uri:
+            kwargs = rp.params_from_uri(uri)
+        absolute_url = absolute_uri(client, rp.get_absolute_url(root=self.options.root, query=query, **kwargs))
+        return ResourceList(data, client=client, absolute_url=absolute_url, resource_class=self.object_class)
+    
+    def query(self, client=None, query=None, uri=None, **kwargs):
+        """
+        Returns a ``QuerySet`` for the list of objects. The arguments are the
+        same as for ``all``, but no request is performed until the objects are
+        needed. The objects are instances of this resource.
+
+        .. sourcecode:: python
+
+            >>> books = Book.objects.query(query={'author': 1})
+            >>> books[:10]
+            <QuerySet: http://www.example.com/api/book/?author=1>
+
+        """
+        client = self._get_client(client)
+        if uri:
+            kwargs = self.options.router.list.params_from_uri(uri)
+        return QuerySet(self, client, query, **kwargs)
+
+    def filter(self, **params):
+        """
+        Returns a ``QuerySet`` with the given query string arguments, using the
+        default client.
+
+        .. sourcecode:: python
+
+            >>> for book in Book.objects.filter(author=1):
+            ...     print book.data['title']
+
+        """
+        return self.query().filter(**params)
+
+    def iterate(self, client=None, query=None, uri=None, **kwargs):
+        """
+        Yields the objects in the list one by one. The arguments are the same
+        as for ``all``, and so are the objects.
+
+        In contrast to ``all``, the response is parsed while it's received and
+        only a single object is held in memory at once. Use this for large
+        lists. The response must be JSON.
+
+        .. sourcecode:: python
+
+            >>> for book in Book.objects.iterate():
+            ...     print book['title']
+
+        """
+        client = self._get_client(client)
 
-        rp = ResourcePattern.parse(self.options.list)
+        rp = self.options.router.list
         if uri:
             kwargs = rp.params_from_uri(uri)
         absolute_url = rp.get_absolute_url(root=self.options.root, query=query, **kwargs)
 
-        response = client.get(absolute_url)
+        response, chunks = client.stream(absolute_url)
 
-        if response.status_code not in VALID_GET_STATUS_RESPONSES:
-            raise RestServerException('Cannot get "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
+        # The client cannot stream, the response is already complete.
+        if chunks is None:
+            if response.status_code not in VALID_GET_STATUS_RESPONSES:
+                raise RestServerException('Cannot get "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
+            for item in _own_data(client, rp.clean(response)):
+                yield item
+            return
+
+        if response.status_code != 200:
+            raise RestServerException('Cannot get "%s" (%d): %s' % (response.request.uri, response.status_code, _read_start(chunks)))
+
+        if not response.get('Content-Type', '').startswith('application/json'):
+            _read_start(chunks, 0)
+            raise ValueError('Cannot iterate over "%s", the response is not JSON.' % response.request.uri)
+
+        try:
+            for item in iter_items(chunks, rp.obj_path, client.deserialize):
+                yield item
+            # Read the end of the content, so the connection can be reused.
+            for chunk in chunks:
+                pass
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
 
-        data = rp.clean(response)
-        return data
-    
     def get(self, client=None, query=None, uri=None, **kwargs):
         """
         Returns the object matching the given lookup parameters. You should pass
@@ -135,24 +299,86 @@ class ResourceManager(object):
             <Book: http://www.example.com/api/book/1>
 
         """
-        client = client or settings.DEFAULT_CLIENT
-        if client is None:
-            raise ValueError('A client instance must be provided or DEFAULT_CLIENT must be set in settings.')
+        client = self._get_client(client)
 
-        rp = ResourcePattern.parse(self.options.item)
-        if uri:
-            kwargs = rp.params_from_uri(uri)
-        absolute_url = rp.get_absolute_url(root=self.options.root, query=query, **kwargs)
+        session = get_session()
+        cache, key = self._get_cache_key(client, 'get', query, uri, kwargs)
+        if key is not None:
+            entry = cache.get(key)
+            if entry is not None:
+                absolute_url, data, digest, etag, last_modified = entry
+                if session is not None:
+                    # The session decides the identity of resources.
+                    existing = session.get(absolute_url)
+                    if isinstance(existing, self.object_class):
+                        return existing
+                # Each caller gets a new resource, so changes that are not
+                # saved are not shared.
+                obj = self.object_class(data, client=client, absolute_url=absolute_url)
+                if obj.data is data:
+                    # The class uses the data as is, like ``SimpleResource``.
+                    obj.data = copy.deepcopy(data)
+                _set_retrieved(obj, data)
+                if digest is not None:
+                    obj.data_hash = digest
+                obj.etag = etag
+                obj.last_modified = last_modified
+                if session is not None:
+                    session.add(obj)
+                return obj
 
-        response = client.get(absolute_url)
-        
-        if response.status_code not in VALID_GET_STATUS_RESPONSES:
-            raise RestServerException('Cannot get "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
-    
-        data = rp.clean(response)
-        return self.object_class(data, client=client, absolute_url=response.request.uri)
+        trace = instrumentation.begin()
+        try:
+            rp = self.options.router.item
+            if uri:
+                kwargs = rp.params_from_uri(uri)
+            absolute_url = rp.get_absolute_url(root=self.options.root, query=query, **kwargs)
+
+            if trace is not None:
+                trace.lap('url')
+
+            if session is not None:
+                obj = session.get(absolute_uri(client, absolute_url))
+                if isinstance(obj, self.object_class):
+                    return obj
+
+            loader = self._get_loader(client)
+            if loader is not None and query is None and loader.get_key(**kwargs) is not None:
+                future = loader.load(**kwargs)
+                if not loader.window:
+                    loader.dispatch()
+                obj = future.result()
+                if obj is None:
+                    raise RestServerException('Cannot get "%s": it is not in the batch response.' % absolute_url)
+                if key is not None:
+                    self._cache_resource(cache, key, obj, unrestify(obj.data))
+                if session is not None:
+                    session.add(obj)
+                return obj
 
-    def create(self, client=None, data=None):
+            response = client.get(absolute_url)
+
+            if response.status_code not in VALID_GET_STATUS_RESPONSES:
+                raise RestServerException('Cannot get "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
+
+            if trace is not None:
+                trace.mark()
+
+            data = rp.clean(response)
+            obj = self.object_class(data, client=client, absolute_url=response.request.uri)
+            _set_retrieved(obj, data, response)
+            if key is not None:
+                self._cache_resource(cache, key, obj, data)
+            if session is not None:
+                session.add(obj)
+
+            if trace is not None:
+                trace.lap('restify')
+            return obj
+        finally:
+            instrumentation.end(trace)
+
+    def create(self, client=None, data=None, follow_location=True):
         """
         Roughly equivalent to a POST request, this methods creates a new entry.
 
@@ -161,20 +387,35 @@ class ResourceManager(object):
             client are specified, a ``ValueError`` is raised.
         :param data: Any Python object that you want to have serialized and
             stored.
+        :param follow_location: If the response has a ``Location`` header, the
+            new object is retrieved from that URL. If ``False``, the object is
+            created from ``data`` instead, without a request.
         """
-        client = client or settings.DEFAULT_CLIENT
-        if client is None:
-            raise ValueError('A client instance must be provided or DEFAULT_CLIENT must be set in settings.')
+        client = self._get_client(client)
 
-        rp = ResourcePattern.parse(self.options.list)
-        absolute_url = rp.get_absolute_url(root=self.options.root)
+        trace = instrumentation.begin()
+        try:
+            rp = self.options.router.list
+            absolute_url = rp.get_absolute_url(root=self.options.root)
 
-        response = client.post(absolute_url, data)
+            if trace is not None:
+                trace.lap('url')
+
+            response = client.post(absolute_url, data)
+        finally:
+            instrumentation.end(trace)
 
         # Although 201 is the best HTTP status code for a valid POST response.
         if response.status_code in [200, 201, 204]:
+            _invalidate(self.options, client)
             if 'Location' in response:
-                return self.get(client, uri=response['Location'])
+                if follow_location:
+                    return self.get(client, uri=response['Location'])
+                obj = self.object_class(data, client=client, absolute_url=absolute_uri(client, response['Location']))
+                session = get_session()
+                if session is not None:
+                    session.add(obj)
+                return obj
             elif response.content:
                 return response.content
             else:
@@ -182,53 +423,661 @@ class ResourceManager(object):
         else:
             raise RestServerException('Cannot create "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
 
+    def get_many(self, lookups, client=None, max_workers=10):
+        """
+        Returns the objects matching each of the given lookups, fetched
+        concurrently by at most ``max_workers`` threads.
 
-class RelatedResource(object):
-    def __init__(self, field, resource):
-        self._field = field
-        self._resource = resource
-        self._client = resource.client
-    
-    def _create_new_class(self, name):
+        :param lookups: A ``list`` of lookups. Each lookup is either a ``dict``
+            with the keyword arguments you would pass to ``get``, or a complete
+            URL.
+        :param client: The client to retrieve the objects from the API. By
+            default, the default client is used. The client must be safe to
+            use from multiple threads.
+        :param max_workers: The maximum number of simultaneous requests.
+
+        :return: A ``BulkResult`` with the objects in the same order as the
+            lookups. Objects that could not be retrieved are ``None`` and their
+            exception can be found in the ``errors`` attribute.
+
+        .. sourcecode:: python
+
+            >>> books = Book.objects.get_many([{'isbn': 1}, 'http://www.example.com/api/book/2'])
+            >>> books
+            [<Book: http://www.example.com/api/book/1>, None]
+            >>> books.errors
+            {1: RestServerException('Cannot get "http://www.example.com/api/book/2" (404): ...')}
+
+        """
+        client = self._get_client(client)
+
+        def get(lookup):
+            if isinstance(lookup, basestring):
+                return self.get(client, uri=lookup)
+            return self.get(client, **lookup)
+
+        return _run_many(get, lookups, max_workers)
+
+    def all_async(self, client=None, query=None, uri=None, **kwargs):
+        """
+        Asynchronous version of ``all``. Returns a ``Future``.
+
+        The request is performed on the worker threads of the client, if it
+        has any (see ``restorm.clients.asyncclient``). Otherwise, the request
+        is performed immediately and a finished ``Future`` is returned.
+        """
+        client = self._get_client(client)
+        return _submit(client, self.all, client, query, uri, **kwargs)
+
+    def get_async(self, client=None, query=None, uri=None, **kwargs):
+        """
+        Asynchronous version of ``get``. Returns a ``Future``.
+
+        .. sourcecode:: python
+
+            >>> futures = [Book.objects.get_async(isbn=isbn) for isbn in isbns]
+            >>> books = [f.result() for f in futures]
+
+        """
+        client = self._get_client(client)
+
+        # In a batch, the lookup is retrieved when the batch ends.
+        loader = get_active_loader(self)
+        if loader is not None and loader.client is client and query is None and loader.get_key(uri, **kwargs) is not None:
+            return loader.load(uri, **kwargs)
+
+        return _submit(client, self.get, client, query, uri, **kwargs)
+
+    def batch(self, client=None):
+        """
+        Returns a ``BatchLoader`` to use as context manager. Within the
+        context, lookups with ``get_async`` are collected and retrieved in
+        batches when the context ends. A ``get`` retrieves all collected
+        lookups at once. The ``Meta`` class of the resource must declare at
+        least ``batch_param`` and ``batch_key``.
+
+        In a batch, the result of the ``Future`` is ``None`` if the resource
+        doesn't exist.
+
+        .. sourcecode:: python
+
+            >>> with Book.objects.batch():
+            ...     futures = [Book.objects.get_async(isbn=isbn) for isbn in isbns]
+            >>> books = [f.result() for f in futures]
+
+        """
+        if not self.options.batch_param or not self.options.batch_key:
+            raise ValueError('The Meta class of %s has no batch_param and batch_key.' % self.object_class.__name__)
+        return BatchLoader(self, self._get_client(client))
+
+    def _get_loader(self, client):
+        """
+        Returns the ``BatchLoader`` for lookups with ``client``: the active
+        loader of the current thread or, if ``batch_window`` is set, a loader
+        that's shared by all threads. Returns ``None`` if lookups are not
+        batched.
+        """
+        options = self.options
+        if not options.batch_param or not options.batch_key:
+            return None
+
+        loader = get_active_loader(self)
+        if loader is not None and loader.client is client:
+            return loader
+
+        if not options.batch_window:
+            return None
+        self._loaders_lock.acquire()
+        try:
+            loader = self._loaders.get(client)
+            if loader is None:
+                loader = self._loaders[client] = BatchLoader(self, client, options.batch_window)
+            return loader
+        finally:
+            self._loaders_lock.release()
+
+    def _get_cache_key(self, client, method, query, uri, kwargs):
+        """
+        Returns the ``ResultCache`` of the resource and the key of the lookup,
+        or ``None`` and ``None`` if the result is not cached.
+        """
+        cache = self.options.result_cache
+        if cache is None:
+            return None, None
+        return cache, cache.key(client, method, uri, query, kwargs)
+
+    def _cache_resource(self, cache, key, obj, data):
+        """
+        Caches the data of a resource that was just retrieved, rather than the
+        resource itself, which can be changed by the caller.
+        """
+        if obj.data is data:
+            data = copy.deepcopy(data)
+        # The digest is only cached if it was computed already.
+        cache.set(key, obj.absolute_url, (obj.absolute_url, data, obj._data_hash, obj.etag, obj.last_modified))
+
+    def create_async(self, client=None, data=None, follow_location=True):
+        """
+        Asynchronous version of ``create``. Returns a ``Future``.
+        """
+        client = self._get_client(client)
+        return _submit(client, self.create, client, data, follow_location)
+
+    def bulk_create(self, items, client=None, max_workers=10, follow_location=True):
+        """
+        Creates an object for each item, concurrently by at most
+        ``max_workers`` threads.
+
+        If the ``Meta`` class of the resource has a ``bulk`` URL pattern, the
+        items are sent to that URL in lists of at most ``batch_size`` items,
+        instead of creating each item with ``create``. If the response contains
+        a ``list`` with an object for each item, resources for these objects
+        are returned. Otherwise, the results are ``None``.
+
+        :param items: A ``list`` with the data of each object.
+        :param client: The client to create the objects with. By default, the
+            default client is used. The client must be safe to use from
+            multiple threads.
+        :param max_workers: The maximum number of simultaneous requests.
+        :param follow_location: See ``create``. Pass ``False`` to save a
+            request per object.
+
+        :return: A ``BulkResult`` with the result of ``create`` for each item,
+            in the same order. Items that could not be created are ``None`` and
+            their exception can be found in the ``errors`` attribute.
+
+        .. sourcecode:: python
+
+            >>> books = Book.objects.bulk_create([{'title': 'Dive into Python'}, {'title': 'Dive into Python 3'}])
+            >>> books.errors
+            {}
+
+        """
+        client = self._get_client(client)
+
+        if self.options.router.bulk.pattern:
+            return self._bulk_request(client, 'POST', list(items), max_workers)
+
+        return _run_many(lambda data: self.create(client, data, follow_location), items, max_workers)
+
+    def bulk_save(self, resources, client=None, max_workers=10, partial=False, force=False):
+        """
+        Saves each resource, concurrently by at most ``max_workers`` threads.
+        Resources whose data is unchanged are skipped, unless ``force`` is
+        ``True``, see ``Resource.save``.
+
+        If the ``Meta`` class of the resource has a ``bulk`` URL pattern and
+        ``partial`` is ``False``, the data of the resources is sent to that
+        URL with a PUT-request, in lists of at most ``batch_size`` items.
+        Otherwise, each resource is saved with its own client.
+
+        :param resources: A ``list`` of resources of this manager.
+        :param client: The client for the ``bulk`` URL. By default, the client
+            of the first resource is used.
+        :param max_workers: The maximum number of simultaneous requests.
+
+        :return: A ``BulkResult`` with the result of ``save`` for each
+            resource, in the same order. The exceptions of resources that could
+            not be saved are in the ``errors`` attribute.
+        """
+        resources = list(resources)
+
+        if self.options.router.bulk.pattern and not partial and resources:
+            client = self._get_client(client or resources[0].client)
+
+            # Only send the resources that changed.
+            indexes, data, hashes = [], [], []
+            for index, resource in enumerate(resources):
+                current_hash = data_hash(resource.data)
+                if force or current_hash != resource.data_hash:
+                    indexes.append(index)
+                    data.append(resource.data)
+                    hashes.append(current_hash)
+
+            saved = self._bulk_request(client, 'PUT', data, max_workers)
+
+            result = BulkResult([None] * len(resources))
+            for position, index in enumerate(indexes):
+                if position in saved.errors:
+                    result.errors[index] = saved.errors[position]
+                else:
+                    clear_changes(resources[index].data)
+                    resources[index].data_hash = hashes[position]
+                    _invalidate(self.options, client, resources[index].absolute_url)
+            return result
+
+        def save(resource):
+            # ``SimpleResource.save`` doesn't take ``partial``.
+            if partial:
+                return resource.save(partial=True, force=force)
+            return resource.save(force=force)
+
+        return _run_many(save, resources, max_workers)
+
+    def bulk_delete(self, objects, client=None, max_workers=10):
+        """
+        Deletes each object with a DELETE-request, concurrently by at most
+        ``max_workers`` threads.
+
+        :param objects: A ``list`` of resources, which are deleted with their
+            own client, or of URLs.
+        :param client: The client to delete URLs with. By default, the default
+            client is used.
+        :param max_workers: The maximum number of simultaneous requests.
+
+        :return: A ``BulkResult`` with the content of the response, or
+            ``None``, for each object, in the same order. The exceptions of
+            objects that could not be deleted are in the ``errors`` attribute.
+        """
+        objects = list(objects)
+        if [obj for obj in objects if isinstance(obj, basestring)]:
+            client = self._get_client(client)
+
+        def delete(obj):
+            if isinstance(obj, basestring):
+                obj_client, absolute_url = client, absolute_uri(client, obj)
+            else:
+                obj_client, absolute_url = obj.client, obj.absolute_url
+            content = _delete(obj_client, absolute_url)
+            _invalidate(self.options, obj_client, absolute_url)
+            return content
+
+        result = _run_many(delete, objects, max_workers)
+
+        # Sessions are only active in the thread that activated them.
+        session = get_session()
+        if session is not None:
+            for index, obj in enumerate(objects):
+                if index not in result.errors:
+                    if isinstance(obj, basestring):
+                        session.remove(absolute_uri(client, obj))
+                    else:
+                        session.remove(obj.absolute_url)
+        return result
+
+    def _bulk_request(self, client, method, items, max_workers):
+        """
+        Sends the items to the ``bulk`` URL, in lists of at most ``batch_size``
+        items, and returns a ``BulkResult`` for all items.
+        """
+        options = self.options
+        rp = options.router.bulk
+        absolute_url = rp.get_absolute_url(root=options.root)
+
+        size = options.batch_size
+        chunks = [items[start:start + size] for start in range(0, len(items), size)]
+
+        def send(chunk):
+            if method == 'POST':
+                response = client.post(absolute_url, chunk)
+            else:
+                response = client.put(absolute_url, chunk)
+            if response.status_code not in [200, 201, 204]:
+                raise RestServerException('Cannot %s "%s" (%d): %s' % (method, response.request.uri, response.status_code, response.content))
+            _invalidate(options, client)
+
+            content = response.content and rp.clean(response)
+            if method == 'POST' and isinstance(content, list) and len(content) == len(chunk):
+                objects = []
+                for data in content:
+                    obj = self.object_class(data, client=client, absolute_url=_item_url(options, client, data))
+                    _set_retrieved(obj, data)
+                    objects.append(obj)
+                return objects
+            return [None] * len(chunk)
+
+        sent = _run_many(send, chunks, max_workers)
+
+        result = BulkResult()
+        for index, chunk in enumerate(chunks):
+            if index in sent.errors:
+                for position in range(len(chunk)):
+                    result.errors[len(result) + position] = sent.errors[index]
+                result.extend([None] * len(chunk))
+            else:
+                result.extend(sent[index])
+        return result
+
+
+def _invalidate(options, client, absolute_url=None):
+    """
+    Removes the cached results of the resource that are affected by a write to
+    the absolute URL with the client.
+    """
+    if options.result_cache is not None:
+        options.result_cache.invalidate(client, absolute_url)
+
+
+def _delete(client, absolute_url):
+    """
+    Deletes the object at the URL and returns the content of the response, or
+    ``None``.
+    """
+    response = client.delete(absolute_url)
+    if response.status_code not in [200, 202, 204]:
+        raise RestServerException('Cannot delete "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
+    return response.content or None
+
+
+def _item_url(options, client, data):
+    """
+    Returns the absolute URL of the object with the given data if the fields
+    provide all arguments of the ``item`` URL pattern, or ``None``.
+    """
+    if not options.router.item.pattern or not isinstance(data, dict):
+        return None
+    try:
+        return absolute_uri(client, options.router.item.get_absolute_url(root=options.root, **data))
+    except (ValueError, TypeError):
+        return None
+
+
+def _submit(client, func, *args, **kwargs):
+    """
+    Performs the call on the worker threads of the client if it has them, or
+    in the current thread otherwise. Returns a ``Future`` in both cases.
+    """
+    if hasattr(client, 'submit'):
+        return client.submit(func, *args, **kwargs)
+    return Future.from_call(func, *args, **kwargs)
+
+
+def _own_data(client, data):
+    """
+    Returns a copy of the content of a response if the client caches its
+    responses, since cached responses are shared by all callers.
+    """
+    if getattr(client, 'response_cache', None) is not None:
+        return copy.deepcopy(data)
+    return data
+
+
+def _read_start(chunks, limit=1024):
+    """
+    Returns at most the first ``limit`` bytes of a streamed content, for
+    example for an error message, and closes the stream.
+    """
+    content = ''
+    if limit > 0:
+        for chunk in chunks:
+            content += chunk
+            if len(content) >= limit:
+                break
+    if hasattr(chunks, 'close'):
+        chunks.close()
+    return content[:limit]
+
+
+def _run_many(func, items, max_workers):
+    """
+    Calls ``func`` for each item on at most ``max_workers`` threads and returns
+    a ``BulkResult``.
+    """
+    items = list(items)
+    result = BulkResult()
+    if not items:
+        return result
+
+    pool = WorkerPool(min(max_workers, len(items)))
+    try:
+        futures = pool.map(func, items)
+        for index, future in enumerate(futures):
+            exception = future.exception()
+            if exception is None:
+                result.append(future.result())
+            else:
+                result.append(None)
+                result.errors[index] = exception
+    finally:
+        # All futures are resolved, so waiting is cheap, and the workers don't
+        # outlive the call into interpreter shutdown.
+        pool.shutdown()
+
+    return result
+
+
+def prefetch_related(resources, lookups, max_workers=10):
+    """
+    Retrieves the related resources of all ``resources`` concurrently and
+    caches them on the resources, so accessing them doesn't perform requests.
+    Each related resource is retrieved only once.
+
+    :param resources: A ``list`` of resources.
+    :param lookups: A ``list`` of names of fields with related resources.
+        Fields of related resources are separated by two underscores, for
+        example ``publisher__address``.
+    :param max_workers: The maximum number of simultaneous requests.
+    """
+    for lookup in lookups:
+        level = resources
+        for field in lookup.split('__'):
+            level = _prefetch_field(level, field, max_workers)
+
+
+def _prefetch_field(resources, field, max_workers):
+    """
+    Retrieves and caches the related resource in ``field`` of each resource.
+    Returns the related resources.
+    """
+    session = get_session()
+    key = '_cache_%s' % field
+
+    related = {}
+    # The resources that still need the related resource, per URL.
+    pending = {}
+    for resource in resources:
+        if resource is None or resource.data is None:
+            continue
+        data = resource.data
+        descriptor = getattr(data.__class__, field, None)
+        if not isinstance(descriptor, RelatedResource):
+            continue
+
+        cache = descriptor._get_cache(data)
+        if key in cache:
+            related[id(cache[key])] = cache[key]
+            continue
+
+        client = descriptor._get_client(data)
+        absolute_url = absolute_uri(client, data[field])
+        obj = None
+        if session is not None:
+            obj = session.get(absolute_url)
+        if obj is not None:
+            cache[key] = obj
+            related[id(obj)] = obj
+        else:
+            pending.setdefault((client, absolute_url), (descriptor, []))[1].append(cache)
+
+    # Resources that declare batching are retrieved in batches, all others
+    # one by one.
+    loaders = {}
+    futures = {}
+    unbatched = []
+    for (client, absolute_url), (descriptor, caches) in pending.items():
+        manager = descriptor._get_resource_class(client, absolute_url).objects
+        if manager.options.batch_param and manager.options.batch_key:
+            loader = loaders.get((manager, client))
+            if loader is None:
+                loader = loaders[(manager, client)] = BatchLoader(manager, client)
+            if loader.get_key(absolute_url) is not None:
+                futures[(client, absolute_url)] = loader.load(absolute_url)
+                continue
+        unbatched.append((client, absolute_url))
+
+    for loader in loaders.values():
+        loader.dispatch()
+
+    results = _run_many(lambda item: pending[item][0]._retrieve(*item), unbatched, max_workers)
+    for index, item in enumerate(unbatched):
+        future = Future()
+        if index in results.errors:
+            future.set_exception((type(results.errors[index]), results.errors[index], None))
+        else:
+            future.set_result(results[index])
+        futures[item] = future
+
+    # Related resources that can't be retrieved are not cached, so accessing
+    # them raises the exception.
+    for item, future in futures.items():
+        if future.exception() is not None:
+            continue
+        obj = future.result()
+        for cache in pending[item][1]:
+            cache[key] = obj
+        if obj is not None:
+            related[id(obj)] = obj
+            if session is not None:
+                session.add(obj)
+
+    return related.values()
+
+
+class BulkResult(list):
+    """
+    The results of a bulk operation, in the same order as its input. Items that
+    failed are ``None`` and their exceptions are stored by index in
+    ``errors``.
+    """
+    def __init__(self, results=None, errors=None):
+        super(BulkResult, self).__init__(results or [])
+        self.errors = errors or {}
+
+
+# Generic resource classes for related resources, per field name.
+_generic_classes = {}
+
+
+def _get_generic_class(name):
+    try:
+        return _generic_classes[name]
+    except KeyError:
         # FIXME: This will be a RestResource!
         class_name = name.title().replace('_', '')
-        return type(str('%sResource' % class_name), (Resource,), {'__module__': '%s.auto' % Resource.__module__})
-        
+        resource_class = _generic_classes[name] = type(str('%sResource' % class_name), (Resource,), {'__module__': '%s.auto' % Resource.__module__})
+        return resource_class
+
+
+class RelatedResource(object):
+    """
+    Descriptor that retrieves the resource at the URL in the field with the
+    same name. The resource is retrieved with the client of the resource that
+    the ``RestObject`` belongs to.
+    """
+    def __init__(self, field):
+        self._field = field
+
+    def _get_client(self, instance):
+        return instance._resource.client
+
+    def _get_resource_class(self, client, absolute_url):
+        """
+        Returns the registered resource class for the URL or, if there is none,
+        a generic resource class named after the field.
+        """
+        resource_class = registry.lookup(absolute_url, getattr(client, 'root_uri', ''))
+        if resource_class is None:
+            resource_class = _get_generic_class(self._field)
+        return resource_class
+
+    def _get_cache(self, instance):
+        """
+        Returns the ``dict`` to cache the related resource in: the
+        ``__dict__`` of the instance or, for a ``CompactRestObject``, its
+        ``_related`` attribute.
+        """
+        try:
+            return instance.__dict__
+        except AttributeError:
+            if instance._related is None:
+                instance._related = {}
+            return instance._related
+
+    def _retrieve(self, client, absolute_url):
+        """
+        Retrieves the related resource at the URL. Returns ``None`` if it
+        doesn't exist.
+        """
+        response = client.get(absolute_url)
+        if response.status_code == 404:
+            return None
+        elif response.status_code not in [200, 304]:
+            raise RestServerException('Cannot get "%s" (%d): %s' % (absolute_url, response.status_code, response.content))
+
+        resource_class = self._get_resource_class(client, absolute_url)
+        data = resource_class._meta.router.item.clean(response)
+        obj = resource_class(data, client=client, absolute_url=absolute_url)
+        _set_retrieved(obj, data, response)
+        return obj
+
+    def _load(self, client, absolute_url):
+        """
+        Retrieves the related resource at the URL, in a batch if its resource
+        class has an active ``BatchLoader``. Returns ``None`` if it doesn't
+        exist.
+        """
+        loader = self._get_resource_class(client, absolute_url).objects._get_loader(client)
+        if loader is None or loader.get_key(absolute_url) is None:
+            return self._retrieve(client, absolute_url)
+
+        future = loader.load(absolute_url)
+        if not loader.window:
+            loader.dispatch()
+        return future.result()
+
     def __get__(self, instance, instance_type=None):
         if instance is None:
             return self
 
-        if not hasattr(instance, '_cache_%s' % self._field):
-            absolute_url = instance[self._field]
-            response = self._client.get(absolute_url)
-            if response.status_code == 404:
-                return None
-            elif response.status_code not in [200, 304]:
-                raise RestServerException('Cannot get "%s" (%d): %s' % (absolute_url, response.status_code, response.content))
+        cache = self._get_cache(instance)
+        key = '_cache_%s' % self._field
+        if key not in cache:
+            client = self._get_client(instance)
+            absolute_url = absolute_uri(client, instance[self._field])
+
+            # The resource may be in the active session already.
+            session = get_session()
+            if session is not None:
+                obj = session.get(absolute_url)
+                if obj is not None:
+                    cache[key] = obj
+                    return obj
 
-            resource_class = self._create_new_class(self._field)
-            setattr(instance, '_cache_%s' % self._field, resource_class(response.content, client=self._client, absolute_url=absolute_url))
+            obj = self._load(client, absolute_url)
+            if obj is None:
+                return None
+            cache[key] = obj
+            if session is not None:
+                session.add(obj)
 
-        return getattr(instance, '_cache_%s' % self._field, None)
+        return cache.get(key)
 
     def __set__(self, instance, value):
         if instance is None:
             raise AttributeError('%s must be accessed via instance' % self._field.name)
 
+        cache = self._get_cache(instance)
+        key = '_cache_%s' % self._field
         if isinstance(value, dict):
+            client = self._get_client(instance)
             absolute_url = instance[self._field]
-            response = self._client.put(absolute_url, value)
+            response = client.put(absolute_url, value)
             if response.status_code not in [200, 201, 304]:
                 raise RestServerException('Cannot put "%s" (%d): %s' % (absolute_url, response.status_code, response.content))
 
-            resource_class = self._create_new_class(self._field)
-            setattr(instance, '_cache_%s' % self._field, resource_class(value, client=self._client, absolute_url=absolute_url))
+            resource_class = self._get_resource_class(client, absolute_url)
+            _invalidate(resource_class._meta, client, absolute_uri(client, absolute_url))
+            cache[key] = resource_class(value, client=client, absolute_url=absolute_url)
+
+            session = get_session()
+            if session is not None:
+                session.add(cache[key])
         else:
-            setattr(instance, '_cache_%s' % self._field, value)
+            cache[key] = value
 
 
 class ResourceOptions(object):
-    DEFAULT_NAMES = ('list', 'item', 'root')
+    DEFAULT_NAMES = ('list', 'item', 'root', 'lazy', 'compact', 'count', 'count_header', 'page_size', 'page_param', 'limit_param', 'batch_param', 'batch_key', 'batch_size', 'batch_window', 'batch_separator', 'patch_format', 'bulk', 'cache_ttl', 'cache_size', 'register')
     
     def __init__(self, meta):
         # Represents this Resource's list URI pattern. For example: A list of 
@@ -246,8 +1095,67 @@ class ResourceOptions(object):
         # this different URL.
         self.root = ''
 
+        # Indicates whether nested data is converted to Rest objects when it's
+        # accessed, rather than when the resource is created. This is faster
+        # if only a few fields of large representations are used.
+        self.lazy = False
+
+        # Indicates whether the data is stored in ``CompactRestObject``
+        # instances, which use less memory than ``RestObject`` instances.
+        self.compact = False
+
+        # Represents the URI pattern of the number of objects in the list, used
+        # by ``QuerySet.count``. If empty, the number is taken from the
+        # ``count_header`` of a HEAD-request for the list.
+        self.count = ''
+        self.count_header = 'X-Total-Count'
+
+        # The number of objects per page that a ``QuerySet`` retrieves, and the
+        # query string arguments to pass the page number and page size. If
+        # ``page_size`` is ``None``, the list is retrieved at once unless it's
+        # sliced or the response has a ``Link`` header to the next page.
+        self.page_size = None
+        self.page_param = 'page'
+        self.limit_param = 'limit'
+
+        # Indicates how several objects can be retrieved with a single request
+        # for the list. The keys of the objects are passed in the query string
+        # argument ``batch_param``, joined with ``batch_separator``, at most
+        # ``batch_size`` at once. The key is the ``batch_key`` argument of the
+        # ``item`` URI pattern and the ``batch_key`` field of the objects in
+        # the list. If ``batch_window`` is set, lookups by all threads within
+        # that number of seconds are retrieved together, so each lookup waits
+        # up to that long.
+        self.batch_param = None
+        self.batch_key = None
+        self.batch_size = 100
+        self.batch_window = None
+        self.batch_separator = ','
+
+        # The format of the changes that ``Resource.save(partial=True)`` sends:
+        # ``'merge-patch'`` for JSON merge patch or ``'json-patch'`` for JSON
+        # Patch.
+        self.patch_format = 'merge-patch'
+
+        # Represents the URI pattern of an endpoint that creates or updates
+        # several objects at once, used by ``ResourceManager.bulk_create`` and
+        # ``ResourceManager.bulk_save``. A ``list`` of at most ``batch_size``
+        # objects is sent with a POST-request to create or a PUT-request to
+        # update them.
+        self.bulk = ''
+
+        # The number of seconds that results of ``ResourceManager.get`` and
+        # ``ResourceManager.all`` are cached, and the maximum number of cached
+        # results. If ``cache_ttl`` is ``None``, results are not cached.
+        self.cache_ttl = None
+        self.cache_size = 1000
+
+        # Indicates whether the resource class is added to the registry, so
+        # related resources whose URL matches its ``item`` URI pattern are
+        # instances of this class.
+        self.register = False
+
         # Next, apply any overridden values from 'class Meta'.
-        # TODO: This might be a good place to store ResourcePatterns.
         if meta:
             meta_attrs = meta.__dict__.copy()
             for name in meta.__dict__:
@@ -261,6 +1169,13 @@ class ResourceOptions(object):
                     setattr(self, attr_name, meta_attrs.pop(attr_name))
                 elif hasattr(meta, attr_name):
                     setattr(self, attr_name, getattr(meta, attr_name))
+
+        # The URL patterns are compiled once, rather than for every request.
+        self.router = ResourceRouter(self.list, self.item, self.count, self.bulk)
+
+        self.result_cache = None
+        if self.cache_ttl:
+            self.result_cache = ResultCache(self.cache_ttl, self.cache_size)
         
         
 class ResourceBase(type):
@@ -274,8 +1189,10 @@ class ResourceBase(type):
         parents = [b for b in bases if isinstance(b, ResourceBase)]
         if not parents:
             # If this isn't a subclass of RestObject, don't do anything 
-            # special.
-            return super_new(cls, name, bases, attrs)
+            # special, except for default options.
+            new_class = super_new(cls, name, bases, attrs)
+            new_class._meta = ResourceOptions(None)
+            return new_class
 
         # Create the class and strip all its attributes, except the module.
 #        module = attrs.pop('__module__')
@@ -300,20 +1217,172 @@ class ResourceBase(type):
         # Wrap default or custom managers such that it can only be used on
         # classes and not on instances.
         new_class.objects = ResourceManagerDescriptor(manager)
+
+        # Make the class available to resolve related resources.
+        if new_class._meta.register:
+            registry.register(new_class)
         
         return new_class
 
 
-class ResourceList(list):
+class ResourceList(Sequence):
     """
     A list of ``Resource`` instances which are most likely incomplete compared
-    to when they are retrieved as an individual.
+    to when they are retrieved as an individual. Use ``ResourceManager.list``
+    to retrieve one with instances of your resource class.
+
+    The list keeps the data of the items and creates a resource for an item
+    when it's accessed. By default, the resources are kept, so each item gets
+    a single resource. Pass ``memo=False`` to create a new resource on each
+    access instead, which saves memory if the list is only iterated once.
+
+    .. sourcecode:: python
+
+        >>> books = Book.objects.list()
+        >>> len(books)
+        2
+        >>> books[0]
+        <Book: None>
+
     """
     def __init__(self, data, **kwargs):
+        """
+        :param data: The items, as returned by ``ResourceManager.all``.
+        :param client: The client of the resources.
+        :param absolute_url: The URL of the list.
+        :param resource_class: The class of the resources, ``Resource`` by
+            default.
+        :param memo: Whether to keep the resources once they are created,
+            ``True`` by default.
+        """
         self.client = kwargs.pop('client', None)
         self.absolute_url = kwargs.pop('absolute_url', None)
-        
-        super(ResourceList, self).__init__([Resource(item, self.client) for item in data])
+        self.resource_class = kwargs.pop('resource_class', None) or Resource
+
+        self._items = list(data)
+        self._objects = None
+        if kwargs.pop('memo', True):
+            self._objects = [None] * len(self._items)
+
+    def __repr__(self):
+        return '<%s: %s (%d items)>' % (self.__class__.__name__, self.absolute_url, len(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            clone = self.__class__([], client=self.client, absolute_url=self.absolute_url, resource_class=self.resource_class)
+            clone._items = self._items[index]
+            clone._objects = None if self._objects is None else self._objects[index]
+            return clone
+
+        if self._objects is None:
+            return self.resource_class(self._items[index], self.client)
+
+        obj = self._objects[index]
+        if obj is None:
+            obj = self._objects[index] = self.resource_class(self._items[index], self.client)
+        return obj
+
+    def __iter__(self):
+        for index in xrange(len(self._items)):
+            yield self[index]
+
+    if Sequence is object:
+        def __contains__(self, value):
+            for obj in self:
+                if obj is value or obj == value:
+                    return True
+            return False
+
+        def index(self, value):
+            for index, obj in enumerate(self):
+                if obj is value or obj == value:
+                    return index
+            raise ValueError
+
+        def count(self, value):
+            return sum(1 for obj in self if obj is value or obj == value)
+
+    def prefetch_related(self, *lookups, **kwargs):
+        """
+        Retrieves the related resources in the given fields of all resources
+        in this list concurrently, and returns the list. Takes one optional
+        keyword argument ``max_workers``, the maximum number of simultaneous
+        requests (10 by default).
+
+        All resources in the list are created and kept, even if the list was
+        created with ``memo=False``.
+
+        .. sourcecode:: python
+
+            >>> books.prefetch_related('author', 'publisher__address')
+
+        """
+        if self._objects is None:
+            self._objects = [None] * len(self._items)
+        prefetch_related(self, lookups, kwargs.get('max_workers', 10))
+        return self
+
+
+class _ContentSnapshot(object):
+    """
+    The data of a resource as it was retrieved, kept as the raw content of the
+    response and only deserialized again when it's needed.
+    """
+    def __init__(self, client, response, obj_path):
+        self.raw_content = response.raw_content
+        self.deserialize = None
+        if response.content is not response.raw_content:
+            self.deserialize = client.deserialize
+        self.obj_path = obj_path
+
+    def load(self):
+        content = self.raw_content
+        if self.deserialize is not None:
+            content = self.deserialize(content)
+        if self.obj_path:
+            content = content[self.obj_path]
+        return content
+
+
+def _set_retrieved(resource, data, response=None):
+    """
+    Keeps a snapshot of the data of the resource as it was retrieved, to
+    compute its ``data_hash`` when it's first needed, and the validators of
+    the response.
+
+    The snapshot is the raw content of the response or, without a response,
+    ``data`` itself if the resource has a copy of it. Otherwise, the digest is
+    computed right away.
+    """
+    resource._data_hash = None
+    resource._snapshot = None
+    if response is not None and isinstance(response.raw_content, basestring):
+        resource._snapshot = _ContentSnapshot(resource.client, response, resource._meta.router.item.obj_path)
+    elif resource.data is not data:
+        resource._snapshot = data
+    else:
+        resource._data_hash = data_hash(data)
+
+    if response is not None:
+        resource.etag = response.get('Etag')
+        resource.last_modified = response.get('Last-Modified')
+
+
+def _get_data_hash(resource):
+    if resource._data_hash is None and resource._snapshot is not None:
+        snapshot, resource._snapshot = resource._snapshot, None
+        if isinstance(snapshot, _ContentSnapshot):
+            snapshot = snapshot.load()
+        resource._data_hash = data_hash(snapshot)
+    return resource._data_hash
+
+
+def _set_data_hash(resource, value):
+    resource._data_hash = value
+    resource._snapshot = None
 
 
 class Resource(object):
@@ -330,7 +1399,19 @@ class Resource(object):
         self.client = client
         self.absolute_url = absolute_url
 
-        self.data = restify(data, self)
+        self.data = restify(data, self, lazy=self._meta.lazy, compact=self._meta.compact)
+
+        # The digest of the data as it was retrieved or last saved, to
+        # skip saving unchanged data. It's computed from the snapshot of the
+        # retrieved data when it's first needed.
+        self._data_hash = None
+        self._snapshot = None
+
+        # The validators of the retrieved data, used by ``refresh``.
+        self.etag = None
+        self.last_modified = None
+
+    data_hash = property(_get_data_hash, _set_data_hash)
 
     def __unicode__(self):
         return self.absolute_url
@@ -338,19 +1419,79 @@ class Resource(object):
     def __repr__(self):
         return '<%s: %s>' % (self.__class__.__name__, self.__unicode__())
 
-    def save(self):
+    def refresh(self):
+        """
+        Retrieves the resource again and replaces ``data``, including any
+        unsaved changes, if it changed. Returns whether it changed.
+
+        If the resource was retrieved with an ``ETag`` or ``Last-Modified``
+        header, a conditional request is performed. If the server responds
+        with 304 (Not Modified), ``data`` is kept as is.
+
+        .. sourcecode:: python
+
+            >>> book = Book.objects.get(isbn=1)
+            >>> book.refresh()
+            False
+
+        """
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+
+        # Always ask the server, even if the client caches responses.
+        response = self.client.get(self.absolute_url, headers=headers or {'Cache-Control': 'no-cache'})
+        if response.status_code == 304 and headers:
+            return False
+        if response.status_code != 200:
+            raise RestServerException('Cannot get "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
+
+        data = self._meta.router.item.clean(response)
+        self.data = restify(data, self, lazy=self._meta.lazy, compact=self._meta.compact)
+        _set_retrieved(self, data, response)
+        return True
+
+    def save(self, partial=False, force=False):
         """
         Performs a PUT request to update the object.
 
+        If ``partial`` is ``True``, a PATCH request is performed instead, with
+        only the keys of ``data`` that were set or deleted since the resource
+        was created or last saved. The changes are sent as JSON merge patch,
+        or as JSON Patch if ``patch_format`` is ``'json-patch'`` in the
+        ``Meta`` class. If nothing changed, no request is performed.
+
+        If the resource was retrieved with ``ResourceManager.get`` or saved
+        before, no request is performed if ``data`` is equal to the data that
+        was retrieved or saved, unless ``force`` is ``True``.
+
         No guarantees are given to what this method actually returns due to the
         freedom of API implementations. If there is a body in the response, the
         contents of this body is returned, otherwise ``None``.
         """
+        current_hash = data_hash(self.data)
+        if not force and current_hash == self.data_hash:
+            clear_changes(self.data)
+            return None
 
-        response = self.client.put(self.absolute_url, self.data)
+        if partial:
+            if not has_changes(self.data):
+                return None
+            if self._meta.patch_format == 'json-patch':
+                patch, content_type = get_json_patch(self.data), 'application/json-patch+json'
+            else:
+                patch, content_type = get_merge_patch(self.data), 'application/merge-patch+json'
+            response = self.client.patch(self.absolute_url, patch, headers={'Content-Type': content_type})
+        else:
+            response = self.client.put(self.absolute_url, self.data)
 
         # Although 204 is the best HTTP status code for a valid PUT response.
         if response.status_code in [200, 201, 204]:
+            _invalidate(self._meta, self.client, self.absolute_url)
+            clear_changes(self.data)
+            self.data_hash = current_hash
             if response.content:
                 return response.content
             else:
@@ -358,6 +1499,12 @@ class Resource(object):
         else:
             raise RestServerException('Cannot create "%s" (%d): %s' % (response.request.uri, response.status_code, response.content))
 
+    def save_async(self, partial=False, force=False):
+        """
+        Asynchronous version of ``save``. Returns a ``Future``.
+        """
+        return _submit(self.client, self.save, partial, force)
+
 
 class SimpleResource(object):
     """
@@ -374,6 +1521,12 @@ class SimpleResource(object):
         self.absolute_url = absolute_url
         
         self.data = data
+        self._data_hash = None
+        self._snapshot = None
+        self.etag = None
+        self.last_modified = None
+
+    data_hash = property(_get_data_hash, _set_data_hash)
 
     def __unicode__(self):
         return self.absolute_url
@@ -381,5 +1534,16 @@ class SimpleResource(object):
     def __repr__(self):
         return '<%s: %s>' % (self.__class__.__name__, self.__unicode__())
 
-    def save(self):
-        self.client.put(self.absolute_url, self.data)
\ No newline at end of file
+    def save(self, force=False):
+        """
+        Performs a PUT request to update the object, unless ``data`` is equal
+        to the data that was retrieved or last saved and ``force`` is
+        ``False``.
+        """
+        current_hash = data_hash(self.data)
+        if not force and current_hash == self.data_hash:
+            return
+        response = self.client.put(self.absolute_url, self.data)
+        if response.status_code in [200, 201, 204]:
+            _invalidate(self._meta, self.client, self.absolute_url)
+            self.data_hash = current_hash
\ No newline at end of file
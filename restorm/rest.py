@@ -1,44 +1,95 @@
-from restorm.clients.jsonclient import json
+import hashlib
+import weakref
 
 
-class RestObject(object):
+# Dynamic ``RestObject`` subclasses, per base class and related resources. A
+# class is removed once no objects use it, since the keys can come from data.
+_dynamic_classes = weakref.WeakValueDictionary()
+
+
+class BaseRestObject(object):
     """
     A ``dict``-like object without the convenience methods.
+
+    Each key with a URL as value is made available as attribute, that returns
+    the related resource. For this, a subclass is created with a
+    ``RelatedResource`` for each of these keys. Objects with the same keys
+    share the same subclass.
+
+    If ``lazy`` is ``True``, nested ``dict`` and ``list`` values are kept as is
+    and only turned into Rest objects when they are accessed.
+
+    Keys that are set or deleted are tracked, see ``get_merge_patch`` and
+    ``get_json_patch``.
     """
+    __slots__ = ()
+
     def __new__(cls, data=None, *args, **kwargs):
         from resource import RelatedResource
 
-        resource = kwargs.get('resource')
-        related_resources = {}
+        related_fields = []
         if data is not None:
             for k, v in data.items():
                 # FIXME: Checking for http only is a bit crude.
                 if isinstance(v, basestring) and v.startswith('http'):
                     if not hasattr(cls, k):
-                        related_resources[k] = RelatedResource(k, resource)
+                        related_fields.append(k)
+
+        key = (cls, frozenset(related_fields))
+        new_class = _dynamic_classes.get(key)
+        if new_class is None:
+            related_resources = dict([(k, RelatedResource(k)) for k in related_fields])
+            related_resources['__slots__'] = ()
+            new_class = _dynamic_classes[key] = type('Dynamic%s' % cls.__name__, (cls,), related_resources)
 
-        new_class = type('Dynamic%s' % cls.__name__, (cls,), related_resources)
-        return super(RestObject, cls).__new__(new_class)
+        return super(BaseRestObject, cls).__new__(new_class)
     
     def __init__(self, data=None, **kwargs):
-        
+        self._resource = kwargs.get('resource')
+
         if data is not None:
             self._obj = data
         else:
             self._obj = {}
 
+        # In lazy mode, the keys of the values that are converted already.
+        if kwargs.get('lazy', False):
+            self._converted = set()
+        else:
+            self._converted = None
+
+        # The changed keys, with whether they existed before the first change.
+        self._changed = None
+
     def __repr__(self):
         return '<%s: %s>' % (self.__class__.__name__, self._obj.__repr__())
 
     # Interface: collections.MutableMapping
     def __getitem__(self, key):
-        return self._obj[key]
+        value = self._obj[key]
+        if self._converted is not None and key not in self._converted:
+            if isinstance(value, (dict, list, tuple, BaseRestObject)):
+                value = self._obj[key] = restify(value, self._resource, lazy=True, compact=isinstance(self, CompactRestObject))
+            self._converted.add(key)
+        return value
 
     def __setitem__(self, key, value):
+        self._track(key)
         self._obj[key] = value
+        if self._converted is not None:
+            self._converted.add(key)
 
     def __delitem__(self, key):
+        self._track(key)
         del self._obj[key]
+        if self._converted is not None:
+            self._converted.discard(key)
+
+    def _track(self, key):
+        if self._changed is None:
+            self._changed = {}
+        if key not in self._changed:
+            self._changed[key] = key in self._obj
 
     def __len__(self):
         return len(self._obj)
@@ -47,17 +98,204 @@ class RestObject(object):
         return self._obj.__iter__()
 
 
-def restify(data, resource):
+class RestObject(BaseRestObject):
+    """
+    A ``dict``-like object without the convenience methods. See
+    ``BaseRestObject``.
+    """
+
+
+class CompactRestObject(BaseRestObject):
+    """
+    A ``RestObject`` that uses less memory, because it has no instance
+    ``__dict__``. Related resources are cached in ``_related``.
+    """
+    __slots__ = ('_obj', '_resource', '_converted', '_changed', '_related')
+
+    def __init__(self, data=None, **kwargs):
+        super(CompactRestObject, self).__init__(data, **kwargs)
+        self._related = None
+
+
+def restify(data, resource, lazy=False, compact=False):
     """
     Turns Python objects (dict, list, etc) into Rest objects.
+
+    Each ``dict`` becomes a ``RestObject`` and each ``list`` or ``tuple``
+    becomes a ``list``, in a single pass. The structure is copied, so changes
+    to the Rest objects don't affect ``data``. All other values, like
+    ``Decimal``, are kept as is.
+
+    If ``lazy`` is ``True``, only the outer ``dict`` or ``list`` is converted.
+    Nested values are converted, and copied, when they are accessed.
+
+    If ``compact`` is ``True``, each ``dict`` becomes a ``CompactRestObject``.
     
     :param data: Any Python object.
     :param resource: The resource this data belongs to.
+    :param lazy: Whether nested values are converted on first access.
+    :param compact: Whether to use ``CompactRestObject`` instances.
 
     :return: Rest objects. 
     """
-    def rest_object(dct):
-        return RestObject(dct, resource=resource)
-    
-    json_data = json.dumps(data)
-    return json.loads(json_data, object_hook=rest_object)
+    if isinstance(data, dict):
+        if compact:
+            object_class = CompactRestObject
+        else:
+            object_class = RestObject
+        if lazy:
+            return object_class(dict(data), resource=resource, lazy=True)
+        return object_class(dict([(k, restify(v, resource, compact=compact)) for k, v in data.iteritems()]), resource=resource)
+    elif isinstance(data, (list, tuple)):
+        return [restify(v, resource, lazy, compact) for v in data]
+    elif isinstance(data, BaseRestObject):
+        return restify(data._obj, resource, lazy, compact)
+    return data
+
+
+def unrestify(data):
+    """
+    Turns Rest objects back into Python objects: each Rest object becomes a
+    ``dict`` and each ``list`` is copied. All other values are kept as is.
+    """
+    if isinstance(data, BaseRestObject):
+        data = data._obj
+    if isinstance(data, dict):
+        return dict([(k, unrestify(v)) for k, v in data.iteritems()])
+    elif isinstance(data, (list, tuple)):
+        return [unrestify(v) for v in data]
+    return data
+
+
+def _nested_changes(value):
+    """
+    Returns whether a value that was not set itself contains changes.
+    """
+    if isinstance(value, BaseRestObject):
+        if value._changed:
+            return True
+        value = [value._obj[k] for k in value._obj]
+    if isinstance(value, list):
+        for item in value:
+            if isinstance(item, (BaseRestObject, list)) and _nested_changes(item):
+                return True
+    return False
+
+
+def has_changes(data):
+    """
+    Returns whether keys of the Rest object, or of the Rest objects in it,
+    were set or deleted since it was created or since ``clear_changes``.
+
+    Only assignments to keys are tracked. Changes to a ``list`` itself, like
+    ``append``, are not.
+    """
+    return _nested_changes(data)
+
+
+def clear_changes(data):
+    """
+    Forgets all changes of the Rest object and the Rest objects in it, for
+    example after they are saved.
+    """
+    if isinstance(data, BaseRestObject):
+        data._changed = None
+        data = [data._obj[k] for k in data._obj]
+    if isinstance(data, list):
+        for item in data:
+            if isinstance(item, (BaseRestObject, list)):
+                clear_changes(item)
+
+
+def get_merge_patch(data):
+    """
+    Returns the changes of the Rest object as JSON merge patch (RFC 7386): a
+    ``dict`` with the new values of changed keys and ``None`` for deleted keys.
+    Nested Rest objects with changes become nested patches. A ``list`` with
+    changes is included entirely.
+    """
+    patch = {}
+    changed = data._changed or {}
+    for key, existed in changed.items():
+        if key in data._obj:
+            patch[key] = data._obj[key]
+        elif existed:
+            patch[key] = None
+
+    for key, value in data._obj.iteritems():
+        if key in changed:
+            continue
+        if isinstance(value, BaseRestObject):
+            if _nested_changes(value):
+                patch[key] = get_merge_patch(value)
+        elif isinstance(value, list) and _nested_changes(value):
+            patch[key] = value
+    return patch
+
+
+def _escape_pointer(key):
+    return unicode(key).replace('~', '~0').replace('/', '~1')
+
+
+def get_json_patch(data, path=''):
+    """
+    Returns the changes of the Rest object as JSON Patch (RFC 6902): a
+    ``list`` of ``add``, ``replace`` and ``remove`` operations.
+    """
+    operations = []
+    changed = {}
+    if isinstance(data, BaseRestObject):
+        changed = data._changed or {}
+        for key, existed in sorted(changed.items()):
+            pointer = '%s/%s' % (path, _escape_pointer(key))
+            if key in data._obj:
+                operations.append({'op': existed and 'replace' or 'add', 'path': pointer, 'value': data._obj[key]})
+            elif existed:
+                operations.append({'op': 'remove', 'path': pointer})
+        items = data._obj.iteritems()
+    else:
+        items = enumerate(data)
+
+    for key, value in items:
+        if key in changed:
+            continue
+        if isinstance(value, (BaseRestObject, list)) and _nested_changes(value):
+            operations.extend(get_json_patch(value, '%s/%s' % (path, _escape_pointer(key))))
+    return operations
+
+
+def _canonical(data):
+    """
+    Returns the data as nested tuples and lists, with the keys of each ``dict``
+    sorted and each value tagged with its type.
+    """
+    if isinstance(data, BaseRestObject):
+        data = data._obj
+    if isinstance(data, dict):
+        return ('dict', sorted([(_canonical(k), _canonical(v)) for k, v in data.iteritems()]))
+    elif isinstance(data, (list, tuple)):
+        return ('list', [_canonical(v) for v in data])
+    if isinstance(data, str):
+        try:
+            data = data.decode('utf-8')
+        except UnicodeDecodeError:
+            return ('bytes', data)
+    if isinstance(data, unicode):
+        return ('str', data)
+    elif isinstance(data, (int, long)) and not isinstance(data, bool):
+        return ('int', int(data))
+    return ('%s.%s' % (data.__class__.__module__, data.__class__.__name__), repr(data))
+
+
+def data_hash(data):
+    """
+    Returns a digest of the data: equal data has the same digest, regardless of
+    the order of keys or whether it consists of Rest objects or plain ``dict``
+    and ``list`` objects. Values of a different type, like ``1`` and ``True``,
+    have different digests, except ``str`` and ``unicode`` or ``int`` and
+    ``long`` values, that are serialized the same.
+
+    The digest is the MD5 hash of a canonical representation of the data, so
+    different data practically never has the same digest.
+    """
+    return hashlib.md5(repr(_canonical(data))).hexdigest()
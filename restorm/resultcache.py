@@ -0,0 +1,91 @@
+"""
+A cache of the results of ``ResourceManager.get`` and ``ResourceManager.all``.
+
+The cache is enabled per resource by setting ``cache_ttl`` in its ``Meta``
+class. A cached result is returned without building the URL or performing a
+request. ``get`` returns a new resource with the cached data, and ``all`` a
+copy of the cached data, so changes by one caller are not seen by others:
+
+.. sourcecode:: python
+
+    class Book(Resource):
+        class Meta:
+            item = r'^book/(?P<isbn>\d+)$'
+            cache_ttl = 60
+            cache_size = 10000
+
+    >>> Book.objects.get(isbn=1) # Performs a request.
+    <Book: http://www.example.com/api/book/1>
+    >>> Book.objects.get(isbn=1) # Returns a new resource with the cached data.
+    <Book: http://www.example.com/api/book/1>
+
+"""
+import time
+
+from restorm.clients.cache import LRUCache
+
+
+class ResultCache(object):
+    """
+    Holds at most ``max_entries`` results for ``ttl`` seconds, per client and
+    lookup. The least recently used results are removed first.
+
+    Writes with a client invalidate the results of the written URL and of all
+    lists that were retrieved with that client.
+    """
+    def __init__(self, ttl, max_entries=1000):
+        self.ttl = ttl
+        self._entries = LRUCache(max_entries=max_entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, client, method, uri, query, kwargs):
+        """
+        Returns the key of a lookup, or ``None`` if the lookup cannot be
+        cached, for example because the query contains a ``list``.
+        """
+        try:
+            key = (client, method, uri, frozenset((query or {}).items()), frozenset(kwargs.items()))
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key):
+        """
+        Returns the result for the key, or ``None`` if it's not cached or
+        expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, uri, value = entry
+        if time.time() >= expires:
+            self._entries.delete(key)
+            return None
+        return value
+
+    def set(self, key, uri, value):
+        """
+        Caches the result for the key, retrieved from the absolute URL.
+        """
+        self._entries.set(key, (time.time() + self.ttl, uri, value))
+
+    def invalidate(self, client, uri=None):
+        """
+        Removes the results that were retrieved with the client from the
+        absolute URL, and all lists retrieved with the client.
+        """
+        for key in self._entries.keys():
+            if key[0] is not client:
+                continue
+            if key[1] == 'all':
+                self._entries.delete(key)
+            elif uri is not None:
+                entry = self._entries.peek(key)
+                if entry is not None and entry[1] == uri:
+                    self._entries.delete(key)
+
+    def clear(self):
+        self._entries.clear()
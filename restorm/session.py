@@ -0,0 +1,112 @@
+"""
+Sessions keep an identity map of the resources that are retrieved while the
+session is active, so each resource is retrieved only once.
+
+>>> from restorm.session import Session
+>>> with Session():
+...     book1 = Book.objects.get(isbn=1)
+...     book2 = Book.objects.get(isbn=2)
+...     book1.data.author is book2.data.author
+...
+True
+
+"""
+import threading
+import urlparse
+
+
+_local = threading.local()
+
+
+def get_session():
+    """
+    Returns the active ``Session`` of the current thread, or ``None``.
+    """
+    sessions = getattr(_local, 'sessions', None)
+    if sessions:
+        return sessions[-1]
+    return None
+
+
+def absolute_uri(client, uri):
+    """
+    Returns the URI as the client requests it, absolute if the client has a
+    ``root_uri``.
+    """
+    root_uri = getattr(client, 'root_uri', '')
+    if not uri.startswith(root_uri):
+        uri = urlparse.urljoin(root_uri, uri)
+    return uri
+
+
+class Session(object):
+    """
+    An identity map of resources, by absolute URL.
+
+    While a session is active, ``ResourceManager.get``, related resources and
+    ``ResourceManager.create`` return the resource from the session if it's
+    there, instead of retrieving it again. A session is active in the thread
+    that activated it, until it's deactivated. Sessions can be nested.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resources = {}
+
+    def __len__(self):
+        return len(self._resources)
+
+    def __contains__(self, uri):
+        return uri in self._resources
+
+    def get(self, uri, default=None):
+        return self._resources.get(uri, default)
+
+    def add(self, resource):
+        """
+        Adds the resource to the session, replacing any resource with the same
+        absolute URL.
+        """
+        if resource.absolute_url is None:
+            return
+        self._lock.acquire()
+        try:
+            self._resources[resource.absolute_url] = resource
+        finally:
+            self._lock.release()
+
+    def remove(self, uri):
+        self._lock.acquire()
+        try:
+            self._resources.pop(uri, None)
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        self._lock.acquire()
+        try:
+            self._resources.clear()
+        finally:
+            self._lock.release()
+
+    def activate(self):
+        """
+        Makes this the active session of the current thread.
+        """
+        if not hasattr(_local, 'sessions'):
+            _local.sessions = []
+        _local.sessions.append(self)
+
+    def deactivate(self):
+        """
+        Restores the previously active session of the current thread.
+        """
+        sessions = getattr(_local, 'sessions', None)
+        if sessions and sessions[-1] is self:
+            sessions.pop()
+
+    def __enter__(self):
+        self.activate()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.deactivate()
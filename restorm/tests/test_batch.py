@@ -0,0 +1,170 @@
+from __future__ import with_statement
+
+import cgi
+import threading
+import urlparse
+
+from unittest2 import TestCase
+
+from restorm.batch import BatchLoader, get_active_loader
+from restorm.clients.jsonclient import JSONClientMixin, json
+from restorm.clients.mockclient import BaseMockApiClient
+from restorm.exceptions import RestServerException
+from restorm.registry import registry
+from restorm.resource import Resource, ResourceList
+from restorm.resultcache import ResultCache
+
+
+class BookApiClient(BaseMockApiClient, JSONClientMixin):
+    """
+    Mock API with books that can be retrieved one by one, or several at once
+    with the ``isbn__in`` query string argument.
+    """
+    def __init__(self):
+        super(BookApiClient, self).__init__(root_uri='http://localhost/api/')
+        self.books = dict([(str(i), {'isbn': str(i), 'title': 'Book %d' % i}) for i in range(10)])
+        self.uris = []
+        self._lock = threading.Lock()
+
+    def get_response_from_request(self, request):
+        self._lock.acquire()
+        try:
+            self.uris.append(request.uri)
+        finally:
+            self._lock.release()
+
+        headers = {'Status': 200, 'Content-Type': 'application/json'}
+        parts = urlparse.urlparse(request.uri)
+        if parts.path == '/api/book/':
+            isbns = cgi.parse_qs(parts.query).get('isbn__in', [''])[0].split(',')
+            return headers, json.dumps([self.books[isbn] for isbn in isbns if isbn in self.books])
+
+        isbn = parts.path.rsplit('/', 1)[1]
+        if isbn not in self.books:
+            return {'Status': 404}, 'Not found'
+        return headers, json.dumps(self.books[isbn])
+
+
+class BatchTests(TestCase):
+
+    def setUp(self):
+        self.client = BookApiClient()
+
+        class Book(Resource):
+            class Meta:
+                list = r'^book/$'
+                item = r'^book/(?P<isbn>\d+)$'
+                batch_param = 'isbn__in'
+                batch_key = 'isbn'
+                batch_size = 4
+                register = True
+
+        self.addCleanup(registry.unregister, Book)
+        self.Book = Book
+
+    def test_batch(self):
+        with self.Book.objects.batch(client=self.client) as loader:
+            self.assertTrue(get_active_loader(self.Book.objects) is loader)
+            futures = [self.Book.objects.get_async(client=self.client, isbn=str(i)) for i in range(3)]
+            self.assertEqual(self.client.uris, [])
+
+            # A full batch is retrieved right away.
+            futures += [self.Book.objects.get_async(client=self.client, isbn=str(i)) for i in range(3, 6)]
+            self.assertEqual(len(self.client.uris), 1)
+
+        self.assertEqual(get_active_loader(self.Book.objects), None)
+
+        books = [f.result() for f in futures]
+        self.assertIsInstance(books[0], self.Book)
+        self.assertEqual([b.data['title'] for b in books], ['Book %d' % i for i in range(6)])
+        self.assertEqual(books[2].absolute_url, 'http://localhost/api/book/2')
+
+        # Two batches of at most 4.
+        self.assertEqual(len(self.client.uris), 2)
+        self.assertEqual(sorted(self.client.uris[0].rsplit('=', 1)[1].split('%2C')), ['0', '1', '2', '3'])
+
+    def test_batch_get(self):
+        with self.Book.objects.batch(client=self.client):
+            future = self.Book.objects.get_async(client=self.client, isbn='1')
+            book = self.Book.objects.get(client=self.client, uri='http://localhost/api/book/2')
+            self.assertEqual(book.data['title'], 'Book 2')
+            self.assertTrue(future.done())
+
+        self.assertEqual(len(self.client.uris), 1)
+
+    def test_batch_get_cached(self):
+        self.Book._meta.result_cache = ResultCache(ttl=60)
+        self.addCleanup(setattr, self.Book._meta, 'result_cache', None)
+
+        with self.Book.objects.batch(client=self.client):
+            book = self.Book.objects.get(client=self.client, isbn='1')
+        book.data['title'] = 'Book 42'
+
+        cached = self.Book.objects.get(client=self.client, isbn='1')
+        self.assertEqual(len(self.client.uris), 1)
+        self.assertFalse(cached is book)
+        self.assertEqual(cached.data['title'], 'Book 1')
+        self.assertEqual(cached.absolute_url, 'http://localhost/api/book/1')
+
+    def test_batch_not_found(self):
+        with self.Book.objects.batch(client=self.client):
+            future = self.Book.objects.get_async(client=self.client, isbn='42')
+            self.assertRaises(RestServerException, self.Book.objects.get, client=self.client, isbn='43')
+
+        self.assertEqual(future.result(), None)
+
+    def test_duplicate_lookups(self):
+        loader = BatchLoader(self.Book.objects, self.client)
+        futures = [loader.load(isbn='1'), loader.load(isbn='1'), loader.load(uri='http://localhost/api/book/1')]
+        loader.dispatch()
+
+        self.assertEqual(self.client.uris, ['http://localhost/api/book/?isbn__in=1'])
+        self.assertTrue(futures[0].result() is futures[1].result())
+
+    def test_not_batched(self):
+        self.assertRaises(ValueError, BatchLoader(self.Book.objects, self.client).load, isbn='1', page='2')
+
+        # Outside a batch, get is not batched.
+        self.Book.objects.get(client=self.client, isbn='1')
+        self.assertEqual(self.client.uris, ['http://localhost/api/book/1'])
+
+    def test_window(self):
+        self.Book._meta.batch_window = 0.05
+        self.addCleanup(setattr, self.Book._meta, 'batch_window', None)
+
+        books = self.Book.objects.get_many([{'isbn': str(i)} for i in range(3)], client=self.client)
+
+        self.assertEqual([b.data['title'] for b in books], ['Book 0', 'Book 1', 'Book 2'])
+        self.assertEqual(len(self.client.uris), 1)
+
+    def test_window_loader_shared_by_threads(self):
+        self.Book._meta.batch_window = 0.05
+        self.addCleanup(setattr, self.Book._meta, 'batch_window', None)
+
+        loaders = []
+        threads = [threading.Thread(target=lambda: loaders.append(self.Book.objects._get_loader(self.client))) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(loaders), 10)
+        self.assertEqual(len(set(map(id, loaders))), 1)
+
+    def test_prefetch_related(self):
+        orders = ResourceList([{'book': 'http://localhost/api/book/%d' % (i % 6)} for i in range(20)], client=self.client)
+        orders.prefetch_related('book')
+
+        self.assertEqual(len(self.client.uris), 2)
+        self.assertIsInstance(orders[7].data.book, self.Book)
+        self.assertEqual(orders[7].data.book.data['title'], 'Book 1')
+        self.assertEqual(len(self.client.uris), 2)
+
+    def test_related_resource(self):
+        orders = ResourceList([{'book': 'http://localhost/api/book/1'}, {'book': 'http://localhost/api/book/42'}], client=self.client)
+
+        with self.Book.objects.batch(client=self.client):
+            self.assertEqual(orders[0].data.book.data['title'], 'Book 1')
+            self.assertEqual(orders[1].data.book, None)
+
+        self.assertEqual(self.client.uris, ['http://localhost/api/book/?isbn__in=1', 'http://localhost/api/book/?isbn__in=42'])
@@ -0,0 +1,79 @@
+import threading
+
+from unittest2 import TestCase
+
+from restorm.futures import Future, WorkerPool, TimeoutError, wait
+
+
+class FutureTests(TestCase):
+
+    def test_result(self):
+        future = Future()
+        self.assertFalse(future.done())
+
+        future.set_result('foo')
+        self.assertTrue(future.done())
+        self.assertEqual(future.result(), 'foo')
+        self.assertEqual(future.exception(), None)
+
+    def test_timeout(self):
+        future = Future()
+        self.assertRaises(TimeoutError, future.result, 0.01)
+
+    def test_done_callback(self):
+        called = []
+        future = Future()
+        future.add_done_callback(called.append)
+        self.assertEqual(called, [])
+
+        future.set_result(None)
+        self.assertEqual(called, [future])
+
+        # Adding a callback to a finished future calls it immediately.
+        future.add_done_callback(called.append)
+        self.assertEqual(called, [future, future])
+
+    def test_from_call(self):
+        future = Future.from_call(int, 'x')
+        self.assertTrue(future.done())
+        self.assertRaises(ValueError, future.result)
+
+
+class WorkerPoolTests(TestCase):
+
+    def setUp(self):
+        self.pool = WorkerPool(max_workers=3)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_submit(self):
+        future = self.pool.submit(sum, [1, 2, 3])
+        self.assertEqual(future.result(timeout=5), 6)
+
+    def test_map_keeps_order(self):
+        futures = self.pool.map(lambda x: x * 2, range(20))
+        self.assertEqual(wait(futures, timeout=5), [x * 2 for x in range(20)])
+
+    def test_bounded(self):
+        lock = threading.Lock()
+        active = [0, 0]
+        release = threading.Event()
+
+        def work():
+            lock.acquire()
+            active[0] += 1
+            active[1] = max(active)
+            lock.release()
+            release.wait(0.05)
+            lock.acquire()
+            active[0] -= 1
+            lock.release()
+
+        wait([self.pool.submit(work) for i in range(10)], timeout=5)
+        self.assertTrue(active[1] <= 3)
+        self.assertTrue(len(self.pool._threads) <= 3)
+
+    def test_shutdown(self):
+        self.pool.shutdown()
+        self.assertRaises(RuntimeError, self.pool.submit, sum, [])
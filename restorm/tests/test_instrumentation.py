@@ -0,0 +1,133 @@
+import logging
+
+import mock
+from unittest2 import TestCase
+
+from restorm import instrumentation
+from restorm.clients.base import logger
+from restorm.clients.jsonclient import JSONClient
+from restorm.resource import Resource
+
+
+class RecordingHook(instrumentation.Hook):
+    def __init__(self):
+        self.calls = []
+
+    def on_request_start(self, request):
+        self.calls.append(('on_request_start', request.uri))
+
+    def on_response(self, request, response, timings):
+        self.calls.append(('on_response', request.uri, response.status_code, sorted(timings.keys())))
+
+    def on_error(self, request, exception, timings):
+        self.calls.append(('on_error', request.uri, exception, sorted(timings.keys())))
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        self.hook = RecordingHook()
+        instrumentation.register(self.hook)
+
+        self.client = JSONClient(root_uri='http://localhost/api/')
+
+        class Book(Resource):
+            class Meta:
+                list = r'^book/$'
+                item = r'^book/(?P<isbn>\d)$'
+        self.Book = Book
+
+    def tearDown(self):
+        instrumentation.unregister(self.hook)
+
+    @mock.patch('httplib2.Http.request')
+    def test_manager_get(self, request):
+        request.return_value = ({'Status': 200, 'Content-Type': 'application/json'}, '{"title": "Dive into Python"}')
+        self.Book.objects.get(client=self.client, isbn=1)
+
+        self.assertEqual(self.hook.calls, [
+            ('on_request_start', 'http://localhost/api/book/1'),
+            ('on_response', 'http://localhost/api/book/1', 200, ['deserialize', 'network', 'restify', 'serialize', 'url']),
+        ])
+
+    @mock.patch('httplib2.Http.request')
+    def test_manager_all(self, request):
+        request.return_value = ({'Status': 200, 'Content-Type': 'application/json'}, '[]')
+        self.Book.objects.all(client=self.client)
+
+        self.assertEqual(self.hook.calls[-1], ('on_response', 'http://localhost/api/book/', 200, ['deserialize', 'network', 'serialize', 'url']))
+
+    @mock.patch('httplib2.Http.request')
+    def test_client_request(self, request):
+        request.return_value = ({'Status': 200, 'Content-Type': 'application/json'}, '{}')
+        self.client.get('book/1')
+
+        self.assertEqual(self.hook.calls, [
+            ('on_request_start', 'http://localhost/api/book/1'),
+            ('on_response', 'http://localhost/api/book/1', 200, ['deserialize', 'network', 'serialize']),
+        ])
+
+    @mock.patch('httplib2.Http.request')
+    def test_error(self, request):
+        error = IOError('Connection refused')
+        request.side_effect = error
+        self.assertRaises(IOError, self.Book.objects.get, client=self.client, isbn=1)
+
+        self.assertEqual(self.hook.calls, [
+            ('on_request_start', 'http://localhost/api/book/1'),
+            ('on_error', 'http://localhost/api/book/1', error, ['network', 'serialize', 'url']),
+        ])
+
+        # The trace ended, so new requests are traced again.
+        request.side_effect = None
+        request.return_value = ({'Status': 200, 'Content-Type': 'application/json'}, '{}')
+        self.Book.objects.get(client=self.client, isbn=1)
+        self.assertEqual(self.hook.calls[-1][0], 'on_response')
+
+    @mock.patch('restorm.instrumentation.logger')
+    @mock.patch('httplib2.Http.request')
+    def test_failing_hook(self, request, hook_logger):
+        class FailingHook(instrumentation.Hook):
+            def on_response(self, request, response, timings):
+                raise ValueError('Broken hook')
+
+        # The failing hook is called first.
+        hook = FailingHook()
+        instrumentation.unregister(self.hook)
+        instrumentation.register(hook)
+        instrumentation.register(self.hook)
+        self.addCleanup(instrumentation.unregister, hook)
+
+        request.return_value = ({'Status': 200, 'Content-Type': 'application/json'}, '{"title": "Dive into Python"}')
+        book = self.Book.objects.get(client=self.client, isbn=1)
+
+        self.assertEqual(book.data['title'], 'Dive into Python')
+        self.assertTrue(hook_logger.exception.called)
+        # Other hooks are still called.
+        self.assertEqual(self.hook.calls[-1][0], 'on_response')
+
+
+class LoggingTests(TestCase):
+    def setUp(self):
+        self.client = JSONClient(root_uri='http://localhost/api/')
+        self.level = logger.level
+
+    def tearDown(self):
+        logger.setLevel(self.level)
+
+    @mock.patch('restorm.clients.base.LazyHeaders')
+    @mock.patch('httplib2.Http.request')
+    def test_debug_disabled(self, request, lazy_headers):
+        request.return_value = ({'Status': 200, 'Content-Type': 'application/json'}, '{}')
+        logger.setLevel(logging.INFO)
+
+        self.client.get('book/1')
+        self.assertFalse(lazy_headers.called)
+
+    @mock.patch('restorm.clients.base.LazyHeaders')
+    @mock.patch('httplib2.Http.request')
+    def test_debug_enabled(self, request, lazy_headers):
+        request.return_value = ({'Status': 200, 'Content-Type': 'application/json'}, '{}')
+        logger.setLevel(logging.DEBUG)
+
+        self.client.get('book/1')
+        self.assertTrue(lazy_headers.called)
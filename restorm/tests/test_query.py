@@ -0,0 +1,193 @@
+import cgi
+import urlparse
+
+from unittest2 import TestCase
+
+from restorm.clients.jsonclient import JSONClientMixin, json
+from restorm.clients.mockclient import BaseMockApiClient
+from restorm.exceptions import RestServerException
+from restorm.query import QuerySet, parse_link_header
+from restorm.resource import Resource
+
+
+class PaginatedApiClient(BaseMockApiClient, JSONClientMixin):
+    """
+    Mock API with a list of books that supports the ``page`` and ``limit``
+    query string arguments and, optionally, ``Link`` headers.
+    """
+    def __init__(self, size=25, links=False, strict=False):
+        super(PaginatedApiClient, self).__init__(root_uri='http://localhost/api/')
+        self.books = [{'id': i, 'title': 'Book %d' % i, 'author': 'http://localhost/api/author/%d' % (i % 3)} for i in range(size)]
+        self.links = links
+        # Whether pages past the end are not found, rather than empty.
+        self.strict = strict
+        self.requests = []
+
+    def get_response_from_request(self, request):
+        self.requests.append((request.method, request.uri))
+
+        parts = urlparse.urlparse(request.uri)
+        params = dict([(k, v[0]) for k, v in cgi.parse_qs(parts.query).items()])
+        books = self.books
+        if 'author' in params:
+            books = [b for b in books if b['id'] % 2 == int(params['author'])]
+
+        if parts.path.startswith('/api/author/'):
+            author_id = int(parts.path.rsplit('/', 1)[1])
+            return {'Status': 200, 'Content-Type': 'application/json'}, json.dumps({'id': author_id, 'name': 'Author %d' % author_id})
+        if parts.path.endswith('/count'):
+            return {'Status': 200, 'Content-Type': 'application/json'}, json.dumps({'count': len(books)})
+        if request.method == 'HEAD':
+            return {'Status': 200, 'X-Total-Count': str(len(books))}, ''
+
+        headers = {'Status': 200, 'Content-Type': 'application/json'}
+        if 'limit' in params:
+            limit = int(params['limit'])
+            page = int(params.get('page', 1))
+            start = (page - 1) * limit
+            if self.strict and page > 1 and start >= len(books):
+                return {'Status': 404, 'Content-Type': 'application/json'}, json.dumps({'detail': 'Invalid page.'})
+            if self.links and start + limit < len(books):
+                headers['Link'] = '</api/book/?page=%d&limit=%d>; rel="next"' % (page + 1, limit)
+            books = books[start:start + limit]
+        return headers, json.dumps(books)
+
+
+class Book(Resource):
+    class Meta:
+        list = r'^book/$'
+        page_size = 10
+
+
+class UnpagedBook(Resource):
+    class Meta:
+        list = r'^book/$'
+
+
+class QuerySetTests(TestCase):
+
+    def setUp(self):
+        self.client = PaginatedApiClient()
+
+    def get_requests(self, method='GET'):
+        return [uri for m, uri in self.client.requests if m == method]
+
+    def test_lazy(self):
+        books = Book.objects.query(client=self.client)
+        self.assertIsInstance(books, QuerySet)
+        self.assertEqual(self.client.requests, [])
+
+    def test_iterate_pages(self):
+        books = list(Book.objects.query(client=self.client))
+
+        self.assertEqual(len(books), 25)
+        self.assertIsInstance(books[0], Book)
+        self.assertEqual([b.data['id'] for b in books], range(25))
+        self.assertEqual(len(self.get_requests()), 3)
+
+    def test_without_prefetch(self):
+        books = Book.objects.query(client=self.client)
+        books.prefetch = False
+        self.assertEqual(len(list(books.iterator())), 25)
+
+    def test_page_past_the_end_not_found(self):
+        self.client = PaginatedApiClient(size=20, strict=True)
+
+        books = Book.objects.query(client=self.client)
+        self.assertEqual(len(list(books)), 20)
+        self.assertEqual(self.get_requests()[-1], 'http://localhost/api/book/?limit=10&page=3')
+
+        books = Book.objects.query(client=self.client)
+        books.prefetch = False
+        self.assertEqual(len(list(books.iterator())), 20)
+
+        # A page that is asked for must exist.
+        self.assertRaises(RestServerException, list, Book.objects.query(client=self.client)[30:35])
+
+    def test_slicing(self):
+        books = Book.objects.query(client=self.client)[12:17]
+        self.assertEqual([b.data['id'] for b in books], [12, 13, 14, 15, 16])
+        self.assertEqual(self.get_requests(), ['http://localhost/api/book/?limit=10&page=2'])
+
+        self.client.requests = []
+        books = Book.objects.query(client=self.client)[5:15][2:4]
+        self.assertEqual([b.data['id'] for b in books], [7, 8])
+
+    def test_slicing_without_page_size(self):
+        books = UnpagedBook.objects.query(client=self.client)[10:15]
+        self.assertEqual([b.data['id'] for b in books], [10, 11, 12, 13, 14])
+        self.assertEqual(self.get_requests(), ['http://localhost/api/book/?limit=5&page=3'])
+
+    def test_index(self):
+        book = Book.objects.query(client=self.client)[21]
+        self.assertEqual(book.data['id'], 21)
+        self.assertRaises(IndexError, lambda: Book.objects.query(client=self.client)[30])
+        self.assertRaises(ValueError, lambda: Book.objects.query(client=self.client)[-1])
+
+    def test_filter(self):
+        books = Book.objects.query(client=self.client).filter(author=1)
+        self.assertEqual([b.data['id'] for b in books], range(1, 25, 2))
+        self.assertTrue('author=1' in self.get_requests()[0])
+
+    def test_count(self):
+        books = Book.objects.query(client=self.client).filter(author=0)
+        self.assertEqual(books.count(), 13)
+        self.assertEqual(books[5:].count(), 8)
+        self.assertEqual(books[:5].count(), 5)
+        self.assertEqual(self.get_requests(), [])
+        self.assertEqual(len(self.get_requests('HEAD')), 3)
+
+    def test_count_endpoint(self):
+        class CountedBook(Resource):
+            class Meta:
+                list = r'^book/$'
+                count = (r'^book/count$', 'count')
+
+        books = CountedBook.objects.query(client=self.client).filter(author=1)
+        self.assertEqual(books.count(), 12)
+        self.assertEqual(self.get_requests(), ['http://localhost/api/book/count?author=1'])
+
+    def test_prefetch_related(self):
+        books = list(Book.objects.query(client=self.client).prefetch_related('author'))
+
+        # Each author is retrieved once per page.
+        author_requests = [uri for uri in self.get_requests() if '/author/' in uri]
+        self.assertEqual(len(author_requests), 9)
+
+        self.assertEqual(books[4].data.author.data['name'], 'Author 1')
+        self.assertTrue(books[1].data.author is books[4].data.author)
+        self.assertEqual(len(self.get_requests()), 12)
+
+    def test_links(self):
+        self.client = PaginatedApiClient(links=True)
+
+        class LinkedBook(Resource):
+            class Meta:
+                list = r'^book/$'
+
+        books = list(LinkedBook.objects.query(client=self.client, query={'limit': 10}))
+        self.assertEqual(len(books), 25)
+        self.assertEqual(self.get_requests(), [
+            'http://localhost/api/book/?limit=10',
+            'http://localhost/api/book/?page=2&limit=10',
+            'http://localhost/api/book/?page=3&limit=10',
+        ])
+
+    def test_cache(self):
+        books = Book.objects.query(client=self.client)
+        self.assertEqual(len(books), 25)
+        self.assertEqual(books.count(), 25)
+        self.assertEqual(books[3].data['id'], 3)
+        self.assertEqual(len(self.get_requests()), 3)
+
+
+class ParseLinkHeaderTests(TestCase):
+
+    def test_parse_link_header(self):
+        links = parse_link_header('<http://localhost/api/book/?page=3>; rel="next", <http://localhost/api/book/?page=1>; rel="prev first"')
+        self.assertEqual(links, {
+            'next': 'http://localhost/api/book/?page=3',
+            'prev': 'http://localhost/api/book/?page=1',
+            'first': 'http://localhost/api/book/?page=1',
+        })
+        self.assertEqual(parse_link_header(None), {})
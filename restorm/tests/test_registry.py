@@ -0,0 +1,72 @@
+from unittest2 import TestCase
+
+from restorm.registry import ResourceRegistry, path_prefix
+from restorm.resource import Resource
+
+
+class PathPrefixTests(TestCase):
+
+    def test_path_prefix(self):
+        self.assertEqual(path_prefix(r'^book/(?P<isbn>\w+)$'), 'book')
+        self.assertEqual(path_prefix(r'^book/chapter/(?P<id>\d+)$'), 'book')
+        self.assertEqual(path_prefix(r'^search$'), '')
+        self.assertEqual(path_prefix(r'^search'), 'search')
+        self.assertEqual(path_prefix(r'^book-(?P<isbn>\w+)/$'), '')
+        self.assertEqual(path_prefix(r'^(?P<type>\w+)/(?P<id>\d+)$'), '')
+
+
+class ResourceRegistryTests(TestCase):
+
+    def setUp(self):
+        self.registry = ResourceRegistry()
+
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>[\w-]+)$'
+
+        class Chapter(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>[\w-]+)/chapter/(?P<id>\d+)$'
+
+        class SearchResult(Resource):
+            class Meta:
+                item = r'^(?P<type>\w+)/(?P<id>\d+)/result$'
+                root = 'http://search.localhost/api/'
+
+        self.Book, self.Chapter, self.SearchResult = Book, Chapter, SearchResult
+        for resource_class in (Book, Chapter, SearchResult):
+            self.registry.register(resource_class)
+
+    def test_lookup(self):
+        self.assertEqual(self.registry.lookup('http://localhost/api/book/1', 'http://localhost/api/'), self.Book)
+        self.assertEqual(self.registry.lookup('http://localhost/api/book/1/chapter/2', 'http://localhost/api/'), self.Chapter)
+        self.assertEqual(self.registry.lookup('http://search.localhost/api/book/1/result', 'http://localhost/api/'), self.SearchResult)
+
+    def test_lookup_query_string(self):
+        self.assertEqual(self.registry.lookup('http://localhost/api/book/1?format=json', 'http://localhost/api/'), self.Book)
+
+    def test_lookup_not_found(self):
+        self.assertEqual(self.registry.lookup('http://localhost/api/author/1', 'http://localhost/api/'), None)
+        self.assertEqual(self.registry.lookup('http://otherhost/api/book/1', 'http://localhost/api/'), None)
+        # Resources without root need the root of the client.
+        self.assertEqual(self.registry.lookup('http://localhost/api/book/1'), None)
+
+    def test_replace(self):
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>[\w-]+)$'
+
+        self.registry.register(Book)
+        self.assertEqual(self.registry.lookup('http://localhost/api/book/1', 'http://localhost/api/'), Book)
+
+    def test_unregister(self):
+        self.registry.unregister(self.Book)
+        self.assertEqual(self.registry.lookup('http://localhost/api/book/1', 'http://localhost/api/'), None)
+
+    def test_invalid_pattern(self):
+        class Photo(Resource):
+            class Meta:
+                item = r'^?method=flickr.photos.getInfo&&photo_id=(?P<id>\d)$'
+
+        self.registry.register(Photo)
+        self.assertEqual(self.registry.lookup('http://localhost/api/?method=flickr.photos.getInfo&&photo_id=1', 'http://localhost/api/'), None)
@@ -1,8 +1,16 @@
-from restorm.rest import RestObject
+import threading
+
+import mock
+from restorm.rest import RestObject, data_hash
 from unittest2 import TestCase
 
+from restorm.clients.cache import ResponseCache
+from restorm.clients.jsonclient import JSONClientMixin, json
+from restorm.clients.mockclient import BaseMockApiClient
 from restorm.examples.mock.api import LibraryApiClient, TicketApiClient
-from restorm.resource import ResourceManager, ResourceOptions, Resource, SimpleResource
+from restorm.exceptions import RestServerException
+from restorm.registry import registry
+from restorm.resource import ResourceManager, ResourceOptions, ResourcePattern, ResourceRouter, Resource, ResourceList, SimpleResource, BulkResult
 
 
 class ResourceTests(TestCase):
@@ -159,6 +167,67 @@ class ResourceTests(TestCase):
         self.assertIsInstance(book.data, RestObject)
         self.assertEqual(book.data['title'], 'Dive into Python')
 
+    def test_get_lazy(self):
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>\d)$'
+                lazy = True
+
+        book = Book.objects.get(client=self.client, isbn='978-1441413024')
+        self.assertTrue(Book._meta.lazy)
+        self.assertIsInstance(book.data, RestObject)
+        self.assertEqual(book.data['title'], 'Dive into Python')
+        self.assertEqual(book.data.author.data['name'], 'Mark Pilgrim')
+
+    def test_resource_list(self):
+        books = ResourceList([{'title': 'Dive into Python'}], client=self.client)
+        self.assertFalse(Resource._meta.lazy)
+        self.assertEqual(len(books), 1)
+        self.assertIsInstance(books[0].data, RestObject)
+        self.assertEqual(books[0].data['title'], 'Dive into Python')
+
+    def test_related_resource_class(self):
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>\d)$'
+
+        class Author(Resource):
+            class Meta:
+                item = r'^author/(?P<id>\d)$'
+                register = True
+
+            def get_name(self):
+                return self.data['name']
+
+        self.addCleanup(registry.unregister, Author)
+
+        book = Book.objects.get(client=self.client, isbn='978-1441413024')
+        self.assertIsInstance(book.data.author, Author)
+        self.assertEqual(book.data.author.get_name(), 'Mark Pilgrim')
+        self.assertEqual(book.data.author.absolute_url, 'http://localhost/api/author/1')
+
+        registry.unregister(Author)
+        book = Book.objects.get(client=self.client, isbn='978-1441413024')
+        generic_class = book.data.author.__class__
+        self.assertEqual(generic_class.__name__, 'AuthorResource')
+
+        # Generic classes are created once per field.
+        book = Book.objects.get(client=self.client, isbn='978-1441413024')
+        self.assertTrue(book.data.author.__class__ is generic_class)
+
+    def test_related_resource_class_not_registered(self):
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>\d)$'
+
+        class Author(Resource):
+            class Meta:
+                item = r'^author/(?P<id>\d)$'
+
+        self.assertEqual(registry.lookup('http://localhost/api/author/1', 'http://localhost/api/'), None)
+        book = Book.objects.get(client=self.client, isbn='978-1441413024')
+        self.assertEqual(book.data.author.__class__.__name__, 'AuthorResource')
+
     def test_all(self):
         class Book(Resource):
             class Meta:
@@ -167,6 +236,93 @@ class ResourceTests(TestCase):
         result = Book.objects.all(client=self.client)
         self.assertIsInstance(result, list)
         self.assertEqual(len(result), 2)
+
+    def test_all_with_response_cache(self):
+        class Book(Resource):
+            class Meta:
+                list = r'^book/$'
+
+        self.client.response_cache = ResponseCache(default_ttl=60)
+
+        books = Book.objects.all(client=self.client)
+        books[0]['title'] = 'CHANGED'
+        other = Book.objects.all(client=self.client)
+        self.assertFalse(other is books)
+        self.assertNotEqual(other[0]['title'], 'CHANGED')
+
+        items = list(Book.objects.iterate(client=self.client))
+        self.assertNotEqual(items[0]['title'], 'CHANGED')
+        self.assertFalse(items[0] is other[0])
+
+    def test_list(self):
+        class Book(Resource):
+            class Meta:
+                list = r'^book/$'
+
+        books = Book.objects.list(client=self.client)
+        self.assertIsInstance(books, ResourceList)
+        self.assertEqual(books.resource_class, Book)
+        self.assertEqual(books.absolute_url, 'http://localhost/api/book/')
+        self.assertEqual(len(books), 2)
+        self.assertIsInstance(books[0], Book)
+        self.assertTrue(books[0].client is self.client)
+
+    def test_get_async(self):
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>\d)$'
+
+        # The mock client has no worker threads, so the future is finished.
+        future = Book.objects.get_async(client=self.client, isbn='978-1441413024')
+        self.assertTrue(future.done())
+
+        book = future.result()
+        self.assertIsInstance(book, Book)
+        self.assertEqual(book.data['title'], 'Dive into Python')
+
+    def test_iterate(self):
+        class Author(Resource):
+            class Meta:
+                list = (r'^author/$', 'author_set')
+
+        authors = Author.objects.iterate(client=self.client)
+        self.assertEqual([a['name'] for a in authors], ['Mark Pilgrim', 'Jacob Kaplan-Moss'])
+
+    def test_get_many(self):
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>[\d-]+)$'
+
+        result = Book.objects.get_many([
+            {'isbn': '978-1590597255'},
+            '%sbook/978-1441413024' % self.client.root_uri,
+            {'isbn': 'unknown'},
+        ], client=self.client, max_workers=2)
+
+        self.assertIsInstance(result, BulkResult)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[0].data['title'], 'The Definitive Guide to Django')
+        self.assertEqual(result[1].data['title'], 'Dive into Python')
+        self.assertEqual(result[2], None)
+        self.assertEqual(result.errors.keys(), [2])
+        self.assertIsInstance(result.errors[2], RestServerException)
+
+    def test_get_many_empty(self):
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>[\d-]+)$'
+
+        result = Book.objects.get_many([], client=self.client)
+        self.assertEqual(result, [])
+        self.assertEqual(result.errors, {})
+
+    def test_all_async(self):
+        class Book(Resource):
+            class Meta:
+                list = r'^book/$'
+
+        result = Book.objects.all_async(client=self.client).result()
+        self.assertEqual(len(result), 2)
     
     def test_related_resources(self):
         class Book(Resource):
@@ -185,6 +341,130 @@ class ResourceTests(TestCase):
         self.assertEqual(author.data['name'], 'Mark Pilgrim')
 
 
+class ResourceListTests(TestCase):
+
+    def setUp(self):
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>\d)$'
+
+        self.Book = Book
+
+        self.created = []
+        created = self.created
+        class CountingBook(Book):
+            def __init__(self, *args, **kwargs):
+                created.append(args[0])
+                super(CountingBook, self).__init__(*args, **kwargs)
+
+        self.CountingBook = CountingBook
+
+    def test_lazy(self):
+        books = ResourceList([{'title': 'Book %d' % i} for i in range(10)], resource_class=self.CountingBook)
+
+        self.assertEqual(len(books), 10)
+        self.assertEqual(self.created, [])
+
+        self.assertIsInstance(books[2], self.Book)
+        self.assertEqual(books[2].data['title'], 'Book 2')
+        self.assertTrue(books[2] is books[2])
+        self.assertEqual(len(self.created), 1)
+
+        self.assertEqual([b.data['title'] for b in books[:3]], ['Book 0', 'Book 1', 'Book 2'])
+        self.assertEqual(len(self.created), 3)
+        self.assertTrue(books[:3][2] is books[2])
+
+    def test_no_memo(self):
+        books = ResourceList([{'title': 'Book 1'}], resource_class=self.CountingBook, memo=False)
+
+        self.assertEqual([b.data['title'] for b in books], ['Book 1'])
+        self.assertFalse(books[0] is books[0])
+        self.assertEqual(len(self.created), 3)
+
+    def test_default_resource_class(self):
+        books = ResourceList([{'title': 'Book 1'}])
+        self.assertEqual(books[-1].__class__, Resource)
+
+
+class PrefetchRelatedTests(TestCase):
+
+    def setUp(self):
+        self.client = LibraryApiClient()
+        self.uris = []
+
+        request = self.client.request
+        def counting_request(uri, *args, **kwargs):
+            self.uris.append(uri)
+            return request(uri, *args, **kwargs)
+        self.client.request = counting_request
+
+    def test_prefetch_related(self):
+        books = ResourceList([
+            {'author': 'http://localhost/api/author/1'},
+            {'author': 'http://localhost/api/author/1'},
+            {'author': 'http://localhost/api/author/2'},
+            {'title': 'Without author'},
+        ], client=self.client)
+
+        self.assertTrue(books.prefetch_related('author') is books)
+        self.assertEqual(sorted(self.uris), ['http://localhost/api/author/1', 'http://localhost/api/author/2'])
+
+        self.assertEqual(books[0].data.author.data['name'], 'Mark Pilgrim')
+        self.assertTrue(books[0].data.author is books[1].data.author)
+        self.assertEqual(len(self.uris), 2)
+
+        # Prefetching again doesn't perform any requests.
+        books.prefetch_related('author')
+        self.assertEqual(len(self.uris), 2)
+
+    def test_prefetch_related_nested(self):
+        items = ResourceList([
+            {'book': 'http://localhost/api/book/978-1441413024'},
+            {'book': 'http://localhost/api/book/978-1590597255'},
+        ], client=self.client)
+
+        items.prefetch_related('book__author')
+        self.assertEqual(len(self.uris), 4)
+
+        self.assertEqual(items[0].data.book.data.author.data['name'], 'Mark Pilgrim')
+        self.assertEqual(len(self.uris), 4)
+
+    def test_prefetch_related_not_found(self):
+        items = ResourceList([{'author': 'http://localhost/api/author/3'}], client=self.client)
+
+        items.prefetch_related('author')
+        self.assertEqual(items[0].data.author, None)
+        self.assertEqual(len(self.uris), 1)
+
+
+class ResourceRouterTests(TestCase):
+
+    def test_router(self):
+        class Author(Resource):
+            class Meta:
+                list = (r'^author/$', 'author_set')
+                item = r'^author/(?P<id>\d)$'
+
+        router = Author._meta.router
+        self.assertIsInstance(router, ResourceRouter)
+        self.assertIsInstance(router.list, ResourcePattern)
+        self.assertEqual(router.list.template, 'author/')
+        self.assertEqual(router.list.obj_path, 'author_set')
+        self.assertEqual(router.item.template, 'author/%(id)s')
+
+        # The patterns are compiled once.
+        self.assertTrue(Author._meta.router is router)
+        self.assertTrue(router.item.regex is router.item.regex)
+
+    def test_pattern(self):
+        rp = ResourcePattern(r'^book/(?P<isbn>\d+)/chapter/(?P<id>\d+)$')
+
+        self.assertEqual(rp.get_absolute_url(root='http://localhost/api/', isbn=1, id=2), 'http://localhost/api/book/1/chapter/2')
+        self.assertEqual(rp.get_url(query={'page': 2}, isbn=1, id=2), 'book/1/chapter/2?page=2')
+        self.assertEqual(rp.params_from_uri('http://localhost/api/book/1/chapter/2'), {'isbn': '1', 'id': '2'})
+        self.assertRaises(ValueError, rp.get_url, isbn=1)
+
+
 class ResourceCreateAndUpdateTests(TestCase):
 
     def setUp(self):
@@ -210,6 +490,351 @@ class ResourceCreateAndUpdateTests(TestCase):
         issue.data['description'] = 'This needs more work.'
         issue.save()
 
+    def test_partial_update_resource(self):
+        class Issue(Resource):
+            class Meta:
+                list = r'^issue/$'
+                item = r'^issue/(?P<id>\d+)$'
+
+        requests = []
+        request = self.client.request
+        def recording_request(uri, method='GET', body=None, headers=None, *args, **kwargs):
+            requests.append((method, body, dict(headers or {})))
+            return request(uri, method, body, headers, *args, **kwargs)
+        self.client.request = recording_request
+
+        issue = Issue.objects.get(client=self.client, id=2)
+        issue.save(partial=True)
+        self.assertEqual(len(requests), 1)
+
+        issue.data['description'] = 'This needs less work.'
+        issue.save(partial=True)
+
+        method, body, headers = requests[-1]
+        self.assertEqual(method, 'PATCH')
+        self.assertEqual(body, {'description': 'This needs less work.'})
+        self.assertEqual(headers['Content-Type'], 'application/merge-patch+json')
+
+        # The changes are saved.
+        issue.save(partial=True)
+        self.assertEqual(len(requests), 2)
+
+        class PatchIssue(Resource):
+            class Meta:
+                list = r'^issue/$'
+                item = r'^issue/(?P<id>\d+)$'
+                patch_format = 'json-patch'
+
+        issue = PatchIssue.objects.get(client=self.client, id=2)
+        del issue.data['description']
+        issue.save(partial=True)
+
+        method, body, headers = requests[-1]
+        self.assertEqual(body, [{'op': 'remove', 'path': '/description'}])
+        self.assertEqual(headers['Content-Type'], 'application/json-patch+json')
+        self.assertEqual(Issue._meta.patch_format, 'merge-patch')
+
+    def test_save_unchanged_resource(self):
+        class Issue(Resource):
+            class Meta:
+                list = r'^issue/$'
+                item = r'^issue/(?P<id>\d+)$'
+
+        methods = []
+        request = self.client.request
+        def recording_request(uri, method='GET', *args, **kwargs):
+            methods.append(method)
+            return request(uri, method, *args, **kwargs)
+        self.client.request = recording_request
+
+        issue = Issue.objects.get(client=self.client, id=2)
+        issue.save()
+        issue.data['description'] = 'This needs more work.'
+        issue.save()
+        self.assertEqual(methods, ['GET'])
+
+        issue.data['description'] = 'This needs less work.'
+        issue.save()
+        issue.save()
+        self.assertEqual(methods, ['GET', 'PUT'])
+
+        issue.save(force=True)
+        self.assertEqual(methods, ['GET', 'PUT', 'PUT'])
+
+        # hash(-1) == hash(-2) in CPython, yet both are saved.
+        issue.data['priority'] = -1
+        issue.save()
+        issue.data['priority'] = -2
+        issue.save()
+        self.assertEqual(methods, ['GET', 'PUT', 'PUT', 'PUT', 'PUT'])
+
+    def test_save_unchanged_simple_resource(self):
+        class Issue(SimpleResource):
+            class Meta:
+                item = r'^issue/(?P<id>\d+)$'
+
+        issue = Issue.objects.get(client=self.client, id=2)
+        self.client.put = mock.Mock(return_value=mock.Mock(status_code=204))
+
+        issue.save()
+        self.assertFalse(self.client.put.called)
+
+        issue.data['description'] = 'This needs less work.'
+        issue.save()
+        issue.save()
+        self.assertEqual(self.client.put.call_count, 1)
+
+    def test_data_hash_computed_on_save(self):
+        class Issue(Resource):
+            class Meta:
+                item = r'^issue/(?P<id>\d+)$'
+
+        patcher = mock.patch('restorm.resource.data_hash', side_effect=data_hash)
+        hash_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        issue = Issue.objects.get(client=self.client, id=2)
+        self.assertFalse(hash_mock.called)
+
+        self.client.put = mock.Mock(return_value=mock.Mock(status_code=204))
+        issue.save()
+        self.assertFalse(self.client.put.called)
+        self.assertEqual(hash_mock.call_count, 2)
+
+    def test_save_unchanged_related_resource(self):
+        class Issue(Resource):
+            class Meta:
+                item = r'^issue/(?P<id>\d+)$'
+
+        issue = Issue({'related': 'http://localhost/api/issue/2'}, client=self.client)
+        related = issue.data.related
+        self.assertEqual(related.data['title'], 'Cannot create an issue')
+
+        self.client.put = mock.Mock(return_value=mock.Mock(status_code=204))
+        related.save()
+        self.assertFalse(self.client.put.called)
+
+        related.data['description'] = 'This needs less work.'
+        related.save()
+        self.assertEqual(self.client.put.call_count, 1)
+
+
+class VersionedApiClient(BaseMockApiClient, JSONClientMixin):
+    """
+    Mock API with a single book that has an ``ETag`` and responds to
+    conditional requests.
+    """
+    def __init__(self):
+        super(VersionedApiClient, self).__init__(root_uri='http://localhost/api/')
+        self.book = {'isbn': '1', 'title': 'Dive into Python'}
+        self.version = 1
+        self.requests = []
+
+    def get_response_from_request(self, request):
+        self.requests.append(request)
+        etag = '"%d"' % self.version
+        if request.get('If-None-Match') == etag:
+            return {'Status': 304, 'ETag': etag}, ''
+        return {'Status': 200, 'Content-Type': 'application/json', 'ETag': etag}, json.dumps(self.book)
+
+
+class RefreshTests(TestCase):
+
+    def setUp(self):
+        self.client = VersionedApiClient()
+
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>\d+)$'
+
+        self.Book = Book
+
+    def test_refresh(self):
+        book = self.Book.objects.get(client=self.client, isbn='1')
+        self.assertEqual(book.etag, '"1"')
+        data = book.data
+
+        self.assertFalse(book.refresh())
+        self.assertTrue(book.data is data)
+        self.assertEqual(self.client.requests[-1]['If-None-Match'], '"1"')
+
+        self.client.book['title'] = 'Dive into Python 3'
+        self.client.version = 2
+
+        self.assertTrue(book.refresh())
+        self.assertEqual(book.data['title'], 'Dive into Python 3')
+        self.assertEqual(book.etag, '"2"')
+
+        # The refreshed data is not saved again.
+        book.save()
+        self.assertEqual(len(self.client.requests), 3)
+
+    def test_related_resource_validators(self):
+        class Order(Resource):
+            class Meta:
+                item = r'^order/(?P<id>\d+)$'
+
+        order = Order({'book': 'http://localhost/api/book/1'}, client=self.client)
+        self.assertEqual(order.data.book.etag, '"1"')
+        self.assertFalse(order.data.book.refresh())
+
+    def test_refresh_without_validators(self):
+        book = self.Book(client=self.client, absolute_url='http://localhost/api/book/1')
+
+        self.assertTrue(book.refresh())
+        self.assertEqual(book.data['title'], 'Dive into Python')
+        self.assertFalse('If-None-Match' in self.client.requests[-1])
+
+
+class BookStoreApiClient(BaseMockApiClient, JSONClientMixin):
+    """
+    Mock API that stores books, created one by one or with the bulk endpoint.
+    """
+    def __init__(self):
+        super(BookStoreApiClient, self).__init__(root_uri='http://localhost/api/')
+        self.books = {}
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get_response_from_request(self, request):
+        self._lock.acquire()
+        try:
+            self.requests.append((request.method, request.uri))
+        finally:
+            self._lock.release()
+
+        json_headers = {'Status': 200, 'Content-Type': 'application/json'}
+        body = request.body and json.loads(request.body)
+        path = request.uri[len(self.root_uri):]
+
+        if path == 'book/' and request.method == 'POST':
+            if body['title'] == 'Invalid':
+                return {'Status': 400}, 'Invalid'
+            self.books[body['isbn']] = body
+            return {'Status': 201, 'Location': '%sbook/%s' % (self.root_uri, body['isbn'])}, ''
+        elif path == 'book/bulk' and request.method == 'POST':
+            for book in body:
+                self.books[book['isbn']] = book
+            return dict(json_headers, Status=201), json.dumps(body)
+        elif path == 'book/bulk' and request.method == 'PUT':
+            for book in body:
+                self.books[book['isbn']] = book
+            return {'Status': 204}, ''
+
+        isbn = path.rsplit('/', 1)[1]
+        if isbn not in self.books:
+            return {'Status': 404}, 'Not found'
+        elif request.method == 'DELETE':
+            del self.books[isbn]
+            return {'Status': 204}, ''
+        elif request.method == 'PUT':
+            self.books[isbn] = body
+            return {'Status': 204}, ''
+        return json_headers, json.dumps(self.books[isbn])
+
+
+class BulkTests(TestCase):
+
+    def setUp(self):
+        self.client = BookStoreApiClient()
+
+        class Book(Resource):
+            class Meta:
+                list = r'^book/$'
+                item = r'^book/(?P<isbn>\d+)$'
+
+        self.Book = Book
+
+    def test_bulk_create(self):
+        items = [{'isbn': str(i), 'title': 'Book %d' % i} for i in range(5)] + [{'isbn': '5', 'title': 'Invalid'}]
+
+        books = self.Book.objects.bulk_create(items, client=self.client, max_workers=3)
+
+        self.assertIsInstance(books, BulkResult)
+        self.assertEqual(len(books), 6)
+        self.assertEqual(books[2].data['title'], 'Book 2')
+        self.assertEqual(books[2].absolute_url, 'http://localhost/api/book/2')
+        self.assertEqual(books[5], None)
+        self.assertEqual(books.errors.keys(), [5])
+        self.assertEqual(sorted(self.client.books.keys()), ['0', '1', '2', '3', '4'])
+        self.assertEqual(len([r for r in self.client.requests if r[0] == 'GET']), 5)
+
+    def test_bulk_create_without_location(self):
+        books = self.Book.objects.bulk_create([{'isbn': '1', 'title': 'Book 1'}], client=self.client, follow_location=False)
+
+        self.assertEqual(books[0].data['title'], 'Book 1')
+        self.assertEqual(books[0].absolute_url, 'http://localhost/api/book/1')
+        self.assertEqual(self.client.requests, [('POST', 'http://localhost/api/book/')])
+
+    def test_bulk_endpoint(self):
+        class Book(Resource):
+            class Meta:
+                list = r'^book/$'
+                item = r'^book/(?P<isbn>\d+)$'
+                bulk = r'^book/bulk$'
+                batch_size = 2
+
+        self.Book = Book
+
+        books = self.Book.objects.bulk_create([{'isbn': str(i), 'title': 'Book %d' % i} for i in range(5)], client=self.client)
+
+        self.assertEqual([r[0] for r in self.client.requests], ['POST'] * 3)
+        self.assertEqual(books[4].data['title'], 'Book 4')
+        self.assertEqual(books[4].absolute_url, 'http://localhost/api/book/4')
+
+        books[1].data['title'] = 'Book one'
+        books[3].data['title'] = 'Book three'
+        result = self.Book.objects.bulk_save(books)
+
+        self.assertEqual(result.errors, {})
+        self.assertEqual(self.client.requests[-1], ('PUT', 'http://localhost/api/book/bulk'))
+        self.assertEqual(len(self.client.requests), 4)
+        self.assertEqual(self.client.books['3']['title'], 'Book three')
+
+        # Saved resources are not sent again.
+        self.Book.objects.bulk_save(books)
+        self.assertEqual(len(self.client.requests), 4)
+
+    def test_bulk_save(self):
+        self.Book.objects.bulk_create([{'isbn': str(i), 'title': 'Book %d' % i} for i in range(3)], client=self.client)
+        books = self.Book.objects.get_many([{'isbn': str(i)} for i in range(3)], client=self.client)
+        del self.client.requests[:]
+
+        books[0].data['title'] = 'Book zero'
+        books[2].absolute_url = 'http://localhost/api/book/42'
+        books[2].data['title'] = 'Book two'
+        result = self.Book.objects.bulk_save(books)
+
+        self.assertEqual(result.errors.keys(), [2])
+        self.assertEqual(sorted(self.client.requests), [('PUT', 'http://localhost/api/book/0'), ('PUT', 'http://localhost/api/book/42')])
+        self.assertEqual(self.client.books['0']['title'], 'Book zero')
+
+    def test_bulk_save_simple_resources(self):
+        class SimpleBook(SimpleResource):
+            class Meta:
+                list = r'^book/$'
+                item = r'^book/(?P<isbn>\d+)$'
+
+        SimpleBook.objects.bulk_create([{'isbn': str(i), 'title': 'Book %d' % i} for i in range(2)], client=self.client)
+        books = SimpleBook.objects.get_many([{'isbn': str(i)} for i in range(2)], client=self.client)
+        del self.client.requests[:]
+
+        books[1].data['title'] = 'Book one'
+        result = SimpleBook.objects.bulk_save(books)
+
+        self.assertEqual(result.errors, {})
+        self.assertEqual(self.client.requests, [('PUT', 'http://localhost/api/book/1')])
+        self.assertEqual(self.client.books['1']['title'], 'Book one')
+
+    def test_bulk_delete(self):
+        books = self.Book.objects.bulk_create([{'isbn': str(i), 'title': 'Book %d' % i} for i in range(3)], client=self.client)
+
+        result = self.Book.objects.bulk_delete([books[0], 'book/1', 'http://localhost/api/book/42'], client=self.client)
+
+        self.assertEqual(result[:2], [None, None])
+        self.assertEqual(result.errors.keys(), [2])
+        self.assertEqual(self.client.books.keys(), ['2'])
+
 
 class SimpleResourceTests(TestCase):
     def setUp(self):
@@ -1,6 +1,10 @@
+import gc
+from decimal import Decimal
+
+import mock
 from unittest2 import TestCase
 
-from restorm.rest import RestObject, restify
+from restorm.rest import _dynamic_classes, CompactRestObject, RestObject, clear_changes, data_hash, get_json_patch, get_merge_patch, has_changes, restify
 
 
 class RestObjectTests(TestCase):
@@ -34,6 +38,52 @@ class RestObjectTests(TestCase):
         del rest_object['foo']
         self.assertTrue(len(rest_object) == 0)
 
+    def test_shared_classes(self):
+        rest_object1 = RestObject({'author': 'http://localhost/api/author/1', 'title': 'foo'})
+        rest_object2 = RestObject({'author': 'http://localhost/api/author/2', 'title': 'bar'})
+        rest_object3 = RestObject({'publisher': 'http://localhost/api/publisher/1'})
+
+        self.assertTrue(rest_object1.__class__ is rest_object2.__class__)
+        self.assertFalse(rest_object1.__class__ is rest_object3.__class__)
+        self.assertTrue(hasattr(rest_object1.__class__, 'author'))
+        self.assertFalse(hasattr(rest_object3.__class__, 'author'))
+        self.assertFalse(hasattr(RestObject, 'author'))
+
+    def test_unused_classes_are_removed(self):
+        gc.collect()
+        count = len(_dynamic_classes)
+        rest_objects = [RestObject({'rev%d' % i: 'http://localhost/api/rev/%d' % i}) for i in range(100)]
+        self.assertEqual(len(_dynamic_classes), count + 100)
+
+        del rest_objects
+        gc.collect()
+        self.assertEqual(len(_dynamic_classes), count)
+
+    def test_compact(self):
+        rest_object = CompactRestObject({'author': 'http://localhost/api/author/1', 'title': 'foo'})
+
+        self.assertFalse(hasattr(rest_object, '__dict__'))
+        self.assertEqual(rest_object.__class__.__name__, 'DynamicCompactRestObject')
+        self.assertTrue(hasattr(rest_object.__class__, 'author'))
+        self.assertEqual(rest_object['title'], 'foo')
+
+        for name in CompactRestObject.__dict__.keys():
+            self.assertTrue(name.startswith('_'))
+
+    def test_compact_related_resource(self):
+        class DummyResource(object):
+            client = mock.Mock(root_uri='')
+
+        resource = DummyResource()
+        resource.client.get.return_value = mock.Mock(status_code=200, content={'name': 'Mark Pilgrim'})
+
+        rest_object = CompactRestObject({'author': 'http://localhost/api/author/1'}, resource=resource)
+        author = rest_object.author
+
+        self.assertEqual(author.data['name'], 'Mark Pilgrim')
+        self.assertTrue(rest_object.author is author)
+        self.assertEqual(resource.client.get.call_count, 1)
+
     def test_nested(self):
         child_object = RestObject({'foo': 'bar'})
         parent_object = RestObject({
@@ -75,6 +125,200 @@ class RestifyTests(TestCase):
         # Nested
         self.assertIsInstance(rest_data['author'], RestObject)
 
+    def test_lists(self):
+        json_data = {
+            'books': [{'title': 'Dive into Python'}, ({'title': 'Dive into Python 3'}, 'foo')],
+        }
+
+        rest_data = restify(json_data, self.mock_resource)
+
+        self.assertIsInstance(rest_data['books'], list)
+        self.assertIsInstance(rest_data['books'][0], RestObject)
+        self.assertEqual(rest_data['books'][0]['title'], 'Dive into Python')
+        self.assertIsInstance(rest_data['books'][1], list)
+        self.assertIsInstance(rest_data['books'][1][0], RestObject)
+        self.assertEqual(rest_data['books'][1][1], 'foo')
+
+    def test_value_types(self):
+        json_data = {'price': Decimal('9.99'), 'pages': 300, 'subtitle': None, 'title': 'Dive into Python'}
+
+        rest_data = restify(json_data, self.mock_resource)
+
+        self.assertIsInstance(rest_data['price'], Decimal)
+        self.assertEqual(rest_data['price'], Decimal('9.99'))
+        self.assertEqual(rest_data['pages'], 300)
+        self.assertEqual(rest_data['subtitle'], None)
+
+    def test_copy(self):
+        json_data = {'author': {'name': 'Mark Pilgrim'}, 'tags': ['python']}
+
+        rest_data = restify(json_data, self.mock_resource)
+        rest_data['author']['name'] = 'Someone else'
+        rest_data['tags'].append('programming')
+
+        self.assertEqual(json_data, {'author': {'name': 'Mark Pilgrim'}, 'tags': ['python']})
+
+    def test_lazy(self):
+        json_data = {
+            'author': {'name': 'Mark Pilgrim', 'resource_url': 'http://localhost/api/author/1'},
+            'books': [{'title': 'Dive into Python'}],
+            'title': 'Dive into Python',
+        }
+
+        rest_data = restify(json_data, self.mock_resource, lazy=True)
+
+        self.assertIsInstance(rest_data, RestObject)
+        # Nested values are kept as is until they are accessed.
+        self.assertTrue(rest_data._obj['author'] is json_data['author'])
+
+        author = rest_data['author']
+        self.assertIsInstance(author, RestObject)
+        self.assertTrue(hasattr(author.__class__, 'resource_url'))
+        self.assertTrue(rest_data['author'] is author)
+        self.assertIsInstance(rest_data['books'][0], RestObject)
+        self.assertEqual(rest_data['title'], 'Dive into Python')
+
+    def test_lazy_copy(self):
+        json_data = {'author': {'name': 'Mark Pilgrim'}, 'tags': ['python']}
+
+        rest_data = restify(json_data, self.mock_resource, lazy=True)
+        rest_data['author']['name'] = 'Someone else'
+        rest_data['tags'].append('programming')
+        rest_data['title'] = 'Dive into Python'
+
+        self.assertEqual(json_data, {'author': {'name': 'Mark Pilgrim'}, 'tags': ['python']})
+        self.assertEqual(rest_data['author']['name'], 'Someone else')
+        self.assertEqual(rest_data['tags'], ['python', 'programming'])
+
+    def test_lazy_set(self):
+        rest_data = restify({'tags': ['python']}, self.mock_resource, lazy=True)
+        tags = {'python': 1}
+        rest_data['tags'] = tags
+
+        self.assertTrue(rest_data['tags'] is tags)
+
+    def test_compact(self):
+        json_data = {'author': {'name': 'Mark Pilgrim'}, 'books': [{'title': 'Dive into Python'}]}
+
+        rest_data = restify(json_data, self.mock_resource, compact=True)
+        self.assertIsInstance(rest_data, CompactRestObject)
+        self.assertIsInstance(rest_data['author'], CompactRestObject)
+        self.assertIsInstance(rest_data['books'][0], CompactRestObject)
+
+        rest_data = restify(json_data, self.mock_resource, lazy=True, compact=True)
+        self.assertIsInstance(rest_data, CompactRestObject)
+        self.assertIsInstance(rest_data['author'], CompactRestObject)
+        self.assertIsInstance(rest_data['books'][0], CompactRestObject)
+
+    @mock.patch('json.loads')
+    @mock.patch('json.dumps')
+    def test_single_pass(self, dumps, loads):
+        restify({'author': {'name': 'Mark Pilgrim'}}, self.mock_resource)
+
+        self.assertFalse(dumps.called)
+        self.assertFalse(loads.called)
+
+class ChangeTrackingTests(TestCase):
+
+    def setUp(self):
+        self.mock_resource = mock.Mock(root_uri='')
+        self.json_data = {
+            'title': 'Dive into Python',
+            'isbn': '978-1441413024',
+            'author': {'name': 'Mark Pilgrim', 'born': 1972},
+            'chapters': [{'title': 'Installing Python'}, {'title': 'Your first program'}],
+        }
+
+    def test_no_changes(self):
+        rest_data = restify(self.json_data, self.mock_resource)
+
+        self.assertFalse(has_changes(rest_data))
+        self.assertEqual(get_merge_patch(rest_data), {})
+        self.assertEqual(get_json_patch(rest_data), [])
+
+    def test_merge_patch(self):
+        rest_data = restify(self.json_data, self.mock_resource)
+        rest_data['title'] = 'Dive into Python 3'
+        rest_data['pages'] = 360
+        del rest_data['isbn']
+        rest_data['author']['name'] = 'Someone else'
+        rest_data['chapters'][1]['title'] = 'Your first Python program'
+
+        self.assertTrue(has_changes(rest_data))
+        patch = get_merge_patch(rest_data)
+        # A list is replaced entirely.
+        chapters = patch.pop('chapters')
+        self.assertEqual([c['title'] for c in chapters], ['Installing Python', 'Your first Python program'])
+        self.assertEqual(patch, {
+            'title': 'Dive into Python 3',
+            'pages': 360,
+            'isbn': None,
+            'author': {'name': 'Someone else'},
+        })
+
+    def test_json_patch(self):
+        rest_data = restify(self.json_data, self.mock_resource)
+        rest_data['title'] = 'Dive into Python 3'
+        rest_data['a/b'] = 1
+        del rest_data['isbn']
+        rest_data['author']['name'] = 'Someone else'
+        rest_data['chapters'][1]['title'] = 'Your first Python program'
+
+        self.assertEqual(sorted(get_json_patch(rest_data)), sorted([
+            {'op': 'add', 'path': '/a~1b', 'value': 1},
+            {'op': 'remove', 'path': '/isbn'},
+            {'op': 'replace', 'path': '/title', 'value': 'Dive into Python 3'},
+            {'op': 'replace', 'path': '/author/name', 'value': 'Someone else'},
+            {'op': 'replace', 'path': '/chapters/1/title', 'value': 'Your first Python program'},
+        ]))
+
+    def test_added_and_deleted(self):
+        rest_data = restify(self.json_data, self.mock_resource)
+        rest_data['pages'] = 360
+        del rest_data['pages']
+
+        self.assertEqual(get_merge_patch(rest_data), {})
+        self.assertEqual(get_json_patch(rest_data), [])
+
+    def test_clear_changes(self):
+        rest_data = restify(self.json_data, self.mock_resource)
+        rest_data['title'] = 'Dive into Python 3'
+        rest_data['author']['name'] = 'Someone else'
+
+        clear_changes(rest_data)
+        self.assertFalse(has_changes(rest_data))
+        self.assertEqual(get_merge_patch(rest_data), {})
+
+    def test_lazy_and_compact(self):
+        for kwargs in ({'lazy': True}, {'compact': True}, {'lazy': True, 'compact': True}):
+            rest_data = restify(self.json_data, self.mock_resource, **kwargs)
+            rest_data['author']['born'] = 1973
+
+            self.assertEqual(get_merge_patch(rest_data), {'author': {'born': 1973}})
+
+
+class DataHashTests(TestCase):
+
+    def test_equal_data(self):
+        data = {'title': 'Dive into Python', 'tags': ['python', {'name': 'programming'}], 'price': Decimal('9.99')}
+        other = {'price': Decimal('9.99'), 'tags': ['python', {'name': 'programming'}], 'title': 'Dive into Python'}
+
+        self.assertEqual(data_hash(data), data_hash(other))
+        self.assertEqual(data_hash(data), data_hash(restify(data, mock.Mock(root_uri=''))))
+        self.assertEqual(data_hash(data), data_hash(restify(data, mock.Mock(root_uri=''), lazy=True)))
+        self.assertEqual(data_hash({'title': u'Dive into Python', 'pages': 10L}), data_hash({'title': 'Dive into Python', 'pages': 10}))
+
+    def test_different_data(self):
+        data = {'title': 'Dive into Python', 'tags': ['python', 'programming'], 'available': True}
+
+        self.assertNotEqual(data_hash(data), data_hash(dict(data, title='Dive into Python 3')))
+        self.assertNotEqual(data_hash(data), data_hash(dict(data, tags=['programming', 'python'])))
+        self.assertNotEqual(data_hash(data), data_hash(dict(data, available=1)))
+        self.assertNotEqual(data_hash({'priority': -1}), data_hash({'priority': -2}))
+        self.assertNotEqual(data_hash({'price': Decimal('9.99')}), data_hash({'price': 9.99}))
+        self.assertNotEqual(data_hash({'title': '\xe9'}), data_hash({'title': u'\xe9'}))
+
+
 #    def test(self):
 #        # Before anything is instantiated, Book and RestObject should not have
 #        # attributes referring to related objects.
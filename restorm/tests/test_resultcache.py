@@ -0,0 +1,172 @@
+from __future__ import with_statement
+
+import mock
+from unittest2 import TestCase
+
+from restorm.examples.mock.api import TicketApiClient
+from restorm.registry import registry
+from restorm.resource import Resource, SimpleResource
+from restorm.resultcache import ResultCache
+from restorm.rest import RestObject
+
+
+class ResultCacheTests(TestCase):
+
+    def setUp(self):
+        self.client = TicketApiClient()
+        self.uris = []
+
+        request = self.client.request
+        def counting_request(uri, method='GET', *args, **kwargs):
+            self.uris.append((method, uri))
+            return request(uri, method, *args, **kwargs)
+        self.client.request = counting_request
+
+        class Issue(Resource):
+            class Meta:
+                list = r'^issue/$'
+                item = r'^issue/(?P<id>\d+)$'
+                cache_ttl = 60
+                cache_size = 10
+                register = True
+
+        self.addCleanup(registry.unregister, Issue)
+        self.Issue = Issue
+
+    def test_get(self):
+        issue = self.Issue.objects.get(client=self.client, id=2)
+        cached = self.Issue.objects.get(client=self.client, id=2)
+        self.assertEqual(len(self.uris), 1)
+        self.assertFalse(cached is issue)
+        self.assertIsInstance(cached, self.Issue)
+        self.assertEqual(cached.absolute_url, issue.absolute_url)
+        self.assertEqual(cached.data['title'], 'Cannot create an issue')
+        self.assertEqual(cached.data_hash, issue.data_hash)
+
+        # Other lookups and clients have their own results.
+        self.Issue.objects.get(client=self.client, uri='http://localhost/api/issue/2')
+        self.Issue.objects.get(client=TicketApiClient(), id=2)
+        self.assertEqual(len(self.uris), 2)
+
+    def test_all(self):
+        issues = self.Issue.objects.all(client=self.client)
+        cached = self.Issue.objects.all(client=self.client)
+        self.assertEqual(len(self.uris), 1)
+        self.assertFalse(cached is issues)
+        self.assertEqual(cached, issues)
+
+    def test_changes_not_shared(self):
+        issue = self.Issue.objects.get(client=self.client, id=2)
+        issue.data['description'] = 'This needs less work.'
+        self.assertEqual(self.Issue.objects.get(client=self.client, id=2).data['description'], 'This needs more work.')
+
+        issues = self.Issue.objects.all(client=self.client)
+        issues[0]['title'] = 'Cannot delete an issue'
+        del issues[1]
+        issues = self.Issue.objects.all(client=self.client)
+        self.assertEqual([i['title'] for i in issues], ['Cannot update an issue', 'Cannot create an issue'])
+        self.assertEqual(len(self.uris), 2)
+
+    def test_simple_resource_changes_not_shared(self):
+        class SimpleIssue(SimpleResource):
+            class Meta:
+                item = r'^issue/(?P<id>\d+)$'
+                cache_ttl = 60
+
+        issue = SimpleIssue.objects.get(client=self.client, id=2)
+        issue.data['title'] = 'CHANGED'
+
+        cached = SimpleIssue.objects.get(client=self.client, id=2)
+        self.assertEqual(len(self.uris), 1)
+        self.assertFalse(cached.data is issue.data)
+        self.assertEqual(cached.data['title'], 'Cannot create an issue')
+
+        cached.data['title'] = 'CHANGED AGAIN'
+        other = SimpleIssue.objects.get(client=self.client, id=2)
+        self.assertEqual(other.data['title'], 'Cannot create an issue')
+
+        # Unchanged data is not saved, changed data is.
+        self.client.put = mock.Mock(return_value=mock.Mock(status_code=204))
+        other.save()
+        self.assertFalse(self.client.put.called)
+        cached.save()
+        self.assertEqual(self.client.put.call_count, 1)
+
+    def test_expired(self):
+        with mock.patch('time.time', return_value=1000):
+            self.Issue.objects.get(client=self.client, id=2)
+        with mock.patch('time.time', return_value=1059):
+            self.Issue.objects.get(client=self.client, id=2)
+            self.assertEqual(len(self.uris), 1)
+        with mock.patch('time.time', return_value=1060):
+            self.Issue.objects.get(client=self.client, id=2)
+            self.assertEqual(len(self.uris), 2)
+
+    def test_max_entries(self):
+        self.Issue._meta.result_cache = ResultCache(ttl=60, max_entries=2)
+
+        self.Issue.objects.get(client=self.client, id=1)
+        self.Issue.objects.get(client=self.client, id=2)
+        self.Issue.objects.all(client=self.client)
+
+        self.assertEqual(len(self.Issue._meta.result_cache), 2)
+        self.Issue.objects.get(client=self.client, id=1)
+        self.assertEqual(len(self.uris), 4)
+
+    def test_create_invalidates_lists(self):
+        self.Issue.objects.get(client=self.client, id=1)
+        self.Issue.objects.all(client=self.client)
+
+        self.Issue.objects.create(client=self.client, data={'title': 'Cannot create an issue'})
+        del self.uris[:]
+
+        self.Issue.objects.all(client=self.client)
+        self.Issue.objects.get(client=self.client, id=1)
+        self.assertEqual(self.uris, [('GET', 'issue/')])
+
+    def test_save_invalidates_item(self):
+        issue = self.Issue.objects.get(client=self.client, id=2)
+        self.Issue.objects.all(client=self.client)
+
+        issue.data['description'] = 'This needs less work.'
+        issue.save()
+        del self.uris[:]
+
+        self.assertFalse(self.Issue.objects.get(client=self.client, id=2) is issue)
+        self.Issue.objects.all(client=self.client)
+        self.assertEqual(self.uris, [('GET', 'issue/2'), ('GET', 'issue/')])
+
+    def test_related_resource_invalidates_item(self):
+        self.Issue.objects.get(client=self.client, id=2)
+
+        resource = mock.Mock(client=self.client)
+        data = RestObject({'related': 'http://localhost/api/issue/2'}, resource=resource)
+        with mock.patch.object(self.client, 'put', return_value=mock.Mock(status_code=200)):
+            data.related = {'title': 'Cannot create an issue'}
+        del self.uris[:]
+
+        self.Issue.objects.get(client=self.client, id=2)
+        self.assertEqual(self.uris, [('GET', 'issue/2')])
+
+    def test_not_cached(self):
+        class Ticket(Resource):
+            class Meta:
+                item = r'^issue/(?P<id>\d+)$'
+
+        self.assertEqual(Ticket._meta.result_cache, None)
+
+        Ticket.objects.get(client=self.client, id=2)
+        Ticket.objects.get(client=self.client, id=2)
+        self.assertEqual(len(self.uris), 2)
+
+
+class ResultCacheKeyTests(TestCase):
+
+    def test_key(self):
+        cache = ResultCache(ttl=60)
+        client = object()
+
+        self.assertEqual(cache.key(client, 'get', None, {'a': 1, 'b': 2}, {'id': 1}), cache.key(client, 'get', None, {'b': 2, 'a': 1}, {'id': 1}))
+        self.assertNotEqual(cache.key(client, 'get', None, None, {'id': 1}), cache.key(client, 'all', None, None, {'id': 1}))
+        # Queries that cannot be hashed are not cached.
+        self.assertEqual(cache.key(client, 'get', None, {'a': [1]}, {}), None)
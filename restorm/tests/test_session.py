@@ -0,0 +1,113 @@
+from __future__ import with_statement
+
+import threading
+
+from unittest2 import TestCase
+
+from restorm.examples.mock.api import LibraryApiClient
+from restorm.resource import Resource, ResourceList
+from restorm.session import Session, get_session
+
+
+class CountingLibraryApiClient(LibraryApiClient):
+    def __init__(self, *args, **kwargs):
+        super(CountingLibraryApiClient, self).__init__(*args, **kwargs)
+        self.uris = []
+
+    def get_response_from_request(self, request):
+        self.uris.append(request.uri)
+        return super(CountingLibraryApiClient, self).get_response_from_request(request)
+
+
+class SessionTests(TestCase):
+
+    def setUp(self):
+        self.client = CountingLibraryApiClient()
+
+        class Book(Resource):
+            class Meta:
+                item = r'^book/(?P<isbn>[\d-]+)$'
+
+        class Author(Resource):
+            class Meta:
+                item = r'^author/(?P<id>\d)$'
+
+        self.Book, self.Author = Book, Author
+
+    def test_activate(self):
+        self.assertEqual(get_session(), None)
+
+        session = Session()
+        with session:
+            self.assertTrue(get_session() is session)
+
+            nested_session = Session()
+            with nested_session:
+                self.assertTrue(get_session() is nested_session)
+            self.assertTrue(get_session() is session)
+
+        self.assertEqual(get_session(), None)
+
+    def test_per_thread(self):
+        sessions = []
+        with Session():
+            thread = threading.Thread(target=lambda: sessions.append(get_session()))
+            thread.start()
+            thread.join()
+        self.assertEqual(sessions, [None])
+
+    def test_get(self):
+        with Session() as session:
+            book = self.Book.objects.get(client=self.client, isbn='978-1441413024')
+            self.assertTrue('http://localhost/api/book/978-1441413024' in session)
+            self.assertTrue(self.Book.objects.get(client=self.client, isbn='978-1441413024') is book)
+            self.assertTrue(self.Book.objects.get(client=self.client, uri='http://localhost/api/book/978-1441413024') is book)
+
+        self.assertEqual(len(self.client.uris), 1)
+
+        # Outside the session, the book is retrieved again.
+        self.assertFalse(self.Book.objects.get(client=self.client, isbn='978-1441413024') is book)
+        self.assertEqual(len(self.client.uris), 2)
+
+    def test_related_resources(self):
+        with Session():
+            author = self.Author.objects.get(client=self.client, id=1)
+            book = self.Book.objects.get(client=self.client, isbn='978-1441413024')
+            self.assertTrue(book.data.author is author)
+
+            # And the other way around.
+            other_book = self.Book.objects.get(client=self.client, isbn='978-1590597255')
+            self.assertTrue(self.Author.objects.get(client=self.client, id=2) is other_book.data.author)
+
+        self.assertEqual(self.client.uris, [
+            'http://localhost/api/author/1',
+            'http://localhost/api/book/978-1441413024',
+            'http://localhost/api/book/978-1590597255',
+            'http://localhost/api/author/2',
+        ])
+
+    def test_prefetch_related(self):
+        with Session() as session:
+            self.Author.objects.get(client=self.client, id=1)
+            books = ResourceList([
+                {'book': 'http://localhost/api/book/978-1441413024'},
+                {'book': 'http://localhost/api/book/978-1590597255'},
+            ], client=self.client)
+            books.prefetch_related('book__author')
+
+            # Author 1 was in the session already.
+            self.assertEqual(len(self.client.uris), 4)
+            self.assertTrue('http://localhost/api/author/2' in session)
+
+    def test_other_resource_class(self):
+        class Writer(Resource):
+            class Meta:
+                item = r'^author/(?P<id>\d)$'
+
+        with Session():
+            author = self.Author.objects.get(client=self.client, id=1)
+            # A resource of another class is retrieved again.
+            writer = Writer.objects.get(client=self.client, id=1)
+            self.assertIsInstance(writer, Writer)
+
+        self.assertEqual(len(self.client.uris), 2)
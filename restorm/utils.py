@@ -1,18 +1,42 @@
 import re
 
 
-def reverse(pattern, **kwargs):
-    template = pattern.strip('^$')
-
-    start = re.compile(r'\(\?P\<')
-    end = re.compile(r'\>[^\)]*\)')
-    
-    template = start.sub('%(', template)
-    template = end.sub(')s', template)
-    
+_group_start = re.compile(r'\(\?P\<')
+_group_end = re.compile(r'\>[^\)]*\)')
+
+# URL templates, per URL pattern.
+_templates = {}
+
+
+def url_template(pattern):
+    """
+    Returns the template to build URLs that match the URL pattern. Templates
+    are created once per pattern.
+
+    >>> url_template(r'^book/(?P<isbn>\w+)$')
+    'book/%(isbn)s'
+
+    """
     try:
-        result = template % kwargs
+        return _templates[pattern]
+    except KeyError:
+        template = pattern.strip('^$')
+        template = _group_start.sub('%(', template)
+        template = _group_end.sub(')s', template)
+
+        _templates[pattern] = template
+        return template
+
+
+def format_url(template, **kwargs):
+    """
+    Returns the URL built from the template, as returned by ``url_template``.
+    """
+    try:
+        return template % kwargs
     except KeyError, e:
         raise ValueError('The URL pattern requires %s as named argument.' % e)
-    
-    return result
+
+
+def reverse(pattern, **kwargs):
+    return format_url(url_template(pattern), **kwargs)